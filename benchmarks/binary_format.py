@@ -0,0 +1,53 @@
+"""Compare the size and load time of JSONL and binary recordings.
+
+Usage: python -m benchmarks.binary_format [number of exchanges]
+"""
+
+import io
+import sys
+import time
+from http_types import (
+    BinaryHttpExchangeReader,
+    HttpExchangeReader,
+    jsonl_to_binary,
+)
+from benchmarks.synthetic import generate_jsonl
+
+
+def best_of(repeat, func):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def main(count: int):
+    jsonl = ("\n".join(generate_jsonl(count)) + "\n").encode("utf-8")
+    binary_output = io.BytesIO()
+    jsonl_to_binary(io.BytesIO(jsonl), binary_output)
+    binary = binary_output.getvalue()
+
+    jsonl_time = best_of(
+        3, lambda: list(HttpExchangeReader.from_jsonl(io.BytesIO(jsonl)))  # type: ignore
+    )
+    binary_time = best_of(
+        3, lambda: list(BinaryHttpExchangeReader.from_binary(io.BytesIO(binary)))
+    )
+
+    print("exchanges:    {}".format(count))
+    print(
+        "size:         jsonl {} bytes, binary {} bytes ({:.1%})".format(
+            len(jsonl), len(binary), len(binary) / len(jsonl)
+        )
+    )
+    print(
+        "load time:    jsonl {:.3f} s, binary {:.3f} s ({:.1f}x faster)".format(
+            jsonl_time, binary_time, jsonl_time / binary_time
+        )
+    )
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 20000)
@@ -0,0 +1,47 @@
+"""Measure memory per exchange held in memory.
+
+Usage: python -m benchmarks.memory [number of exchanges]
+"""
+
+import gc
+import sys
+import tracemalloc
+from typing import Callable, List
+from http_types import HttpExchangeReader, Interner
+from benchmarks.synthetic import generate_jsonl
+
+
+def bytes_per_exchange(lines: List[str], load: Callable[[str], object]) -> float:
+    """Memory allocated by the objects built from each line and kept alive."""
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    kept = [load(line) for line in lines]
+    after = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    del kept
+    return (after - before) / len(lines)
+
+
+def main(count: int):
+    lines = generate_jsonl(count)
+    results = {
+        "dataclasses": bytes_per_exchange(lines, HttpExchangeReader.from_json),
+        "slotted": bytes_per_exchange(
+            lines, lambda line: HttpExchangeReader.from_json(line, slotted=True)
+        ),
+    }
+    interner = Interner()
+    results["interned"] = bytes_per_exchange(
+        lines,
+        lambda line: HttpExchangeReader.from_json(
+            line, slotted=True, interner=interner
+        ),
+    )
+    print("exchanges: {}".format(count))
+    for name, size in results.items():
+        print("{:<12} {:>8.0f} bytes per exchange".format(name, size))
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 20000)
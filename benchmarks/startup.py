@@ -0,0 +1,88 @@
+"""Measure the time taken by `import http_types` in a fresh interpreter.
+
+Reports the median and fastest of several runs, after subtracting the
+startup time of an interpreter importing nothing, and the slowest modules
+imported along the way according to `python -X importtime`.
+
+Usage: python -m benchmarks.startup [number of runs]
+"""
+
+import os
+import statistics
+import subprocess
+import sys
+import time
+from typing import Dict, List, Tuple
+from http_types import DEFERRED_MODULES
+
+
+def environment() -> Dict[str, str]:
+    # Write bytecode on the first run, so that later runs load it like an
+    # installed package does
+    env = dict(os.environ)
+    env.pop("PYTHONDONTWRITEBYTECODE", None)
+    return env
+
+
+def run_times(code: str, runs: int) -> List[float]:
+    env = environment()
+    timings = []
+    for _ in range(runs + 1):
+        start = time.perf_counter()
+        subprocess.run([sys.executable, "-c", code], env=env, check=True)
+        timings.append(time.perf_counter() - start)
+    # The first run is a warm-up
+    return timings[1:]
+
+
+def slowest_imports(count: int = 10) -> List[Tuple[str, int]]:
+    """Modules with the largest cumulative import time in microseconds."""
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", "import http_types"],
+        env=environment(),
+        stderr=subprocess.PIPE,
+        universal_newlines=True,
+        check=True,
+    )
+    imports = []
+    for line in result.stderr.splitlines():
+        parts = line.split("|")
+        if len(parts) == 3 and parts[1].strip().isdigit():
+            imports.append((parts[2].strip(), int(parts[1])))
+    imports.sort(key=lambda item: item[1], reverse=True)
+    return imports[:count]
+
+
+def deferred_modules_imported() -> List[str]:
+    code = "import sys, http_types; print(' '.join(sorted(sys.modules)))"
+    result = subprocess.run(
+        [sys.executable, "-c", code],
+        stdout=subprocess.PIPE,
+        universal_newlines=True,
+        check=True,
+    )
+    loaded = set(result.stdout.split())
+    return [module for module in DEFERRED_MODULES if module in loaded]
+
+
+def main(runs: int):
+    interpreter = run_times("pass", runs)
+    with_import = run_times("import http_types", runs)
+    baseline = statistics.median(interpreter)
+    print("interpreter:  median {:.1f} ms".format(baseline * 1000))
+    print(
+        "import:       median {:.1f} ms, fastest {:.1f} ms".format(
+            (statistics.median(with_import) - baseline) * 1000,
+            (min(with_import) - min(interpreter)) * 1000,
+        )
+    )
+    print("slowest imports (cumulative):")
+    for module, microseconds in slowest_imports():
+        print("    {:<40} {:>7.1f} ms".format(module, microseconds / 1000))
+    imported = deferred_modules_imported()
+    if imported:
+        print("imported eagerly: {}".format(", ".join(imported)))
+
+
+if __name__ == "__main__":
+    main(int(sys.argv[1]) if len(sys.argv) > 1 else 20)
@@ -0,0 +1,259 @@
+"""Time the main operations of the library on synthetic traffic.
+
+Reports throughput, per-operation latency percentiles and peak memory of
+each benchmark as JSON, so that results can be compared across versions.
+
+Usage:
+    python -m benchmarks.suite [--count N] [--profile NAME] [--output FILE]
+    python -m benchmarks.suite --compare BASELINE.json [--output FILE]
+"""
+
+import argparse
+import gc
+import io
+import json
+import platform
+import sys
+import time
+import tracemalloc
+from typing import Any, Callable, Dict, List, Optional, Sequence
+from http_types import (
+    HttpExchangeBuilder,
+    HttpExchangeReader,
+    HttpExchangeWriter,
+    RequestBuilder,
+)
+from http_types.utils import encode_query, parse_path
+from benchmarks.synthetic import PROFILES, generate_jsonl
+
+PERCENTILES = (50, 90, 99)
+
+
+def percentile(sorted_values: Sequence[float], q: float) -> float:
+    """Nearest-rank percentile of sorted values."""
+    index = max(
+        0, min(len(sorted_values) - 1, int(round(q / 100 * len(sorted_values))) - 1)
+    )
+    return sorted_values[index]
+
+
+class Benchmark:
+    """An operation timed over a list of inputs.
+
+    Each run calls setup() for fresh state, then run_one() once per input.
+    After an untimed warm-up run, throughput is taken from the fastest run,
+    and latency percentiles from the per-call timings of all runs.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        inputs: List[Any],
+        run_one: Callable[[Any, Any], Any],
+        setup: Callable[[], Any] = lambda: None,
+        bytes_processed: int = 0,
+    ):
+        """
+        Arguments:
+            name {str} -- Name in the report.
+            inputs {List[Any]} -- Inputs of the operation, one per call.
+            run_one {Callable[[Any, Any], Any]} -- Operation, called with the
+                state returned by setup() and an input.
+
+        Keyword Arguments:
+            setup {Callable[[], Any]} -- Creates the state of a run.
+            bytes_processed {int} -- Size of the inputs, to report bytes per second.
+        """
+        self.name = name
+        self.inputs = inputs
+        self.run_one = run_one
+        self.setup = setup
+        self.bytes_processed = bytes_processed
+
+    def measure(self, repeat: int) -> Dict[str, Any]:
+        run_one = self.run_one
+        clock = time.perf_counter
+        latencies: List[float] = []
+        best = float("inf")
+        for run in range(repeat + 1):
+            state = self.setup()
+            gc.collect()
+            timings: List[float] = []
+            start = clock()
+            for value in self.inputs:
+                before = clock()
+                run_one(state, value)
+                timings.append(clock() - before)
+            if run > 0:
+                best = min(best, clock() - start)
+                latencies.extend(timings)
+
+        # Peak memory is measured in a separate run, since tracing slows down
+        # allocations
+        state = self.setup()
+        gc.collect()
+        tracemalloc.start()
+        for value in self.inputs:
+            run_one(state, value)
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        del state
+
+        latencies.sort()
+        result: Dict[str, Any] = {
+            "operations": len(self.inputs),
+            "seconds": best,
+            "operations_per_second": len(self.inputs) / best,
+            "latency_us": {
+                "p{}".format(q): percentile(latencies, q) * 1e6 for q in PERCENTILES
+            },
+            "peak_memory_bytes": peak,
+        }
+        result["latency_us"]["max"] = latencies[-1] * 1e6
+        if self.bytes_processed:
+            result["bytes_per_second"] = self.bytes_processed / best
+        return result
+
+
+def benchmarks(lines: List[str]) -> List[Benchmark]:
+    """The benchmarks run on the given JSONL lines."""
+    records = [json.loads(line) for line in lines]
+    exchanges = [HttpExchangeBuilder.from_dict(record) for record in records]
+    jsonl = "".join(line + "\n" for line in lines)
+    size = len(jsonl.encode("utf-8"))
+    urls = [
+        "{}://{}{}".format(e.request.protocol.value, e.request.host, e.request.path)
+        for e in exchanges
+    ]
+    paths = [exchange.request.path for exchange in exchanges]
+    queries = [exchange.request.query for exchange in exchanges]
+
+    def clear_caches():
+        RequestBuilder.cache_clear()
+
+    return [
+        # Readers are timed per exchange taken from a generator over the whole input
+        Benchmark(
+            "read_jsonl",
+            lines,
+            lambda reader, _: next(reader),
+            setup=lambda: HttpExchangeReader.from_jsonl(io.StringIO(jsonl)),
+            bytes_processed=size,
+        ),
+        Benchmark(
+            "read_jsonl_slotted",
+            lines,
+            lambda reader, _: next(reader),
+            setup=lambda: HttpExchangeReader.from_jsonl(
+                io.StringIO(jsonl), slotted=True
+            ),
+            bytes_processed=size,
+        ),
+        Benchmark(
+            "from_dict",
+            records,
+            lambda _, record: HttpExchangeBuilder.from_dict(record),
+        ),
+        Benchmark(
+            "to_json",
+            exchanges,
+            lambda _, exchange: HttpExchangeWriter.to_json(exchange),
+        ),
+        Benchmark(
+            "write",
+            exchanges,
+            lambda writer, exchange: writer.write(exchange),
+            setup=lambda: HttpExchangeWriter(io.StringIO()),
+        ),
+        Benchmark(
+            "from_url",
+            urls,
+            lambda _, url: RequestBuilder.from_url(url),
+            setup=clear_caches,
+        ),
+        Benchmark(
+            "parse_path", paths, lambda _, path: parse_path(path), setup=clear_caches
+        ),
+        Benchmark(
+            "encode_query",
+            queries,
+            lambda _, query: encode_query(query),
+            setup=clear_caches,
+        ),
+    ]
+
+
+def run(
+    count: int, profile: str, repeat: int, only: Optional[Sequence[str]] = None
+) -> Dict[str, Any]:
+    """Run the benchmarks and return the report."""
+    lines = generate_jsonl(count, profile=PROFILES[profile])
+    results = {}
+    for benchmark in benchmarks(lines):
+        if only and benchmark.name not in only:
+            continue
+        results[benchmark.name] = benchmark.measure(repeat)
+    return {
+        "python": platform.python_version(),
+        "implementation": platform.python_implementation(),
+        "platform": platform.platform(),
+        "count": count,
+        "profile": profile,
+        "repeat": repeat,
+        "benchmarks": results,
+    }
+
+
+def compare(baseline: Dict[str, Any], report: Dict[str, Any]) -> List[str]:
+    """Lines comparing the throughput and peak memory of two reports."""
+    lines = []
+    for name, result in report["benchmarks"].items():
+        before = baseline["benchmarks"].get(name, None)
+        if before is None:
+            continue
+        speedup = result["operations_per_second"] / before["operations_per_second"]
+        memory = result["peak_memory_bytes"] / max(1, before["peak_memory_bytes"])
+        lines.append(
+            "{:<20} {:>6.2f}x throughput {:>6.2f}x peak memory".format(
+                name, speedup, memory
+            )
+        )
+    return lines
+
+
+def main(argv: Optional[Sequence[str]] = None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--count", type=int, default=10000, help="exchanges per run")
+    parser.add_argument("--profile", choices=sorted(PROFILES), default="default")
+    parser.add_argument(
+        "--repeat", type=int, default=3, help="timed runs per benchmark"
+    )
+    parser.add_argument("--only", nargs="*", help="names of benchmarks to run")
+    parser.add_argument("--output", help="write the report to a file instead of stdout")
+    parser.add_argument(
+        "--compare",
+        help="baseline report; runs with its count, profile and repeat and prints ratios",
+    )
+    args = parser.parse_args(argv)
+
+    baseline = None
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        args.count = baseline["count"]
+        args.profile = baseline["profile"]
+        args.repeat = baseline["repeat"]
+
+    report = run(args.count, args.profile, args.repeat, args.only)
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(text + "\n")
+    elif baseline is None:
+        print(text)
+    if baseline is not None:
+        print("\n".join(compare(baseline, report)))
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
@@ -0,0 +1,158 @@
+"""Synthetic HTTP traffic for benchmarks."""
+
+import base64
+import json
+import random
+from dataclasses import dataclass
+from datetime import datetime, timedelta, timezone
+from typing import Dict, Iterator, List, Optional
+
+HOSTS = ["api.example.com", "cdn.example.com", "auth.example.com:8443"]
+RESOURCES = ["users", "repos", "orders", "items", "sessions"]
+USER_AGENTS = [
+    "Mozilla/5.0 (X11; Linux x86_64) AppleWebKit/537.36 Chrome/80.0 Safari/537.36",
+    "python-requests/2.23.0",
+    "curl/7.68.0",
+]
+NON_JSON_CONTENT_TYPES = ["text/html; charset=utf-8", "text/plain", "image/png"]
+
+
+@dataclass(frozen=True)
+class TrafficProfile:
+    """
+    Shape of generated traffic. The default profile generates small JSON
+    API traffic and is the one used by the other benchmarks.
+    """
+
+    """
+    Number of additional headers per request and response, with names drawn
+    from a pool four times as large and random values.
+    """
+    extra_headers: int = 0
+
+    """
+    Range of the number of items in JSON bodies, about 50 bytes each.
+    """
+    min_body_items: int = 1
+    max_body_items: int = 20
+
+    """
+    Fraction of responses with a JSON body. Others are HTML, plain text or
+    binary images of a similar size.
+    """
+    json_fraction: float = 1.0
+
+    """
+    Include request and response timestamps.
+    """
+    timestamps: bool = True
+
+    """
+    Maximum number of additional query parameters per request.
+    """
+    extra_query_params: int = 0
+
+
+PROFILES = {
+    "default": TrafficProfile(),
+    "diverse": TrafficProfile(extra_headers=8, json_fraction=0.6, extra_query_params=4),
+    "large-bodies": TrafficProfile(min_body_items=100, max_body_items=400),
+    "minimal": TrafficProfile(min_body_items=0, max_body_items=1, timestamps=False),
+}
+
+
+def non_json_body(rng: random.Random, content_type: str, size: int) -> Dict:
+    """Body fields of a response with a non-JSON body of about the given size."""
+    if content_type == "image/png":
+        data = bytes(rng.getrandbits(8) for _ in range(size))
+        return {
+            "body": base64.b64encode(data).decode("ascii"),
+            "bodyEncoding": "base64",
+        }
+    words = " ".join(rng.choice(RESOURCES) for _ in range(size // 6 + 1))
+    if content_type.startswith("text/html"):
+        return {"body": "<html><body><p>{}</p></body></html>".format(words)}
+    return {"body": words}
+
+
+def generate_records(
+    count: int, seed: int = 0, profile: Optional[TrafficProfile] = None
+) -> Iterator[Dict]:
+    """Generate exchanges as dictionaries in the HTTP types format.
+
+    Arguments:
+        count {int} -- Number of exchanges.
+
+    Keyword Arguments:
+        seed {int} -- Random seed, so that runs are comparable.
+        profile {Optional[TrafficProfile]} -- Shape of the traffic. (default: TrafficProfile())
+    """
+    profile = profile or PROFILES["default"]
+    rng = random.Random(seed)
+    # Features outside the default profile draw from their own generator, so
+    # the default traffic does not depend on them
+    extra_rng = random.Random(seed + 1)
+    header_names = ["x-custom-{}".format(n) for n in range(4 * profile.extra_headers)]
+    start = datetime(2020, 1, 1, tzinfo=timezone.utc)
+    for n in range(count):
+        resource = rng.choice(RESOURCES)
+        pathname = "/v1/{}/{}".format(resource, rng.randrange(10000))
+        query: Dict[str, object] = {}
+        if rng.random() < 0.5:
+            query["page"] = str(rng.randrange(10))
+        if rng.random() < 0.2:
+            query["tag"] = [rng.choice(RESOURCES) for _ in range(2)]
+        for _ in range(extra_rng.randrange(profile.extra_query_params + 1)):
+            query["q{}".format(extra_rng.randrange(20))] = str(
+                extra_rng.randrange(1000)
+            )
+        body = json.dumps(
+            [
+                {"id": rng.randrange(1 << 30), "name": resource, "active": True}
+                for _ in range(
+                    rng.randrange(profile.min_body_items, profile.max_body_items)
+                )
+            ]
+        )
+        timestamp = start + timedelta(milliseconds=37 * n)
+        request = {
+            "method": rng.choice(["get", "get", "get", "post", "put"]),
+            "protocol": "https",
+            "host": rng.choice(HOSTS),
+            "pathname": pathname,
+            "query": query,
+            "headers": {
+                "accept": "application/json",
+                "user-agent": rng.choice(USER_AGENTS),
+                "x-request-id": "{:032x}".format(rng.randrange(1 << 128)),
+            },
+            "timestamp": timestamp.isoformat(),
+        }
+        response: Dict = {
+            "statusCode": rng.choice([200, 200, 200, 201, 404, 500]),
+            "headers": {
+                "content-type": "application/json",
+                "content-length": str(len(body)),
+                "cache-control": "no-cache",
+            },
+            "body": body,
+            "timestamp": (timestamp + timedelta(milliseconds=12)).isoformat(),
+        }
+        if profile.json_fraction < 1.0 and extra_rng.random() >= profile.json_fraction:
+            content_type = extra_rng.choice(NON_JSON_CONTENT_TYPES)
+            response["headers"]["content-type"] = content_type
+            response.update(non_json_body(extra_rng, content_type, len(body)))
+        for headers in (request["headers"], response["headers"]):
+            for name in extra_rng.sample(header_names, profile.extra_headers):
+                headers[name] = "{:x}".format(extra_rng.getrandbits(64))  # type: ignore
+        if not profile.timestamps:
+            del request["timestamp"]
+            del response["timestamp"]
+        yield {"request": request, "response": response}
+
+
+def generate_jsonl(
+    count: int, seed: int = 0, profile: Optional[TrafficProfile] = None
+) -> List[str]:
+    """Generate exchanges as JSONL lines, without trailing newlines."""
+    return [json.dumps(record) for record in generate_records(count, seed, profile)]
@@ -1,8 +1,91 @@
+import importlib
+import sys
 from . import types
 from .types import *  # noqa: F401,F403
+from . import interning
+from .interning import *  # noqa: F401,F403
+from . import bodystore
+from .bodystore import *  # noqa: F401,F403
+from . import instrumentation
+from .instrumentation import *  # noqa: F401,F403
 from . import utils
 from .utils import *  # noqa: F401,F403
 
+# Modules imported on first access to one of their names, as they pull in
+# heavy standard library modules that reading and writing do not need
+LAZY_MODULES = {
+    "validation": [
+        "SchemaError",
+        "ValidationError",
+        "Validator",
+        "compile_schema",
+        "default_validator",
+        "load_schema",
+    ],
+    "filtering": ["ExchangeFilter"],
+    "projection": [
+        "Projection",
+        "ProjectedRequest",
+        "ProjectedResponse",
+        "ProjectedHttpExchange",
+        "project",
+    ],
+    "binary": [
+        "BinaryHttpExchangeReader",
+        "BinaryHttpExchangeWriter",
+        "binary_to_jsonl",
+        "jsonl_to_binary",
+    ],
+    "compression": ["BlockGzipFile", "detect_compression", "open_recording"],
+    "mapped": ["MappedRecording"],
+    "parallel": ["chunk_ranges", "read_jsonl_parallel"],
+    "index": ["HttpExchangeIndex", "IndexedHttpExchangeReader"],
+    "aio": ["AsyncHttpExchangeReader", "AsyncHttpExchangeWriter"],
+    "matching": ["Match", "RequestIndex"],
+    "templates": ["PathTemplates"],
+    "traffic": ["EndpointStats", "QuantileSketch", "TrafficStats", "recording_stats"],
+}
+
+# Standard library and third-party modules that only some features need, which
+# `import http_types` must not import
+DEFERRED_MODULES = [
+    "asyncio",
+    "concurrent.futures",
+    "dateutil.parser",
+    "http.client",
+    "mmap",
+    "tempfile",
+    "urllib.request",
+]
+
+LAZY_NAMES = {name: module for module, names in LAZY_MODULES.items() for name in names}
+
 __all__ = []
 __all__ += types.__all__
+__all__ += interning.__all__
+__all__ += bodystore.__all__
+__all__ += instrumentation.__all__
 __all__ += utils.__all__
+__all__ += LAZY_NAMES
+
+
+def __getattr__(name):
+    if name in LAZY_MODULES:
+        return importlib.import_module("." + name, __name__)
+    module = LAZY_NAMES.get(name, None)
+    if module is None:
+        raise AttributeError("module {!r} has no attribute {!r}".format(__name__, name))
+    value = getattr(importlib.import_module("." + module, __name__), name)
+    # Later accesses find the name without calling __getattr__
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(LAZY_NAMES))
+
+
+if sys.version_info < (3, 7):
+    # Module __getattr__ needs Python 3.7, so import everything up front
+    for _name in LAZY_NAMES:
+        __getattr__(_name)
@@ -0,0 +1,152 @@
+import asyncio
+import inspect
+from typing import Any, AsyncIterable, Iterable, Optional, Union
+from http_types.types import HttpExchange
+from http_types.utils import HttpExchangeReader, HttpExchangeWriter, LineBuffer
+
+__all__ = ["AsyncHttpExchangeReader", "AsyncHttpExchangeWriter"]
+
+"""
+Default number of buffered characters after which AsyncHttpExchangeWriter
+hands its buffer to the output.
+"""
+DEFAULT_BUFFER_SIZE = 64 * 1024
+
+
+class AsyncHttpExchangeReader:
+    """Read HTTP exchanges line by line from an asynchronous stream.
+
+    Example:
+        async for exchange in AsyncHttpExchangeReader(stream_reader):
+            ...
+    """
+
+    def __init__(self, input_stream: Any):
+        """
+        Arguments:
+            input_stream {Any} -- asyncio.StreamReader, or any object with a coroutine
+                readline() method returning str or bytes, such as an aiofiles file.
+        """
+        self.input_stream = input_stream
+
+    async def readline(self) -> Union[str, bytes]:
+        """Read the next line from the stream. Returns an empty line at EOF.
+
+        Lines from an asyncio.StreamReader are not limited by the reader's
+        buffer limit.
+        """
+        if not isinstance(self.input_stream, asyncio.StreamReader):
+            return await self.input_stream.readline()
+        chunks = []
+        while True:
+            try:
+                chunks.append(await self.input_stream.readuntil(b"\n"))
+                break
+            except asyncio.IncompleteReadError as e:
+                chunks.append(e.partial)
+                break
+            except asyncio.LimitOverrunError as e:
+                chunks.append(await self.input_stream.readexactly(e.consumed))
+        return b"".join(chunks)
+
+    def __aiter__(self) -> "AsyncHttpExchangeReader":
+        return self
+
+    async def __anext__(self) -> HttpExchange:
+        while True:
+            line = await self.readline()
+            if not line:
+                raise StopAsyncIteration
+            if line.strip():
+                return HttpExchangeReader.from_json(line)
+
+
+class AsyncHttpExchangeWriter:
+    """Write HTTP exchanges to an asynchronous stream, one JSON object per line.
+
+    Like asyncio.StreamWriter, write() only buffers and drain() must be
+    awaited to write the buffer out and wait for the output to accept it.
+    Output is identical to HttpExchangeWriter.
+    """
+
+    def __init__(
+        self,
+        output: Any,
+        buffer_size: int = DEFAULT_BUFFER_SIZE,
+        buffer_count: int = 0,
+        binary: Optional[bool] = None,
+    ):
+        """
+        Arguments:
+            output {Any} -- asyncio.StreamWriter, or any object with a write() method,
+                which may be a coroutine, and optionally a coroutine drain() method.
+
+        Keyword Arguments:
+            buffer_size {int} -- Number of buffered characters after which the buffer is
+                handed to the output. (default: {65536})
+            buffer_count {int} -- Number of buffered exchanges after which the buffer is
+                handed to the output. (default: {0}, no limit)
+            binary {Optional[bool]} -- Write UTF-8 encoded bytes instead of str.
+                (default: True for asyncio.StreamWriter, False otherwise)
+        """
+        self.output = output
+        self.buffer = LineBuffer(max_size=buffer_size, max_count=buffer_count)
+        self.binary = (
+            isinstance(output, asyncio.StreamWriter) if binary is None else binary
+        )
+        self.sync_write = isinstance(output, asyncio.StreamWriter)
+
+    def write(self, exchange: HttpExchange):
+        """Buffer a single HTTP exchange.
+
+        When the buffer is full and the output accepts writes synchronously,
+        as asyncio.StreamWriter does, the buffer is handed to the output.
+        Otherwise it is kept until drain() is awaited.
+        """
+        if self.buffer.append(HttpExchangeWriter.to_json(exchange) + "\n"):
+            if self.sync_write:
+                self.output.write(self._drain_buffer())
+
+    async def write_many(
+        self, exchanges: Union[Iterable[HttpExchange], AsyncIterable[HttpExchange]]
+    ):
+        """Write HTTP exchanges, draining whenever the buffer is full.
+
+        Arguments:
+            exchanges -- Iterable or asynchronous iterable of exchanges.
+        """
+        if isinstance(exchanges, AsyncIterable):
+            async for exchange in exchanges:
+                await self._write_and_maybe_drain(exchange)
+        else:
+            for exchange in exchanges:
+                await self._write_and_maybe_drain(exchange)
+        await self.drain()
+
+    async def drain(self):
+        """Write out the buffer and wait until the output can accept more data."""
+        if len(self.buffer) > 0:
+            result = self.output.write(self._drain_buffer())
+            if inspect.isawaitable(result):
+                await result
+        drain = getattr(self.output, "drain", None)
+        if drain is not None:
+            await drain()
+
+    async def close(self):
+        """Drain the writer. The output is left open."""
+        await self.drain()
+
+    async def __aenter__(self) -> "AsyncHttpExchangeWriter":
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.close()
+
+    async def _write_and_maybe_drain(self, exchange: HttpExchange):
+        if self.buffer.append(HttpExchangeWriter.to_json(exchange) + "\n"):
+            await self.drain()
+
+    def _drain_buffer(self) -> Union[str, bytes]:
+        data = self.buffer.drain()
+        return data.encode("utf-8") if self.binary else data
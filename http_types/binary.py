@@ -0,0 +1,433 @@
+import json
+import struct
+from datetime import datetime, timedelta, timezone
+from typing import (
+    IO,
+    Any,
+    Dict,
+    Generator,
+    Iterable,
+    List,
+    Optional,
+    Tuple,
+    Union,
+    cast,
+)
+from http_types.types import (
+    Body,
+    HttpExchange,
+    HttpHeaders,
+    HttpMethod,
+    HttpQuery,
+    Protocol,
+    Request,
+    Response,
+)
+from http_types.utils import (
+    HttpExchangeReader,
+    HttpExchangeWriter,
+    json_serial,
+    lazy_body_as_json,
+)
+
+__all__ = [
+    "BinaryHttpExchangeReader",
+    "BinaryHttpExchangeWriter",
+    "binary_to_jsonl",
+    "jsonl_to_binary",
+]
+
+"""
+Binary recording format.
+
+A file starts with MAGIC and a version number, followed by records. Each
+record is a type byte and a payload length followed by the payload:
+
+- RECORD_STRING adds a UTF-8 string to the string table of the file. Strings
+  are numbered in the order they appear.
+- RECORD_RESET empties the string table, so that strings are numbered from
+  zero again. Writers emit it between exchanges once the table holds
+  max_strings strings, which bounds the memory of writers and readers on
+  recordings with unbounded variety, such as request ID headers.
+- RECORD_EXCHANGE holds one exchange. Methods, protocols and status codes are
+  stored as integers; hosts, pathnames, header names and values and query
+  keys and values as references into the string table; bodies as raw bytes,
+  UTF-8 encoded for text bodies.
+"""
+MAGIC = b"HTBF"
+VERSION = 1
+FILE_HEADER = struct.Struct("<4sH")
+RECORD_HEADER = struct.Struct("<BI")
+
+RECORD_STRING = 1
+RECORD_EXCHANGE = 2
+RECORD_RESET = 3
+
+"""
+Default number of strings in the string table after which writers reset it.
+"""
+DEFAULT_MAX_STRINGS = 100000
+
+METHODS = list(HttpMethod)
+METHOD_CODES = {method: code for code, method in enumerate(METHODS)}
+PROTOCOLS = list(Protocol)
+PROTOCOL_CODES = {protocol: code for code, protocol in enumerate(PROTOCOLS)}
+
+U8 = struct.Struct("<B")
+U16 = struct.Struct("<H")
+U32 = struct.Struct("<I")
+TIMESTAMP = struct.Struct("<qi")
+
+# Value kinds of multi-valued entries, optional strings and timestamps
+NONE = 0
+SINGLE = 1
+LIST = 2
+SAME_AS_PATHNAME = 3
+BYTES = 4
+
+NAIVE = 1
+AWARE = 2
+
+EPOCH = datetime(1970, 1, 1)
+EPOCH_UTC = datetime(1970, 1, 1, tzinfo=timezone.utc)
+MICROSECOND = timedelta(microseconds=1)
+
+
+class BinaryFormatException(Exception):
+    pass
+
+
+class _Encoder:
+    """Encodes exchanges, collecting string table records for new strings."""
+
+    def __init__(self, max_strings: int = DEFAULT_MAX_STRINGS):
+        self.max_strings = max_strings
+        self.strings: Dict[str, int] = {}
+        self.new_strings = bytearray()
+
+    def string_id(self, value: str) -> bytes:
+        string_id = self.strings.get(value, None)
+        if string_id is None:
+            string_id = len(self.strings)
+            self.strings[value] = string_id
+            data = value.encode("utf-8")
+            self.new_strings += RECORD_HEADER.pack(RECORD_STRING, len(data))
+            self.new_strings += data
+        return U32.pack(string_id)
+
+    def multi_map(self, out: bytearray, mapping: Any):
+        out += U32.pack(len(mapping))
+        for key, value in mapping.items():
+            out += self.string_id(key)
+            if isinstance(value, str):
+                out += U8.pack(SINGLE)
+                out += self.string_id(value)
+            else:
+                out += U8.pack(LIST)
+                out += U32.pack(len(value))
+                for item in value:
+                    out += self.string_id(item)
+
+    @staticmethod
+    def optional_bytes(out: bytearray, value: Optional[Body]):
+        if value is None:
+            out += U8.pack(NONE)
+        elif isinstance(value, bytes):
+            out += U8.pack(BYTES)
+            out += U32.pack(len(value))
+            out += value
+        else:
+            data = value.encode("utf-8")
+            out += U8.pack(SINGLE)
+            out += U32.pack(len(data))
+            out += data
+
+    @staticmethod
+    def timestamp(out: bytearray, value: Optional[datetime]):
+        if value is None:
+            out += U8.pack(NONE)
+            return
+        offset = value.utcoffset()
+        if offset is None:
+            out += U8.pack(NAIVE)
+            out += TIMESTAMP.pack((value - EPOCH) // MICROSECOND, 0)
+        else:
+            out += U8.pack(AWARE)
+            out += TIMESTAMP.pack(
+                (value - EPOCH_UTC) // MICROSECOND, offset // timedelta(seconds=1)
+            )
+
+    def exchange(self, exchange: HttpExchange) -> bytes:
+        """Encode an exchange into string records followed by an exchange record."""
+        if len(self.strings) >= self.max_strings:
+            # Only between exchanges, as the strings of an exchange must all
+            # be in the table when it is read
+            self.strings.clear()
+            self.new_strings += RECORD_HEADER.pack(RECORD_RESET, 0)
+        request = exchange.request
+        response = exchange.response
+        out = bytearray()
+        out += U8.pack(METHOD_CODES[request.method])
+        out += U8.pack(PROTOCOL_CODES[request.protocol])
+        out += self.string_id(request.host)
+        out += self.string_id(request.pathname)
+        if request.path == request.pathname:
+            out += U8.pack(SAME_AS_PATHNAME)
+        else:
+            self.optional_bytes(out, request.path)
+        self.multi_map(out, request.query)
+        self.multi_map(out, request.headers)
+        self.optional_bytes(out, request.body)
+        self.timestamp(out, request.timestamp)
+
+        out += U16.pack(response.statusCode)
+        self.multi_map(out, response.headers)
+        self.optional_bytes(out, response.body)
+        self.timestamp(out, response.timestamp)
+
+        self.optional_bytes(
+            out,
+            (
+                None
+                if exchange.meta is None
+                else json.dumps(
+                    exchange.meta, separators=(",", ":"), default=json_serial
+                )
+            ),
+        )
+
+        record = self.new_strings + RECORD_HEADER.pack(RECORD_EXCHANGE, len(out)) + out
+        self.new_strings = bytearray()
+        return bytes(record)
+
+
+class _Decoder:
+    """Decodes exchange records using the string table read so far."""
+
+    def __init__(self):
+        self.strings: List[str] = []
+        self.data = b""
+        self.position = 0
+
+    def u8(self) -> int:
+        value = self.data[self.position]
+        self.position += 1
+        return value
+
+    def u32(self) -> int:
+        (value,) = U32.unpack_from(self.data, self.position)
+        self.position += 4
+        return value
+
+    def string(self) -> str:
+        (string_id,) = U32.unpack_from(self.data, self.position)
+        self.position += 4
+        return self.strings[string_id]
+
+    def multi_map(self) -> Dict[str, Union[str, List[str]]]:
+        mapping: Dict[str, Union[str, List[str]]] = {}
+        for _ in range(self.u32()):
+            key = self.string()
+            if self.u8() == SINGLE:
+                mapping[key] = self.string()
+            else:
+                mapping[key] = [self.string() for _ in range(self.u32())]
+        return mapping
+
+    def optional_bytes(self) -> Optional[Body]:
+        kind = self.u8()
+        if kind == NONE:
+            return None
+        length = self.u32()
+        start = self.position
+        self.position += length
+        if kind == BYTES:
+            return self.data[start : self.position]
+        return self.data[start : self.position].decode("utf-8")
+
+    def timestamp(self) -> Optional[datetime]:
+        kind = self.u8()
+        if kind == NONE:
+            return None
+        micros, offset = TIMESTAMP.unpack_from(self.data, self.position)
+        self.position += TIMESTAMP.size
+        if kind == NAIVE:
+            return EPOCH + micros * MICROSECOND
+        return (EPOCH_UTC + micros * MICROSECOND).astimezone(
+            timezone(timedelta(seconds=offset))
+        )
+
+    def exchange(self, data: bytes) -> HttpExchange:
+        self.data = data
+        self.position = 0
+        method = METHODS[self.u8()]
+        protocol = PROTOCOLS[self.u8()]
+        host = self.string()
+        pathname = self.string()
+        if self.data[self.position] == SAME_AS_PATHNAME:
+            self.position += 1
+            path: Optional[str] = pathname
+        else:
+            path = cast(Optional[str], self.optional_bytes())
+        query = HttpQuery(self.multi_map())
+        request_headers = HttpHeaders(self.multi_map())
+        request_body = self.optional_bytes()
+        request = Request(
+            method=method,
+            protocol=protocol,
+            host=host,
+            pathname=pathname,
+            path=path,  # type: ignore
+            query=query,
+            headers=request_headers,
+            body=request_body,
+            bodyAsJson=lazy_body_as_json(request_body, request_headers),
+            timestamp=self.timestamp(),
+        )
+
+        (status_code,) = U16.unpack_from(self.data, self.position)
+        self.position += 2
+        response_headers = HttpHeaders(self.multi_map())
+        response_body = self.optional_bytes()
+        response = Response(
+            statusCode=status_code,
+            headers=response_headers,
+            body=response_body,  # type: ignore
+            bodyAsJson=lazy_body_as_json(response_body, response_headers),
+            timestamp=self.timestamp(),
+        )
+
+        meta = self.optional_bytes()
+        if meta is None:
+            return HttpExchange(request=request, response=response)
+        return HttpExchange(request=request, response=response, meta=json.loads(meta))
+
+
+class BinaryHttpExchangeWriter:
+    def __init__(self, output: IO[bytes], max_strings: int = DEFAULT_MAX_STRINGS):
+        """Create a writer of HTTP exchanges in the binary recording format.
+
+        The file header is written immediately.
+
+        Arguments:
+            output: {IO[bytes]} -- The binary output to write to.
+
+        Keyword Arguments:
+            max_strings: {int} -- Number of strings in the string table after
+                which it is emptied, bounding the memory of the writer and of
+                readers. A single exchange can add more. (default: {100000})
+        """
+        self.output = output
+        self.encoder = _Encoder(max_strings)
+        self.output.write(FILE_HEADER.pack(MAGIC, VERSION))
+
+    def write(self, exchange: HttpExchange):
+        """Write a single HTTP exchange to the output.
+
+        Arguments:
+            exchange: {HttpExchange} -- The exchange to write.
+        """
+        self.output.write(self.encoder.exchange(exchange))
+
+    def write_many(self, exchanges: Iterable[HttpExchange]):
+        """Write HTTP exchanges to the output.
+
+        Arguments:
+            exchanges: {Iterable[HttpExchange]} -- The exchanges to write.
+        """
+        for exchange in exchanges:
+            self.write(exchange)
+
+    def flush(self):
+        self.output.flush()
+
+    def __enter__(self) -> "BinaryHttpExchangeWriter":
+        return self
+
+    def __exit__(self, *exc_info):
+        self.flush()
+
+
+class BinaryHttpExchangeReader:
+    def __init__(self):
+        raise Exception("Do not instantiate")
+
+    @staticmethod
+    def read_records(input_file: IO[bytes]) -> Generator[Tuple[int, bytes], None, None]:
+        """Read the raw (type, payload) records of a binary recording."""
+        header = input_file.read(FILE_HEADER.size)
+        if len(header) != FILE_HEADER.size:
+            raise BinaryFormatException("Missing file header")
+        magic, version = FILE_HEADER.unpack(header)
+        if magic != MAGIC:
+            raise BinaryFormatException("Not a binary HTTP exchange recording")
+        if version != VERSION:
+            raise BinaryFormatException("Unsupported version: {}".format(version))
+        while True:
+            record_header = input_file.read(RECORD_HEADER.size)
+            if not record_header:
+                return
+            if len(record_header) != RECORD_HEADER.size:
+                raise BinaryFormatException("Truncated record header")
+            record_type, length = RECORD_HEADER.unpack(record_header)
+            payload = input_file.read(length)
+            if len(payload) != length:
+                raise BinaryFormatException("Truncated record")
+            yield record_type, payload
+
+    @staticmethod
+    def from_binary(input_file: IO[bytes]) -> Generator[HttpExchange, None, None]:
+        """Read HTTP exchanges from a binary recording.
+
+        Arguments:
+            input_file: {IO[bytes]} -- The binary input to read from.
+        """
+        decoder = _Decoder()
+        for record_type, payload in BinaryHttpExchangeReader.read_records(input_file):
+            if record_type == RECORD_STRING:
+                decoder.strings.append(payload.decode("utf-8"))
+            elif record_type == RECORD_EXCHANGE:
+                yield decoder.exchange(payload)
+            elif record_type == RECORD_RESET:
+                decoder.strings.clear()
+            else:
+                raise BinaryFormatException(
+                    "Unknown record type: {}".format(record_type)
+                )
+
+
+def jsonl_to_binary(input_file: IO, output: IO[bytes]) -> int:
+    """Convert a JSONL recording to the binary format.
+
+    Arguments:
+        input_file {IO} -- JSONL input in text or binary mode.
+        output {IO[bytes]} -- Binary output.
+
+    Returns:
+        int -- Number of converted exchanges.
+    """
+    writer = BinaryHttpExchangeWriter(output)
+    count = 0
+    for line in input_file:
+        if line.strip():
+            writer.write(HttpExchangeReader.from_json(line))
+            count += 1
+    return count
+
+
+def binary_to_jsonl(input_file: IO[bytes], output: IO[str]) -> int:
+    """Convert a binary recording to JSONL.
+
+    Arguments:
+        input_file {IO[bytes]} -- Binary input.
+        output {IO[str]} -- JSONL output in text mode.
+
+    Returns:
+        int -- Number of converted exchanges.
+    """
+    writer = HttpExchangeWriter(output)
+    count = 0
+    for exchange in BinaryHttpExchangeReader.from_binary(input_file):
+        writer.write(exchange)
+        count += 1
+    return count
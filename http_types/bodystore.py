@@ -0,0 +1,138 @@
+import os
+from typing import Set, Union
+from http_types.types import Body, PendingBody
+
+__all__ = ["BodyStore", "StoredBody"]
+
+PathType = Union[str, "os.PathLike[str]"]
+
+"""
+Default size in bytes from which HttpExchangeWriter moves bodies to its body store.
+"""
+DEFAULT_BODY_THRESHOLD = 4096
+
+"""
+Encodings of stored bodies in recordings. The body field holds the SHA-256
+digest of the body, which is in the body store as binary data or UTF-8 text.
+"""
+STORED_BINARY = "sha256"
+STORED_TEXT = "sha256-utf8"
+
+
+class BodyStore:
+    """Content-addressed store of bodies in a directory.
+
+    Each body is kept once in a file named by the SHA-256 digest of its
+    contents, however many exchanges it appears in. Recordings written with a
+    body store hold the digest in place of the body, and readers given the
+    same store load bodies from it only when they are accessed.
+    """
+
+    def __init__(self, directory: PathType):
+        """
+        Arguments:
+            directory {PathType} -- Directory of the store, created if missing.
+        """
+        self.directory = os.fspath(directory)
+        os.makedirs(self.directory, exist_ok=True)
+        # Digests known to be in the store, which are not written again
+        self.known: Set[str] = set()
+
+    @staticmethod
+    def for_recording(path: PathType) -> "BodyStore":
+        """Body store next to a recording, as in 'recording.jsonl.bodies'.
+
+        Arguments:
+            path {PathType} -- Path to the recording.
+        """
+        return BodyStore(os.fspath(path) + ".bodies")
+
+    def path(self, key: str) -> str:
+        """Path of the file holding a body, in a subdirectory named by the
+        first two characters of its digest."""
+        return os.path.join(self.directory, key[:2], key[2:])
+
+    def put(self, data: bytes) -> str:
+        """Add a body to the store unless it is already there.
+
+        Arguments:
+            data {bytes} -- Body to store.
+
+        Returns:
+            str -- Hexadecimal SHA-256 digest of the body, its key in the store.
+        """
+        # Imported here, as only writing needs them
+        import hashlib
+        import tempfile
+
+        key = hashlib.sha256(data).hexdigest()
+        if key in self.known:
+            return key
+        path = self.path(key)
+        if not os.path.exists(path):
+            subdirectory = os.path.dirname(path)
+            os.makedirs(subdirectory, exist_ok=True)
+            # Write to a temporary file first, so readers and concurrent
+            # writers never see a partial body
+            fd, temporary = tempfile.mkstemp(dir=subdirectory)
+            try:
+                with os.fdopen(fd, "wb") as f:
+                    f.write(data)
+                os.replace(temporary, path)
+            except BaseException:
+                os.unlink(temporary)
+                raise
+        self.known.add(key)
+        return key
+
+    def get(self, key: str) -> bytes:
+        """Read a body from the store.
+
+        Arguments:
+            key {str} -- Digest returned by put().
+
+        Raises:
+            KeyError: If the body is not in the store.
+        """
+        try:
+            with open(self.path(key), "rb") as f:
+                return f.read()
+        except FileNotFoundError:
+            raise KeyError(key) from None
+
+    def __contains__(self, key: object) -> bool:
+        return isinstance(key, str) and (
+            key in self.known or os.path.exists(self.path(key))
+        )
+
+    def __reduce__(self):
+        return (BodyStore, (self.directory,))
+
+    def __repr__(self) -> str:
+        return "BodyStore({!r})".format(self.directory)
+
+
+class StoredBody(PendingBody):
+    """
+    Body in a body store, read from the store on first access.
+    """
+
+    __slots__ = ("store", "key", "text")
+
+    def __init__(self, store: BodyStore, key: str, text: bool):
+        """
+        Arguments:
+            store {BodyStore} -- Store holding the body.
+            key {str} -- Digest of the body.
+            text {bool} -- Decode the body as UTF-8 text.
+        """
+        self.store = store
+        self.key = key
+        self.text = text
+
+    def load(self) -> Body:
+        data = self.store.get(self.key)
+        return data.decode("utf-8") if self.text else data
+
+    def __reduce__(self):
+        return (StoredBody, (self.store, self.key, self.text))
@@ -0,0 +1,225 @@
+import bz2
+import gzip
+import io
+import lzma
+import os
+import struct
+import zlib
+from typing import IO, Any, List, Optional, Tuple, Union
+
+__all__ = ["BlockGzipFile", "detect_compression", "open_recording"]
+
+PathType = Union[str, "os.PathLike[str]"]
+
+"""
+Magic bytes at the start of files in each supported compression format.
+"""
+MAGIC_BYTES = {
+    "gzip": b"\x1f\x8b",
+    "bz2": b"BZh",
+    "xz": b"\xfd7zXZ\x00",
+}
+
+EXTENSIONS = {".gz": "gzip", ".bz2": "bz2", ".xz": "xz"}
+
+"""
+Default amount of uncompressed data in one block of a BlockGzipFile.
+"""
+DEFAULT_BLOCK_SIZE = 1024 * 1024
+
+# Gzip member header with the FEXTRA flag set, followed by the extra field
+# length and a single 'HT' subfield storing the total size of the member.
+GZIP_HEADER = struct.Struct("<BBBBIBBH2sHI")
+GZIP_TRAILER = struct.Struct("<II")
+FEXTRA = 4
+BLOCK_SUBFIELD = b"HT"
+
+
+def detect_compression(path: PathType) -> Optional[str]:
+    """Detect the compression format of a file from its magic bytes.
+
+    Returns:
+        Optional[str] -- 'gzip', 'bz2', 'xz' or None for uncompressed files.
+    """
+    with open(path, "rb") as f:
+        header = f.read(6)
+    for compression, magic in MAGIC_BYTES.items():
+        if header.startswith(magic):
+            return compression
+    return None
+
+
+def compression_from_extension(path: PathType) -> Optional[str]:
+    """Compression format implied by a file name, as in 'recording.jsonl.gz'."""
+    return EXTENSIONS.get(os.path.splitext(os.fspath(path))[1].lower(), None)
+
+
+def open_recording(
+    path: PathType,
+    mode: str = "rb",
+    compression: Optional[str] = "infer",
+    block_size: int = DEFAULT_BLOCK_SIZE,
+) -> IO:
+    """Open a possibly compressed recording, decompressing or compressing as a stream.
+
+    When reading, the format is detected from the magic bytes of the file.
+    When writing, it is inferred from the file extension unless given. Gzip
+    recordings are written as a BlockGzipFile.
+
+    Arguments:
+        path {PathType} -- Path to the recording.
+
+    Keyword Arguments:
+        mode {str} -- One of 'rb', 'rt', 'wb', 'wt', 'ab' or 'at'. (default: {'rb'})
+        compression {Optional[str]} -- 'gzip', 'bz2', 'xz', None for no compression
+            or 'infer'. (default: {'infer'})
+        block_size {int} -- Uncompressed size of gzip blocks when writing.
+    """
+    if mode not in ("rb", "rt", "wb", "wt", "ab", "at"):
+        raise ValueError("Invalid mode: {}".format(mode))
+    reading = mode[0] == "r"
+    if compression == "infer":
+        compression = (
+            detect_compression(path) if reading else compression_from_extension(path)
+        )
+    text = mode[1] == "t"
+    if compression is None:
+        return open(path, mode, encoding="utf-8") if text else open(path, mode)
+    if compression == "gzip":
+        if reading:
+            stream: Any = gzip.open(path, "rb")
+        else:
+            stream = BlockGzipFile(open(path, mode[0] + "b"), block_size=block_size)
+    elif compression == "bz2":
+        stream = bz2.open(path, mode[0] + "b")
+    elif compression == "xz":
+        stream = lzma.open(path, mode[0] + "b")
+    else:
+        raise ValueError("Unknown compression: {}".format(compression))
+    if text:
+        return io.TextIOWrapper(stream, encoding="utf-8", write_through=True)
+    return stream
+
+
+def compress_block(data: bytes, level: int = 6) -> bytes:
+    """Compress data into a single gzip member that records its own size."""
+    compressor = zlib.compressobj(level, zlib.DEFLATED, -zlib.MAX_WBITS)
+    deflated = compressor.compress(data) + compressor.flush()
+    size = GZIP_HEADER.size + len(deflated) + GZIP_TRAILER.size
+    header = GZIP_HEADER.pack(
+        0x1F, 0x8B, 8, FEXTRA, 0, 0, 255, 8, BLOCK_SUBFIELD, 4, size
+    )
+    trailer = GZIP_TRAILER.pack(zlib.crc32(data), len(data) & 0xFFFFFFFF)
+    return header + deflated + trailer
+
+
+def gzip_block_ranges(path: PathType) -> Optional[List[Tuple[int, int]]]:
+    """Byte ranges of the blocks in a file written by BlockGzipFile.
+
+    Only block headers are read, so this is cheap even for large files.
+
+    Returns:
+        Optional[List[Tuple[int, int]]] -- (start, end) of every block, or None if the
+            file is not a sequence of blocks.
+    """
+    ranges = []
+    size = os.path.getsize(path)
+    with open(path, "rb") as f:
+        start = 0
+        while start < size:
+            f.seek(start)
+            header = f.read(GZIP_HEADER.size)
+            if len(header) != GZIP_HEADER.size:
+                return None
+            fields = GZIP_HEADER.unpack(header)
+            magic1, magic2, _, flags, _, _, _, xlen, subfield, length, block = fields
+            if (
+                (magic1, magic2) != (0x1F, 0x8B)
+                or flags != FEXTRA
+                or (xlen, subfield, length) != (8, BLOCK_SUBFIELD, 4)
+                or start + block > size
+            ):
+                return None
+            ranges.append((start, start + block))
+            start += block
+    return ranges
+
+
+def read_gzip_block(path: PathType, block: Tuple[int, int]) -> bytes:
+    """Decompress a single block of a file written by BlockGzipFile."""
+    start, end = block
+    with open(path, "rb") as f:
+        f.seek(start)
+        return gzip.decompress(f.read(end - start))
+
+
+class BlockGzipFile(io.BufferedIOBase):
+    """Writable gzip stream made of independently compressed blocks.
+
+    Each block is a complete gzip member holding whole lines, so the file is
+    readable by any gzip decompressor. The size of every member is stored in
+    its header, which lets readers find block boundaries without
+    decompressing and read blocks in parallel.
+    """
+
+    def __init__(
+        self, output: IO[bytes], block_size: int = DEFAULT_BLOCK_SIZE, level: int = 6
+    ):
+        """
+        Arguments:
+            output {IO[bytes]} -- Binary file to write compressed blocks to. Closed with this stream.
+
+        Keyword Arguments:
+            block_size {int} -- Uncompressed size after which a block is written.
+            level {int} -- zlib compression level.
+        """
+        self.output = output
+        self.block_size = block_size
+        self.level = level
+        self.pending = bytearray()
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:  # type: ignore
+        self.pending += data
+        while len(self.pending) >= self.block_size and self.write_block(
+            self.block_size
+        ):
+            pass
+        return len(data)
+
+    def write_block(
+        self, limit: Optional[int] = None, whole_lines: bool = True
+    ) -> bool:
+        """Compress pending data into a block.
+
+        Keyword Arguments:
+            limit {Optional[int]} -- Preferred maximum size of the block. Exceeded
+                only if the first pending line is longer.
+            whole_lines {bool} -- End the block at a line boundary.
+
+        Returns:
+            bool -- True if a block was written.
+        """
+        if not whole_lines:
+            end = len(self.pending)
+        else:
+            end = self.pending.rfind(b"\n", 0, limit) + 1
+            if end == 0 and limit is not None:
+                end = self.pending.find(b"\n", limit) + 1
+        if end == 0:
+            return False
+        self.output.write(compress_block(bytes(self.pending[:end]), self.level))
+        del self.pending[:end]
+        return True
+
+    def flush(self):
+        self.write_block()
+        self.output.flush()
+
+    def close(self):
+        if not self.closed:
+            self.write_block(whole_lines=False)
+            super().close()
+            self.output.close()
@@ -0,0 +1,155 @@
+import re
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional, Pattern, Tuple, Union
+from http_types.types import HttpMethod
+from http_types.utils import parse_iso860_datetime, parse_path
+
+__all__ = ["ExchangeFilter"]
+
+Line = Union[str, bytes]
+
+
+def _needles(value: str, suffix: str = '"') -> Optional[List[str]]:
+    """Texts one of which appears verbatim in any JSON encoding of a string
+    that is or, with an empty suffix, starts with the value.
+
+    Slashes may be escaped by JSON encoders, so both forms are included.
+    Returns None if the value contains other characters that encoders may
+    escape, in which case it cannot be searched for in raw lines.
+    """
+    if not all(" " <= char <= "~" and char not in '"\\' for char in value):
+        return None
+    needles = ['"' + value + suffix]
+    if "/" in value:
+        needles.append('"' + value.replace("/", "\\/") + suffix)
+    return needles
+
+
+class ExchangeFilter:
+    """Selects exchanges before they are built.
+
+    All given criteria must match. Readers check each line first with
+    matches_line(), a substring search that never rejects a matching record,
+    then decode it and check the dictionary with matches(), and only build
+    exchanges for records that pass both. Rejected records are never built,
+    and their bodies and timestamps are never decoded.
+    """
+
+    def __init__(
+        self,
+        methods: Optional[Iterable[Union[HttpMethod, str]]] = None,
+        hosts: Optional[Iterable[str]] = None,
+        pathname_prefix: Optional[str] = None,
+        pathname_pattern: Union[str, Pattern[str], None] = None,
+        status_min: Optional[int] = None,
+        status_max: Optional[int] = None,
+        since: Optional[datetime] = None,
+        until: Optional[datetime] = None,
+    ):
+        """
+        Keyword Arguments:
+            methods {Optional[Iterable[Union[HttpMethod, str]]]} -- Accepted request methods.
+            hosts {Optional[Iterable[str]]} -- Accepted request hosts, including any port.
+            pathname_prefix {Optional[str]} -- Prefix of the request pathname.
+            pathname_pattern {Union[str, Pattern[str], None]} -- Regular expression
+                searched for in the request pathname.
+            status_min {Optional[int]} -- Lowest accepted status code, inclusive.
+            status_max {Optional[int]} -- Highest accepted status code, inclusive.
+            since {Optional[datetime]} -- Earliest request timestamp, inclusive.
+            until {Optional[datetime]} -- Latest request timestamp, exclusive.
+                Exchanges without a request timestamp are rejected if since or
+                until is given. Both must be aware if the recording's
+                timestamps have offsets, and naive otherwise.
+        """
+        self.methods = (
+            None
+            if methods is None
+            else frozenset(HttpMethod(method).value for method in methods)
+        )
+        self.hosts = None if hosts is None else frozenset(hosts)
+        self.pathname_prefix = pathname_prefix
+        self.pathname_pattern = (
+            None if pathname_pattern is None else re.compile(pathname_pattern)
+        )
+        self.status_min = status_min
+        self.status_max = status_max
+        self.since = since
+        self.until = until
+
+        # Each group of needles must have at least one member in a matching line
+        groups: List[List[Optional[List[str]]]] = []
+        if self.methods is not None:
+            groups.append([_needles(method) for method in self.methods])
+        if self.hosts is not None:
+            groups.append([_needles(host) for host in self.hosts])
+        if pathname_prefix is not None:
+            groups.append([_needles(pathname_prefix, "")])
+        self.needles: Tuple[Tuple[str, ...], ...] = tuple(
+            tuple(needle for needles in group for needle in needles)  # type: ignore
+            for group in groups
+            if all(needles is not None for needles in group)
+        )
+        self.byte_needles = tuple(
+            tuple(needle.encode("utf-8") for needle in group) for group in self.needles
+        )
+
+    def matches_line(self, line: Line) -> bool:
+        """Check if a raw JSONL line could hold a matching exchange.
+
+        Arguments:
+            line {Line} -- Line as text or bytes.
+
+        Returns:
+            bool -- False only if the exchange certainly does not match.
+        """
+        groups: Any = self.byte_needles if isinstance(line, bytes) else self.needles
+        for group in groups:
+            for needle in group:
+                if needle in line:
+                    break
+            else:
+                return False
+        return True
+
+    def matches(self, obj: Dict) -> bool:
+        """Check if an exchange in the HTTP types format matches.
+
+        Arguments:
+            obj {Dict} -- Exchange as decoded from JSON.
+        """
+        request = obj["request"]
+        if self.methods is not None and request.get("method") not in self.methods:
+            return False
+        if self.hosts is not None and request.get("host") not in self.hosts:
+            return False
+        if self.pathname_prefix is not None or self.pathname_pattern is not None:
+            pathname = request.get("pathname", None)
+            if pathname is None:
+                pathname = parse_path(request.get("path", None) or "")[0]
+            if self.pathname_prefix is not None and not pathname.startswith(
+                self.pathname_prefix
+            ):
+                return False
+            if (
+                self.pathname_pattern is not None
+                and self.pathname_pattern.search(pathname) is None
+            ):
+                return False
+        if self.status_min is not None or self.status_max is not None:
+            status_code = obj["response"].get("statusCode", None)
+            if status_code is None:
+                return False
+            if self.status_min is not None and status_code < self.status_min:
+                return False
+            if self.status_max is not None and status_code > self.status_max:
+                return False
+        if self.since is not None or self.until is not None:
+            timestamp = request.get("timestamp", None)
+            if timestamp is None:
+                return False
+            parsed = parse_iso860_datetime(timestamp)
+            if self.since is not None and parsed < self.since:
+                return False
+            if self.until is not None and parsed >= self.until:
+                return False
+        return True
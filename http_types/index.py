@@ -0,0 +1,368 @@
+import json
+import os
+import struct
+import sys
+import zlib
+from array import array
+from typing import (
+    IO,
+    Any,
+    Dict,
+    Iterator,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+    Union,
+)
+from http_types.types import HttpExchange
+from http_types.utils import HttpExchangeReader, parse_pathname
+
+__all__ = ["HttpExchangeIndex", "IndexedHttpExchangeReader"]
+
+PathType = Union[str, "os.PathLike[str]"]
+
+"""
+Keys that can be stored for each record in an index.
+"""
+KEY_FIELDS = ("method", "host", "pathname", "status", "timestamp")
+
+MAGIC = b"HTIX"
+VERSION = 2
+FLAG_KEYS = 1
+
+# magic, version, flags, number of records, size of the recording in bytes,
+# modification time of the recording in nanoseconds, CRC-32 of its last block
+HEADER = struct.Struct("<4sHHQQqI")
+
+"""
+Size of the block at the end of a recording whose checksum is stored in its
+index, to detect a recording rewritten with the same size and time.
+"""
+TAIL_BLOCK_SIZE = 4096
+
+
+def default_index_path(recording_path: PathType) -> str:
+    """Path of the sidecar index for a recording, as in 'recording.jsonl.idx'."""
+    return os.fspath(recording_path) + ".idx"
+
+
+def tail_checksum(f: IO[bytes], size: int) -> int:
+    """CRC-32 of the last block of a file of the given size."""
+    f.seek(max(0, size - TAIL_BLOCK_SIZE))
+    return zlib.crc32(f.read(TAIL_BLOCK_SIZE))
+
+
+def record_keys(record: Dict, key_fields: Sequence[str]) -> List[Any]:
+    """Extract index keys from a decoded JSON record without building an exchange.
+
+    Arguments:
+        record {Dict} -- Exchange decoded from JSON.
+        key_fields {Sequence[str]} -- Keys to extract, from KEY_FIELDS.
+    """
+    request = record.get("request", {})
+    response = record.get("response", {})
+    keys: List[Any] = []
+    for field in key_fields:
+        if field == "method":
+            keys.append(request.get("method"))
+        elif field == "host":
+            keys.append(request.get("host"))
+        elif field == "pathname":
+            pathname = request.get("pathname")
+            if pathname is None and request.get("path") is not None:
+                pathname = parse_pathname(request["path"])
+            keys.append(pathname)
+        elif field == "status":
+            keys.append(response.get("statusCode"))
+        elif field == "timestamp":
+            keys.append(request.get("timestamp"))
+        else:
+            raise ValueError("Unknown index key: {}".format(field))
+    return keys
+
+
+def _little_endian(offsets: "array[int]") -> "array[int]":
+    if sys.byteorder == "big":
+        offsets = array("Q", offsets)
+        offsets.byteswap()
+    return offsets
+
+
+class HttpExchangeIndex:
+    """Byte offsets of the records in a JSONL recording, with optional per-record keys.
+
+    Record n spans the bytes offsets[n] to offsets[n + 1] of the recording.
+    """
+
+    def __init__(
+        self,
+        offsets: "array[int]",
+        recording_size: int,
+        key_fields: Sequence[str] = (),
+        keys: Optional[List[List[Any]]] = None,
+        recording_mtime: int = 0,
+        recording_checksum: int = 0,
+    ):
+        """
+        Arguments:
+            offsets {array} -- Start offset of every record followed by the end of the last record.
+            recording_size {int} -- Size of the indexed recording, used to detect stale indexes.
+
+        Keyword Arguments:
+            key_fields {Sequence[str]} -- Names of the stored keys.
+            keys {Optional[List[List[Any]]]} -- Stored keys for each record.
+            recording_mtime {int} -- Modification time of the indexed recording in
+                nanoseconds, used to detect stale indexes.
+            recording_checksum {int} -- CRC-32 of the last block of the indexed
+                recording, used to detect stale indexes.
+        """
+        self.offsets = offsets
+        self.recording_size = recording_size
+        self.key_fields = tuple(key_fields)
+        self.keys = keys
+        self.recording_mtime = recording_mtime
+        self.recording_checksum = recording_checksum
+
+    @staticmethod
+    def build(
+        recording_path: PathType, key_fields: Sequence[str] = ()
+    ) -> "HttpExchangeIndex":
+        """Index a JSONL recording. Blank lines are not counted as records.
+
+        Arguments:
+            recording_path {PathType} -- Path to the recording.
+
+        Keyword Arguments:
+            key_fields {Sequence[str]} -- Keys to store for each record, from
+                'method', 'host', 'pathname', 'status' and 'timestamp'.
+                Storing keys requires decoding every record.
+        """
+        offsets = array("Q")
+        keys: Optional[List[List[Any]]] = [] if key_fields else None
+        position = 0
+        with open(recording_path, "rb") as f:
+            mtime = os.fstat(f.fileno()).st_mtime_ns
+            for line in f:
+                if line.strip():
+                    offsets.append(position)
+                    if keys is not None:
+                        keys.append(record_keys(json.loads(line), key_fields))
+                position += len(line)
+            checksum = tail_checksum(f, position)
+        offsets.append(position)
+        return HttpExchangeIndex(offsets, position, key_fields, keys, mtime, checksum)
+
+    @staticmethod
+    def load(index_path: PathType) -> "HttpExchangeIndex":
+        """Read an index written with write()."""
+        with open(index_path, "rb") as f:
+            header = f.read(HEADER.size)
+            if len(header) != HEADER.size:
+                raise ValueError("Truncated index file: {}".format(index_path))
+            (
+                magic,
+                version,
+                flags,
+                count,
+                recording_size,
+                recording_mtime,
+                recording_checksum,
+            ) = HEADER.unpack(header)
+            if magic != MAGIC or version != VERSION:
+                raise ValueError("Not an index file: {}".format(index_path))
+            offsets = array("Q")
+            offsets.fromfile(f, count + 1)
+            offsets = _little_endian(offsets)
+            key_fields: Sequence[str] = ()
+            keys = None
+            if flags & FLAG_KEYS:
+                stored = json.loads(f.read())
+                key_fields = stored["fields"]
+                keys = stored["keys"]
+        return HttpExchangeIndex(
+            offsets,
+            recording_size,
+            key_fields,
+            keys,
+            recording_mtime,
+            recording_checksum,
+        )
+
+    def matches(self, recording_path: PathType) -> bool:
+        """Check that the recording is the one indexed: that it has the same
+        size, modification time and checksum of its last block."""
+        with open(recording_path, "rb") as f:
+            stat = os.fstat(f.fileno())
+            return (
+                stat.st_size == self.recording_size
+                and stat.st_mtime_ns == self.recording_mtime
+                and tail_checksum(f, stat.st_size) == self.recording_checksum
+            )
+
+    def write(self, index_path: PathType):
+        """Write the index to a sidecar file."""
+        flags = FLAG_KEYS if self.keys is not None else 0
+        with open(index_path, "wb") as f:
+            f.write(
+                HEADER.pack(
+                    MAGIC,
+                    VERSION,
+                    flags,
+                    len(self),
+                    self.recording_size,
+                    self.recording_mtime,
+                    self.recording_checksum,
+                )
+            )
+            _little_endian(self.offsets).tofile(f)
+            if self.keys is not None:
+                f.write(
+                    json.dumps(
+                        {"fields": self.key_fields, "keys": self.keys},
+                        separators=(",", ":"),
+                    ).encode("utf-8")
+                )
+
+    def span(self, n: int) -> Tuple[int, int]:
+        """Byte range (start, end) of record n."""
+        return self.offsets[n], self.offsets[n + 1]
+
+    def find(self, **criteria: Any) -> List[int]:
+        """Numbers of the records whose stored keys equal all given values.
+
+        Example: index.find(method="post", status=500)
+        """
+        if self.keys is None:
+            raise ValueError("Index was built without keys")
+        try:
+            positions = [(self.key_fields.index(k), v) for k, v in criteria.items()]
+        except ValueError:
+            raise ValueError(
+                "Index keys are {}, got {}".format(self.key_fields, list(criteria))
+            )
+        return [
+            n
+            for n, keys in enumerate(self.keys)
+            if all(keys[i] == value for i, value in positions)
+        ]
+
+    def __len__(self) -> int:
+        return len(self.offsets) - 1
+
+
+class IndexedHttpExchangeReader:
+    """Random access to the exchanges of a JSONL recording using an index.
+
+    Iterating the reader yields exchanges from the current position, which
+    can be moved with seek().
+    """
+
+    def __init__(self, input_file: IO[bytes], index: HttpExchangeIndex):
+        """
+        Arguments:
+            input_file {IO[bytes]} -- Recording opened in binary mode.
+            index {HttpExchangeIndex} -- Index of the recording.
+        """
+        self.input_file = input_file
+        self.index = index
+        self.position = 0
+
+    @staticmethod
+    def open(
+        recording_path: PathType,
+        index_path: Optional[PathType] = None,
+        key_fields: Sequence[str] = (),
+    ) -> "IndexedHttpExchangeReader":
+        """Open a recording with its sidecar index.
+
+        The index is built and written if it does not exist, cannot be read,
+        or does not match the size, modification time or last block of the
+        recording.
+
+        Arguments:
+            recording_path {PathType} -- Path to the recording.
+
+        Keyword Arguments:
+            index_path {Optional[PathType]} -- Path to the index. (default: recording path + '.idx')
+            key_fields {Sequence[str]} -- Keys to store when the index is built.
+        """
+        index_path = index_path or default_index_path(recording_path)
+        index = None
+        if os.path.exists(index_path):
+            try:
+                index = HttpExchangeIndex.load(index_path)
+            except (ValueError, EOFError):
+                # Truncated, or written by another version
+                index = None
+            if index is not None and (
+                not index.matches(recording_path)
+                or (key_fields and index.key_fields != tuple(key_fields))
+            ):
+                index = None
+        if index is None:
+            index = HttpExchangeIndex.build(recording_path, key_fields)
+            index.write(index_path)
+        return IndexedHttpExchangeReader(open(recording_path, "rb"), index)
+
+    def read(self, n: int) -> HttpExchange:
+        """Read exchange number n."""
+        if n < 0:
+            n += len(self)
+        if not 0 <= n < len(self):
+            raise IndexError("Exchange index out of range: {}".format(n))
+        start, end = self.index.span(n)
+        self.input_file.seek(start)
+        return HttpExchangeReader.from_json(self.input_file.read(end - start))
+
+    def read_range(self, start: int, stop: int) -> Iterator[HttpExchange]:
+        """Read exchanges start to stop (exclusive) with a single read."""
+        start, stop, _ = slice(start, stop).indices(len(self))
+        if start >= stop:
+            return
+        offsets = self.index.offsets
+        self.input_file.seek(offsets[start])
+        data = self.input_file.read(offsets[stop] - offsets[start])
+        base = offsets[start]
+        for n in range(start, stop):
+            yield HttpExchangeReader.from_json(
+                data[offsets[n] - base : offsets[n + 1] - base]
+            )
+
+    def seek(self, n: int):
+        """Move the position of the reader to exchange n."""
+        if not 0 <= n <= len(self):
+            raise IndexError("Exchange index out of range: {}".format(n))
+        self.position = n
+
+    def __getitem__(
+        self, key: Union[int, slice]
+    ) -> Union[HttpExchange, List[HttpExchange]]:
+        if isinstance(key, slice):
+            start, stop, step = key.indices(len(self))
+            if step == 1:
+                return list(self.read_range(start, stop))
+            return [self.read(n) for n in range(start, stop, step)]
+        return self.read(key)
+
+    def __len__(self) -> int:
+        return len(self.index)
+
+    def __iter__(self) -> "IndexedHttpExchangeReader":
+        return self
+
+    def __next__(self) -> HttpExchange:
+        if self.position >= len(self):
+            raise StopIteration
+        exchange = self.read(self.position)
+        self.position += 1
+        return exchange
+
+    def close(self):
+        self.input_file.close()
+
+    def __enter__(self) -> "IndexedHttpExchangeReader":
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
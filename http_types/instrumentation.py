@@ -0,0 +1,103 @@
+import time
+from dataclasses import dataclass
+from typing import Callable, Dict, Mapping, Optional
+
+__all__ = ["Instrumentation", "Stats"]
+
+"""
+Called with the name and value of every count and stage timing, for example
+("read.records", 1) or ("read.timestamp", 2.1e-06).
+"""
+Callback = Callable[[str, float], None]
+
+
+@dataclass(frozen=True)
+class Stats:
+    """
+    Counts and time per stage accumulated by an Instrumentation.
+
+    Counts are named "read.records", "read.bytes", "read.exchanges",
+    "read.filtered" and "read.failures" for readers, and "write.records",
+    "write.bytes" and "write.failures" for writers. Bytes are counted in
+    characters for text.
+
+    Stages are "read.json_decode", "read.filter", "read.validate",
+    "read.url", "read.body", "read.headers", "read.timestamp" and
+    "read.build" for readers and builders, and "write.serialize",
+    "write.json_encode" and "write.output" for writers. "read.validate"
+    is only timed in strict mode. Bodies are parsed as JSON when bodyAsJson
+    is first accessed, so read.body covers only decoding body fields.
+    """
+
+    counts: Mapping[str, int]
+    seconds: Mapping[str, float]
+
+    def total_seconds(self, prefix: str = "") -> float:
+        """Time spent in all stages whose names start with the prefix."""
+        return sum(
+            seconds
+            for stage, seconds in self.seconds.items()
+            if stage.startswith(prefix)
+        )
+
+
+class StageTimer:
+    """Times consecutive stages of one record."""
+
+    __slots__ = ("instrumentation", "last")
+
+    def __init__(self, instrumentation: "Instrumentation"):
+        self.instrumentation = instrumentation
+        self.last = instrumentation.clock()
+
+    def lap(self, stage: str):
+        """Charge the time since the previous lap to a stage."""
+        now = self.instrumentation.clock()
+        self.instrumentation.add_seconds(stage, now - self.last)
+        self.last = now
+
+
+class Instrumentation:
+    """Counts records, bytes and failures and accumulates time per stage.
+
+    Pass an instance to readers, builders and writers with the
+    instrumentation keyword argument. Without one, they do no measurements.
+    """
+
+    def __init__(
+        self,
+        callback: Optional[Callback] = None,
+        clock: Callable[[], float] = time.perf_counter,
+    ):
+        """
+        Keyword Arguments:
+            callback {Optional[Callback]} -- Called with the name and value of
+                every count and stage timing, to forward them to a metrics system.
+            clock {Callable[[], float]} -- Clock returning seconds. (default: time.perf_counter)
+        """
+        self.callback = callback
+        self.clock = clock
+        self.counts: Dict[str, int] = {}
+        self.seconds: Dict[str, float] = {}
+
+    def count(self, name: str, value: int = 1):
+        self.counts[name] = self.counts.get(name, 0) + value
+        if self.callback is not None:
+            self.callback(name, value)
+
+    def add_seconds(self, stage: str, seconds: float):
+        self.seconds[stage] = self.seconds.get(stage, 0.0) + seconds
+        if self.callback is not None:
+            self.callback(stage, seconds)
+
+    def timer(self) -> StageTimer:
+        """Start timing the stages of a record."""
+        return StageTimer(self)
+
+    def snapshot(self) -> Stats:
+        """Copy of the counts and times accumulated so far."""
+        return Stats(counts=dict(self.counts), seconds=dict(self.seconds))
+
+    def reset(self):
+        self.counts.clear()
+        self.seconds.clear()
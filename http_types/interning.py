@@ -0,0 +1,87 @@
+from typing import Dict, Tuple
+from http_types.types import Headers, HttpHeaders
+
+__all__ = ["Interner"]
+
+"""
+Default maximum number of entries in each table of an Interner.
+"""
+DEFAULT_MAX_SIZE = 100000
+
+
+class Interner:
+    """Shares equal strings and header mappings between exchanges.
+
+    Pass an Interner to the builders or to HttpExchangeReader to make all
+    exchanges built with it use a single copy of each host, pathname,
+    header name and header value, and a single HttpHeaders for each
+    distinct set of headers.
+
+    Each table holds at most max_size entries and is cleared when full, so
+    memory use stays bounded on recordings with unbounded variety.
+    """
+
+    def __init__(self, max_size: int = DEFAULT_MAX_SIZE):
+        """
+        Keyword Arguments:
+            max_size {int} -- Maximum number of entries in each table.
+        """
+        self.max_size = max_size
+        self.strings: Dict[str, str] = {}
+        self.header_maps: Dict[HttpHeaders, HttpHeaders] = {}
+
+    def string(self, value: str) -> str:
+        """Return the shared copy of a string."""
+        shared = self.strings.get(value, None)
+        if shared is None:
+            if len(self.strings) >= self.max_size:
+                self.strings.clear()
+            self.strings[value] = shared = value
+        return shared
+
+    def headers(self, headers: Headers) -> HttpHeaders:
+        """Return shared headers equal to the given headers."""
+        if not isinstance(headers, HttpHeaders):
+            headers = HttpHeaders(headers)
+        shared = self.header_maps.get(headers, None)
+        if shared is None:
+            if len(self.header_maps) >= self.max_size:
+                self.header_maps.clear()
+            string = self.string
+            shared = HttpHeaders(
+                {
+                    string(name): (
+                        string(value)
+                        if isinstance(value, str)
+                        else [string(item) for item in value]
+                    )
+                    for name, value in headers.items()
+                }
+            )
+            self.header_maps[shared] = shared
+        return shared
+
+    def fields(self, obj: Dict, keys: Tuple[str, ...] = ()):
+        """Intern the given string fields and the headers of a dictionary in place.
+
+        Arguments:
+            obj {Dict} -- Request or response dictionary.
+
+        Keyword Arguments:
+            keys {Tuple[str, ...]} -- Names of string fields to intern.
+        """
+        for key in keys:
+            value = obj.get(key, None)
+            if isinstance(value, str):
+                obj[key] = self.string(value)
+        headers = obj.get("headers", None)
+        if headers is not None:
+            obj["headers"] = self.headers(headers)
+
+    def clear(self):
+        """Drop all shared strings and mappings."""
+        self.strings.clear()
+        self.header_maps.clear()
+
+    def __len__(self) -> int:
+        return len(self.strings) + len(self.header_maps)
@@ -0,0 +1,123 @@
+import mmap
+import os
+import re
+from typing import Generator, Iterator, Optional, Union
+from http_types.types import HttpExchange
+from http_types.bodystore import BodyStore
+from http_types.instrumentation import Instrumentation
+from http_types.interning import Interner
+from http_types.utils import HttpExchangeReader
+from http_types.filtering import ExchangeFilter
+
+__all__ = ["MappedRecording"]
+
+PathType = Union[str, "os.PathLike[str]"]
+Buffer = Union[bytes, mmap.mmap]
+
+# Searched in place on the buffer, so that blank lines are skipped without
+# copying them
+NON_BLANK = re.compile(rb"\S")
+
+
+def iter_lines(
+    buffer: Buffer, start: int = 0, end: Optional[int] = None
+) -> Iterator[bytes]:
+    """Iterate over the non-blank lines in a byte range of a buffer.
+
+    Lines are returned without the trailing newline.
+
+    Arguments:
+        buffer {Buffer} -- Bytes or memory map to search.
+
+    Keyword Arguments:
+        start {int} -- Offset of the first line.
+        end {Optional[int]} -- End of the range, exclusive. (default: end of buffer)
+    """
+    if end is None:
+        end = len(buffer)
+    find = buffer.find
+    non_blank = NON_BLANK.search
+    position = start
+    while position < end:
+        newline = find(b"\n", position, end)
+        if newline == -1:
+            newline = end
+        if non_blank(buffer, position, newline) is not None:
+            yield buffer[position:newline]
+        position = newline + 1
+
+
+class MappedRecording:
+    """JSONL recording memory-mapped for reading.
+
+    Lines are located on the raw bytes of the mapping and handed to the JSON
+    decoder as bytes, without decoding the file to text first. The mapping is
+    backed by the page cache, so processes mapping the same file share memory.
+    """
+
+    def __init__(self, path: PathType):
+        """
+        Arguments:
+            path {PathType} -- Path to the recording.
+        """
+        self.path = path
+        self.size = os.path.getsize(path)
+        self.buffer: Optional[mmap.mmap] = None
+        if self.size > 0:
+            with open(path, "rb") as f:
+                self.buffer = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+    def lines(self, start: int = 0, end: Optional[int] = None) -> Iterator[bytes]:
+        """Iterate over the non-blank lines in a byte range of the recording."""
+        if self.buffer is None:
+            return iter(())
+        return iter_lines(self.buffer, start, end)
+
+    def exchanges(
+        self,
+        start: int = 0,
+        end: Optional[int] = None,
+        slotted: bool = False,
+        interner: Optional[Interner] = None,
+        where: Optional[ExchangeFilter] = None,
+        body_store: Optional[BodyStore] = None,
+        instrumentation: Optional[Instrumentation] = None,
+        strict: bool = False,
+    ) -> Generator[HttpExchange, None, None]:
+        """Read the exchanges in a byte range of the recording.
+
+        Keyword Arguments:
+            start {int} -- Offset of the first line.
+            end {Optional[int]} -- End of the range, exclusive. (default: end of file)
+            slotted {bool} -- Build slotted exchanges.
+            interner {Optional[Interner]} -- Share equal strings and headers between exchanges.
+            where {Optional[ExchangeFilter]} -- Only build exchanges matching the filter.
+            body_store {Optional[BodyStore]} -- Store holding bodies moved out of the recording.
+            instrumentation {Optional[Instrumentation]} -- Measure the stages of reading.
+            strict {bool} -- Check each exchange against the HTTP types schema.
+        """
+        return HttpExchangeReader.from_lines(
+            self.lines(start, end),
+            slotted=slotted,
+            interner=interner,
+            where=where,
+            body_store=body_store,
+            instrumentation=instrumentation,
+            strict=strict,
+        )
+
+    def advise_sequential(self):
+        """Hint the kernel that the mapping will be read sequentially, where supported."""
+        if self.buffer is not None and hasattr(mmap, "MADV_SEQUENTIAL"):
+            self.buffer.madvise(mmap.MADV_SEQUENTIAL)
+
+    def close(self):
+        if self.buffer is not None:
+            self.buffer.close()
+            self.buffer = None
+
+    def __enter__(self) -> "MappedRecording":
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
@@ -0,0 +1,344 @@
+from dataclasses import dataclass
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Hashable,
+    Iterable,
+    List,
+    Optional,
+    Sequence,
+    Set,
+    Tuple,
+)
+from http_types.types import HttpExchange, HttpHeaders, HttpQuery, Query, Request
+
+__all__ = ["Match", "RequestIndex"]
+
+"""
+Kinds of matches, from the most to the least exact. A recorded request
+matches an incoming one:
+- "exact" if they have the same method, host, pathname, query parameters
+  in the same order, matched headers and, if matched, body;
+- "query_order" if they only differ in the order of query parameters;
+- "headers" if they also differ in matched headers;
+- "nearest_query" if they have the same method, host and pathname. Among
+  those, the request sharing most query parameters is chosen.
+"""
+EXACT = "exact"
+QUERY_ORDER = "query_order"
+HEADERS = "headers"
+NEAREST_QUERY = "nearest_query"
+
+MATCH_KINDS = (EXACT, QUERY_ORDER, HEADERS, NEAREST_QUERY)
+
+Endpoint = Tuple[str, str, str]
+
+"""
+Default number of recorded queries of an endpoint compared for each query
+parameter when looking for the nearest query.
+"""
+DEFAULT_MAX_CANDIDATES = 64
+
+
+@dataclass(frozen=True)
+class Match:
+    """
+    Recorded exchange found for a request.
+    """
+
+    exchange: HttpExchange
+
+    """
+    How the recorded request matched, from MATCH_KINDS.
+    """
+    kind: str
+
+    """
+    Similarity of the query parameters of the requests, from 0 to 1. Exact
+    query matches score 1.
+    """
+    score: float = 1.0
+
+
+def query_pairs(query: Query) -> List[Tuple[str, str]]:
+    """(name, value) pairs of query parameters, one per value."""
+    pairs = []
+    for name, value in query.items():
+        if isinstance(value, str):
+            pairs.append((name, value))
+        else:
+            pairs.extend((name, item) for item in value)
+    return pairs
+
+
+class KeyTable:
+    """Earliest recorded exchange for each key of a request, stored by hash
+    of the key.
+
+    Keys are not kept alive: a hit is confirmed by recomputing the key of
+    the stored exchange. Keys colliding with a stored key of another value
+    go to an overflow table holding the keys themselves.
+    """
+
+    def __init__(
+        self, key: Callable[[Request], Hashable], exchanges: List[HttpExchange]
+    ):
+        """
+        Arguments:
+            key {Callable[[Request], Hashable]} -- Key of a request.
+            exchanges {List[HttpExchange]} -- Exchanges the stored indices refer to.
+        """
+        self.key = key
+        self.exchanges = exchanges
+        self.by_hash: Dict[int, int] = {}
+        self.overflow: Dict[Hashable, int] = {}
+
+    def add(self, request: Request, index: int):
+        key = self.key(request)
+        h = hash(key)
+        existing = self.by_hash.get(h, None)
+        if existing is None:
+            self.by_hash[h] = index
+        elif (
+            key not in self.overflow
+            and self.key(self.exchanges[existing].request) != key
+        ):
+            self.overflow[key] = index
+
+    def get(self, request: Request) -> Optional[int]:
+        key = self.key(request)
+        index = self.by_hash.get(hash(key), None)
+        if index is not None and self.key(self.exchanges[index].request) == key:
+            return index
+        return self.overflow.get(key, None) if self.overflow else None
+
+
+class EndpointQueries:
+    """Distinct query parameters recorded for an endpoint, indexed by
+    parameter, to find the nearest query."""
+
+    __slots__ = ("first", "max_candidates", "queries", "postings", "truncated")
+
+    def __init__(self, first: int, max_candidates: int):
+        self.first = first
+        self.max_candidates = max_candidates
+        # Earliest exchange with each distinct query, and its number of
+        # distinct (name, value) pairs
+        self.queries: Dict[HttpQuery, Tuple[int, int]] = {}
+        # Earliest distinct queries containing each (name, value) pair, at
+        # most max_candidates of them, in a dictionary used as ordered set
+        self.postings: Dict[Tuple[str, str], Dict[HttpQuery, None]] = {}
+        # Pairs contained in more than max_candidates queries
+        self.truncated: Set[Tuple[str, str]] = set()
+
+    def add(self, query: HttpQuery, index: int):
+        if query in self.queries:
+            return
+        pairs = set(query_pairs(query))
+        self.queries[query] = (index, len(pairs))
+        for pair in pairs:
+            posting = self.postings.setdefault(pair, {})
+            if len(posting) < self.max_candidates:
+                posting[query] = None
+            else:
+                self.truncated.add(pair)
+
+    def nearest(self, query: HttpQuery) -> Tuple[int, float]:
+        """Earliest exchange with the query most similar to the given one
+        and the similarity, as the Jaccard index of their parameters.
+
+        Only queries sharing a parameter with the given one are compared,
+        and for each parameter only the max_candidates earliest queries
+        with it, so a lookup compares at most max_candidates queries per
+        parameter of the given query.
+        """
+        found = self.queries.get(query, None)
+        if found is not None:
+            return found[0], 1.0
+        pairs = set(query_pairs(query))
+        shared: Dict[HttpQuery, int] = {}
+        for pair in pairs:
+            for candidate in self.postings.get(pair, ()):
+                shared[candidate] = shared.get(candidate, 0) + 1
+        # Candidates may have pairs whose postings were full when they
+        # were added
+        for pair in pairs & self.truncated:
+            name, value = pair
+            posting = self.postings[pair]
+            for candidate in shared:
+                if candidate not in posting and value in candidate.getall(name):
+                    shared[candidate] += 1
+        best_index = self.first
+        best_score = 0.0
+        for candidate, count in shared.items():
+            index, size = self.queries[candidate]
+            score = count / (len(pairs) + size - count)
+            if score > best_score or (score == best_score and index < best_index):
+                best_index = index
+                best_score = score
+        return best_index, best_score
+
+
+class RequestIndex:
+    """Finds the recorded exchange whose request matches a request, for
+    mocking and replaying recorded traffic.
+
+    Requests are matched on method, host, pathname and query parameters,
+    and optionally on selected headers and the body. Lookups try the
+    fallbacks in MATCH_KINDS order: ignoring the order of query parameters,
+    ignoring headers, and finally the recorded request of the same endpoint
+    sharing most query parameters. Exact, query_order and headers lookups
+    are dictionary lookups by hash, so they take constant time. A
+    nearest_query lookup compares at most max_candidates recorded queries
+    per query parameter of the request, so it takes time proportional to
+    the number of parameters, however many requests were recorded for the
+    endpoint. When several recorded requests match equally, the earliest
+    recorded wins.
+    """
+
+    def __init__(
+        self,
+        match_headers: Sequence[str] = (),
+        match_body: bool = False,
+        fallbacks: Sequence[str] = MATCH_KINDS[1:],
+        max_candidates: int = DEFAULT_MAX_CANDIDATES,
+    ):
+        """
+        Keyword Arguments:
+            match_headers {Sequence[str]} -- Names of headers whose values must
+                match, ignoring case. (default: {()})
+            match_body {bool} -- Match request bodies too, except in
+                nearest_query matches. (default: {False})
+            fallbacks {Sequence[str]} -- Kinds of inexact matches to try when
+                there is no exact match. (default: all of them)
+            max_candidates {int} -- Number of earliest recorded queries of an
+                endpoint compared for each query parameter in nearest_query
+                matches. Queries beyond it that only share very common
+                parameters are not compared. (default: {64})
+        """
+        unknown = set(fallbacks) - set(MATCH_KINDS[1:])
+        if unknown:
+            raise ValueError("Unknown fallbacks: {}".format(", ".join(sorted(unknown))))
+        if max_candidates < 1:
+            raise ValueError(
+                "max_candidates must be positive, got {}".format(max_candidates)
+            )
+        self.match_headers = tuple(name.lower() for name in match_headers)
+        self.match_body = match_body
+        self.fallbacks = frozenset(fallbacks)
+        self.max_candidates = max_candidates
+        if not self.match_headers:
+            # Without matched headers, ignoring them changes nothing
+            self.fallbacks -= {HEADERS}
+        self.exchanges: List[HttpExchange] = []
+        self.exact = KeyTable(self.exact_key, self.exchanges)
+        self.query_order = KeyTable(self.query_order_key, self.exchanges)
+        self.headers = KeyTable(self.headers_key, self.exchanges)
+        self.endpoints: Dict[Endpoint, EndpointQueries] = {}
+
+    @staticmethod
+    def build(exchanges: Iterable[HttpExchange], **kwargs: Any) -> "RequestIndex":
+        """Index exchanges, for example from HttpExchangeReader.from_path().
+
+        Arguments:
+            exchanges {Iterable[HttpExchange]} -- Recorded exchanges.
+
+        Keyword Arguments:
+            Passed to RequestIndex().
+        """
+        index = RequestIndex(**kwargs)
+        add = index.add
+        for exchange in exchanges:
+            add(exchange)
+        return index
+
+    def endpoint_key(self, request: Request) -> Endpoint:
+        return (request.method.value, request.host, request.pathname)
+
+    def query(self, request: Request) -> HttpQuery:
+        query = request.query
+        return query if isinstance(query, HttpQuery) else HttpQuery(query)
+
+    def extra_key(self, request: Request) -> Tuple[Any, ...]:
+        """Matched headers and body of a request."""
+        headers = request.headers
+        if not isinstance(headers, HttpHeaders):
+            headers = HttpHeaders(headers)
+        return (
+            tuple(tuple(headers.getall(name)) for name in self.match_headers),
+            request.body if self.match_body else None,
+        )
+
+    def exact_key(self, request: Request) -> Hashable:
+        return (
+            self.endpoint_key(request),
+            # HttpQuery equality ignores the order of parameters, so their
+            # names are added in order
+            tuple(request.query),
+            self.query(request),
+            self.extra_key(request),
+        )
+
+    def query_order_key(self, request: Request) -> Hashable:
+        return (
+            self.endpoint_key(request),
+            self.query(request),
+            self.extra_key(request),
+        )
+
+    def headers_key(self, request: Request) -> Hashable:
+        return (
+            self.endpoint_key(request),
+            self.query(request),
+            request.body if self.match_body else None,
+        )
+
+    def add(self, exchange: HttpExchange):
+        index = len(self.exchanges)
+        self.exchanges.append(exchange)
+        request = exchange.request
+        self.exact.add(request, index)
+        if QUERY_ORDER in self.fallbacks:
+            self.query_order.add(request, index)
+        if HEADERS in self.fallbacks:
+            self.headers.add(request, index)
+        if NEAREST_QUERY in self.fallbacks:
+            endpoint = self.endpoint_key(request)
+            queries = self.endpoints.get(endpoint, None)
+            if queries is None:
+                queries = self.endpoints[endpoint] = EndpointQueries(
+                    index, self.max_candidates
+                )
+            queries.add(self.query(request), index)
+
+    def match(self, request: Request) -> Optional[Match]:
+        """The recorded exchange best matching a request and how it matched,
+        or None if no recorded request has the same method, host and pathname
+        (or matches exactly, without fallbacks)."""
+        exchanges = self.exchanges
+        index = self.exact.get(request)
+        if index is not None:
+            return Match(exchanges[index], EXACT)
+        if QUERY_ORDER in self.fallbacks:
+            index = self.query_order.get(request)
+            if index is not None:
+                return Match(exchanges[index], QUERY_ORDER)
+        if HEADERS in self.fallbacks:
+            index = self.headers.get(request)
+            if index is not None:
+                return Match(exchanges[index], HEADERS)
+        if NEAREST_QUERY in self.fallbacks:
+            queries = self.endpoints.get(self.endpoint_key(request), None)
+            if queries is not None:
+                index, score = queries.nearest(self.query(request))
+                return Match(exchanges[index], NEAREST_QUERY, score)
+        return None
+
+    def lookup(self, request: Request) -> Optional[HttpExchange]:
+        """The recorded exchange best matching a request, or None."""
+        found = self.match(request)
+        return None if found is None else found.exchange
+
+    def __len__(self) -> int:
+        return len(self.exchanges)
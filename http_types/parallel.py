@@ -0,0 +1,216 @@
+import os
+from collections import deque
+from concurrent.futures import (
+    FIRST_COMPLETED,
+    Future,
+    ProcessPoolExecutor,
+    wait,
+)
+from typing import Callable, Deque, Generator, List, Optional, Set, Tuple, Union
+from http_types.types import HttpExchange
+from http_types.bodystore import BodyStore
+from http_types.compression import (
+    detect_compression,
+    gzip_block_ranges,
+    read_gzip_block,
+)
+from http_types.filtering import ExchangeFilter
+from http_types.mapped import MappedRecording, iter_lines
+from http_types.utils import DEFAULT_CHUNK_SIZE, HttpExchangeReader
+
+__all__ = ["chunk_ranges", "read_jsonl_parallel"]
+
+PathType = Union[str, "os.PathLike[str]"]
+Chunk = Tuple[int, int]
+ReadChunk = Callable[
+    [PathType, Chunk, Optional[ExchangeFilter], Optional[BodyStore]],
+    List[HttpExchange],
+]
+
+
+def chunk_ranges(path: PathType, chunk_size: int = DEFAULT_CHUNK_SIZE) -> List[Chunk]:
+    """Split a JSONL file into byte ranges that start and end on line boundaries.
+
+    Arguments:
+        path {PathType} -- Path to the JSONL file.
+
+    Keyword Arguments:
+        chunk_size {int} -- Approximate size of each range in bytes.
+
+    Returns:
+        List[Chunk] -- (start, end) byte offsets, end exclusive.
+    """
+    if chunk_size <= 0:
+        raise ValueError("chunk_size must be positive, got {}".format(chunk_size))
+    size = os.path.getsize(path)
+    ranges: List[Chunk] = []
+    with open(path, "rb") as f:
+        start = 0
+        while start < size:
+            end = start + chunk_size
+            if end >= size:
+                end = size
+            else:
+                # Extend the range to the end of the line it splits
+                f.seek(end)
+                f.readline()
+                end = f.tell()
+            ranges.append((start, end))
+            start = end
+    return ranges
+
+
+def read_chunk(
+    path: PathType,
+    chunk: Chunk,
+    where: Optional[ExchangeFilter] = None,
+    body_store: Optional[BodyStore] = None,
+) -> List[HttpExchange]:
+    """Read all exchanges in a byte range of a JSONL file.
+
+    The file is memory-mapped, so worker processes reading the same file
+    share its pages. Blank lines are skipped.
+
+    Arguments:
+        path {PathType} -- Path to the JSONL file.
+        chunk {Chunk} -- (start, end) byte offsets as returned by chunk_ranges().
+
+    Keyword Arguments:
+        where {Optional[ExchangeFilter]} -- Only build exchanges matching the filter.
+        body_store {Optional[BodyStore]} -- Store holding bodies moved out of the recording.
+    """
+    start, end = chunk
+    with MappedRecording(path) as recording:
+        return list(recording.exchanges(start, end, where=where, body_store=body_store))
+
+
+def read_block(
+    path: PathType,
+    block: Chunk,
+    where: Optional[ExchangeFilter] = None,
+    body_store: Optional[BodyStore] = None,
+) -> List[HttpExchange]:
+    """Read all exchanges in a block of a block-compressed gzip recording.
+
+    Arguments:
+        path {PathType} -- Path to the recording.
+        block {Chunk} -- (start, end) byte offsets as returned by gzip_block_ranges().
+
+    Keyword Arguments:
+        where {Optional[ExchangeFilter]} -- Only build exchanges matching the filter.
+        body_store {Optional[BodyStore]} -- Store holding bodies moved out of the recording.
+    """
+    return list(
+        HttpExchangeReader.from_lines(
+            iter_lines(read_gzip_block(path, block)),
+            where=where,
+            body_store=body_store,
+        )
+    )
+
+
+def split_recording(
+    path: PathType, chunk_size: int = DEFAULT_CHUNK_SIZE
+) -> Optional[Tuple[List[Chunk], ReadChunk]]:
+    """Split a recording into chunks that can be read independently.
+
+    Arguments:
+        path {PathType} -- Path to the recording.
+
+    Keyword Arguments:
+        chunk_size {int} -- Approximate size of each chunk of an uncompressed
+            recording in bytes. Gzip recordings written with BlockGzipFile are
+            split on block boundaries.
+
+    Returns:
+        Optional[Tuple[List[Chunk], ReadChunk]] -- The chunks and the function
+            reading one of them, or None for a compressed recording that
+            cannot be split.
+    """
+    compression = detect_compression(path)
+    if compression is None:
+        return chunk_ranges(path, chunk_size), read_chunk
+    blocks = gzip_block_ranges(path) if compression == "gzip" else None
+    if blocks is None:
+        return None
+    return blocks, read_block
+
+
+def read_jsonl_parallel(
+    path: PathType,
+    workers: Optional[int] = None,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    ordered: bool = True,
+    where: Optional[ExchangeFilter] = None,
+    body_store: Optional[BodyStore] = None,
+) -> Generator[HttpExchange, None, None]:
+    """Read HTTP exchanges from a JSONL file using a pool of worker processes.
+
+    The file is split into chunks on line boundaries and each chunk is parsed
+    in a separate process. At most two chunks per worker are in flight at
+    any time, so memory use is bounded by the chunk size.
+
+    Gzip recordings written with BlockGzipFile are split on block boundaries,
+    one block per chunk. Other compressed recordings cannot be split and are
+    read sequentially in the calling process.
+
+    Arguments:
+        path {PathType} -- Path to the JSONL file.
+
+    Keyword Arguments:
+        workers {Optional[int]} -- Number of worker processes. Defaults to the number of CPUs.
+            With one worker, chunks are parsed in the calling process.
+        chunk_size {int} -- Approximate size of each chunk in bytes.
+        ordered {bool} -- Yield exchanges in file order. If False, chunks are
+            yielded as soon as they are parsed.
+        where {Optional[ExchangeFilter]} -- Only build exchanges matching the
+            filter. Filtering happens in the worker processes, so rejected
+            exchanges are never sent back.
+        body_store {Optional[BodyStore]} -- Store holding bodies moved out of the
+            recording. Stored bodies are not read in the worker processes.
+    """
+    split = split_recording(path, chunk_size)
+    if split is None:
+        yield from HttpExchangeReader.from_path(
+            os.fspath(path), where=where, body_store=body_store
+        )
+        return
+    chunks = deque(split[0])
+    read = split[1]
+    workers = workers or os.cpu_count() or 1
+
+    if workers == 1:
+        for chunk in chunks:
+            yield from read(path, chunk, where, body_store)
+        return
+
+    max_pending = 2 * workers
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        pending: Deque["Future[List[HttpExchange]]"] = deque()
+        in_flight: Set["Future[List[HttpExchange]]"] = set()
+        try:
+            if ordered:
+                while chunks or pending:
+                    while chunks and len(pending) < max_pending:
+                        pending.append(
+                            executor.submit(
+                                read, path, chunks.popleft(), where, body_store
+                            )
+                        )
+                    yield from pending.popleft().result()
+            else:
+                while chunks or in_flight:
+                    while chunks and len(in_flight) < max_pending:
+                        in_flight.add(
+                            executor.submit(
+                                read, path, chunks.popleft(), where, body_store
+                            )
+                        )
+                    done, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+                    pending.extend(done)
+                    while pending:
+                        yield from pending.popleft().result()
+        finally:
+            # Do not wait for chunks nobody will consume
+            for future in list(pending) + list(in_flight):
+                future.cancel()
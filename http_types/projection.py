@@ -0,0 +1,218 @@
+import json
+from dataclasses import dataclass
+from datetime import datetime
+from typing import Any, ClassVar, Dict, Optional
+from http_types.types import (
+    Headers,
+    HttpHeaders,
+    HttpMethod,
+    Protocol,
+    Query,
+    Body,
+    _LazyBody,
+    _LazyBodyAsJson,
+)
+from http_types.bodystore import BodyStore
+from http_types.utils import (
+    BuilderException,
+    decode_body_field,
+    fill_path_and_query,
+    lazy_body_as_json,
+    parse_iso860_datetime,
+)
+
+__all__ = [
+    "Projection",
+    "ProjectedRequest",
+    "ProjectedResponse",
+    "ProjectedHttpExchange",
+    "project",
+]
+
+
+@dataclass(frozen=True)
+class Projection:
+    """
+    Parts of each exchange to load. Parts that are not loaded are never
+    built or decoded, and are None in the projected exchange.
+    """
+
+    """
+    Load the request. The request method, protocol, host, path, pathname and
+    query are always loaded with it.
+    """
+    request: bool = True
+
+    """
+    Load the response. The status code is always loaded with it.
+    """
+    response: bool = True
+
+    """
+    Load request and response headers.
+    """
+    headers: bool = True
+
+    """
+    Load request and response bodies.
+    """
+    bodies: bool = True
+
+    """
+    Load and parse request and response timestamps.
+    """
+    timestamps: bool = True
+
+    """
+    Load exchange metadata.
+    """
+    meta: bool = True
+
+    REQUEST_ONLY: ClassVar["Projection"]
+    NO_BODIES: ClassVar["Projection"]
+    NO_META: ClassVar["Projection"]
+    HEADERS_ONLY: ClassVar["Projection"]
+    STATUS_LINE: ClassVar["Projection"]
+
+
+Projection.REQUEST_ONLY = Projection(response=False, meta=False)
+Projection.NO_BODIES = Projection(bodies=False)
+Projection.NO_META = Projection(meta=False)
+Projection.HEADERS_ONLY = Projection(bodies=False, timestamps=False, meta=False)
+Projection.STATUS_LINE = Projection(
+    headers=False, bodies=False, timestamps=False, meta=False
+)
+
+
+@dataclass(frozen=True)
+class ProjectedRequest:
+    """
+    HTTP request with the parts selected by a projection. Fields of parts
+    that were not loaded are None.
+    """
+
+    method: HttpMethod
+    protocol: Protocol
+    host: str
+    path: str
+    pathname: str
+    query: Query
+    headers: Optional[Headers] = None
+    body: Optional[Body] = None
+    bodyAsJson: Optional[Any] = None
+    timestamp: Optional[datetime] = None
+
+
+@dataclass(frozen=True)
+class ProjectedResponse:
+    """
+    HTTP response with the parts selected by a projection. Fields of parts
+    that were not loaded are None.
+    """
+
+    statusCode: int
+    headers: Optional[Headers] = None
+    body: Optional[Body] = None
+    bodyAsJson: Optional[Any] = None
+    timestamp: Optional[datetime] = None
+
+
+# Installed after the dataclasses are created, as for Request and Response
+ProjectedRequest.bodyAsJson = _LazyBodyAsJson()  # type: ignore
+ProjectedResponse.bodyAsJson = _LazyBodyAsJson()  # type: ignore
+ProjectedRequest.body = _LazyBody()  # type: ignore
+ProjectedResponse.body = _LazyBody()  # type: ignore
+
+
+@dataclass(frozen=True)
+class ProjectedHttpExchange:
+    """
+    HTTP request-response pair with the parts selected by projection.
+    """
+
+    projection: Projection
+    request: Optional[ProjectedRequest] = None
+    response: Optional[ProjectedResponse] = None
+    meta: Optional[Any] = None
+
+
+def _optional_parts(
+    obj: Dict,
+    projection: Projection,
+    is_request: bool,
+    body_store: Optional[BodyStore] = None,
+) -> Dict:
+    """Headers, body and timestamp of a request or response dictionary, filled
+    in as RequestBuilder and ResponseBuilder do."""
+    parts: Dict[str, Any] = {}
+    if projection.headers:
+        parts["headers"] = HttpHeaders(obj.get("headers", None) or {})
+    if projection.bodies:
+        encoded = {"body": obj.get("body", None)}
+        if "bodyEncoding" in obj:
+            encoded["bodyEncoding"] = obj["bodyEncoding"]
+            decode_body_field(encoded, body_store)
+        body = encoded["body"]
+        body_as_json = obj.get("bodyAsJson", None)
+        if body is None:
+            body = json.dumps(body_as_json) if is_request and body_as_json else ""
+        parts["body"] = body
+        parts["bodyAsJson"] = (
+            lazy_body_as_json(body, obj.get("headers", None) or {})
+            if body_as_json is None
+            else body_as_json
+        )
+    if projection.timestamps:
+        timestamp = obj.get("timestamp", None)
+        if timestamp is not None:
+            parts["timestamp"] = parse_iso860_datetime(timestamp)
+    return parts
+
+
+def project(
+    obj: Dict, projection: Projection, body_store: Optional[BodyStore] = None
+) -> ProjectedHttpExchange:
+    """Build the selected parts of an exchange from a dictionary.
+
+    Arguments:
+        obj {Dict} -- Exchange in the HTTP types format.
+        projection {Projection} -- Parts to build.
+
+    Keyword Arguments:
+        body_store {Optional[BodyStore]} -- Store holding bodies moved out of
+            the recording. Not read from unless bodies are projected and accessed.
+
+    Raises:
+        BuilderException: For a missing request or response.
+    """
+    request = None
+    if projection.request:
+        if "request" not in obj:
+            raise BuilderException("Missing request")
+        req_obj = obj["request"]
+        fields = _optional_parts(req_obj, projection, True, body_store)
+        for key in ("path", "pathname", "query"):
+            value = req_obj.get(key, None)
+            if value is not None:
+                fields[key] = value
+        fill_path_and_query(fields)
+        fields["method"] = HttpMethod(req_obj["method"])
+        fields["protocol"] = Protocol(req_obj["protocol"])
+        fields["host"] = req_obj["host"]
+        request = ProjectedRequest(**fields)
+
+    response = None
+    if projection.response:
+        if "response" not in obj:
+            raise BuilderException("Missing response")
+        res_obj = obj["response"]
+        fields = _optional_parts(res_obj, projection, False, body_store)
+        fields["statusCode"] = res_obj["statusCode"]
+        response = ProjectedResponse(**fields)
+
+    return ProjectedHttpExchange(
+        projection=projection,
+        request=request,
+        response=response,
+        meta=obj.get("meta", None) if projection.meta else None,
+    )
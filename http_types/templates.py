@@ -0,0 +1,304 @@
+import re
+from typing import Any, Dict, Iterable, List, Optional, Tuple, Union, cast
+from http_types.types import Request
+
+__all__ = ["PathTemplates"]
+
+"""
+Default number of distinct literal values a path segment can take before it
+becomes a parameter.
+"""
+DEFAULT_MAX_LITERALS = 20
+
+"""
+Segments that are parameters wherever they appear: decimal numbers, UUIDs
+and long hexadecimal strings such as digests.
+"""
+ID_SEGMENT = re.compile(
+    r"[0-9]+"
+    r"|[0-9a-fA-F]{8}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{4}-[0-9a-fA-F]{12}"
+    r"|[0-9a-fA-F]{16,}"
+)
+
+
+class TemplateNode:
+    """Node of the segment trie, for the paths sharing a prefix."""
+
+    __slots__ = ("literals", "parameter", "generalized", "count", "terminal")
+
+    def __init__(self):
+        """Children for literal segments, child for any segment, and counts of
+        the paths that went through the node and ended at it."""
+        self.literals: Dict[str, TemplateNode] = {}
+        self.parameter: Optional[TemplateNode] = None
+        # Whether all segments at this position are parameters, after the
+        # literal segments exceeded the threshold
+        self.generalized = False
+        self.count = 0
+        self.terminal = 0
+
+    def to_dict(self) -> Dict[str, Any]:
+        obj: Dict[str, Any] = {"count": self.count, "terminal": self.terminal}
+        if self.literals:
+            obj["literals"] = {
+                segment: child.to_dict() for segment, child in self.literals.items()
+            }
+        if self.parameter is not None:
+            obj["parameter"] = self.parameter.to_dict()
+        if self.generalized:
+            obj["generalized"] = True
+        return obj
+
+    @staticmethod
+    def from_dict(obj: Dict[str, Any]) -> "TemplateNode":
+        node = TemplateNode()
+        node.count = obj["count"]
+        node.terminal = obj["terminal"]
+        node.generalized = obj.get("generalized", False)
+        node.literals = {
+            segment: TemplateNode.from_dict(child)
+            for segment, child in obj.get("literals", {}).items()
+        }
+        parameter = obj.get("parameter", None)
+        if parameter is not None:
+            node.parameter = TemplateNode.from_dict(parameter)
+        return node
+
+
+def merge_nodes(target: TemplateNode, source: TemplateNode, max_literals: int):
+    """Add the paths below source to target."""
+    target.count += source.count
+    target.terminal += source.terminal
+    if source.generalized:
+        generalize(target, max_literals)
+    for segment, child in source.literals.items():
+        if target.generalized:
+            merge_nodes(parameter_child(target), child, max_literals)
+        else:
+            existing = target.literals.get(segment, None)
+            if existing is None:
+                target.literals[segment] = child
+            else:
+                merge_nodes(existing, child, max_literals)
+    if source.parameter is not None:
+        if target.parameter is None:
+            target.parameter = source.parameter
+        else:
+            merge_nodes(target.parameter, source.parameter, max_literals)
+    if len(target.literals) > max_literals:
+        generalize(target, max_literals)
+
+
+def parameter_child(node: TemplateNode) -> TemplateNode:
+    if node.parameter is None:
+        node.parameter = TemplateNode()
+    return node.parameter
+
+
+def generalize(node: TemplateNode, max_literals: int):
+    """Turn the literal children of a node into a parameter."""
+    node.generalized = True
+    literals = node.literals
+    node.literals = {}
+    parameter = parameter_child(node)
+    for child in literals.values():
+        merge_nodes(parameter, child, max_literals)
+
+
+class ClassifierNode:
+    """Node of the trie used to classify pathnames, in which the paths below
+    the parameter child of a node are also below each of its literal
+    children, so that classifying never has to backtrack."""
+
+    __slots__ = ("literals", "parameter", "template")
+
+    def __init__(self, template: Optional[str] = None):
+        self.literals: Dict[str, ClassifierNode] = {}
+        self.parameter: Optional[ClassifierNode] = None
+        # Template of the pathnames ending at the node, if any
+        self.template = template
+
+    def child(self, segment: str) -> Optional["ClassifierNode"]:
+        child = self.literals.get(segment, None)
+        return self.parameter if child is None else child
+
+
+def overlay(
+    primary: Optional[ClassifierNode],
+    fallback: Optional[ClassifierNode],
+    merged: Dict[Tuple[int, int], Tuple[ClassifierNode, ...]],
+) -> Optional[ClassifierNode]:
+    """Node matching the paths of both nodes, with the templates of primary
+    taking precedence. Overlays already made are reused from merged, which
+    also keeps the nodes alive so that their ids stay unique."""
+    if fallback is None:
+        return primary
+    if primary is None:
+        return fallback
+    key = (id(primary), id(fallback))
+    if key in merged:
+        return merged[key][0]
+    node = ClassifierNode(
+        fallback.template if primary.template is None else primary.template
+    )
+    merged[key] = (node, primary, fallback)
+    for segment in primary.literals.keys() | fallback.literals.keys():
+        node.literals[segment] = cast(
+            ClassifierNode,
+            overlay(
+                primary.literals.get(segment, primary.parameter),
+                fallback.literals.get(segment, fallback.parameter),
+                merged,
+            ),
+        )
+    node.parameter = overlay(primary.parameter, fallback.parameter, merged)
+    return node
+
+
+def build_classifier(
+    node: TemplateNode,
+    parts: List[str],
+    parameters: int,
+    merged: Dict[Tuple[int, int], Tuple[ClassifierNode, ...]],
+) -> ClassifierNode:
+    """Classifier for the paths below node, whose template starts with parts.
+
+    Literal children are overlaid with the parameter child, so that a
+    pathname follows a literal segment when some learned path continues
+    with the rest of it, and the parameter otherwise.
+    """
+    classifier = ClassifierNode(
+        ("/" + "/".join(parts) if parts else "") if node.terminal else None
+    )
+    if node.parameter is not None:
+        name = "{id}" if parameters == 0 else "{{id{}}}".format(parameters + 1)
+        classifier.parameter = build_classifier(
+            node.parameter, parts + [name], parameters + 1, merged
+        )
+    for segment, child in node.literals.items():
+        classifier.literals[segment] = cast(
+            ClassifierNode,
+            overlay(
+                build_classifier(child, parts + [segment], parameters, merged),
+                classifier.parameter,
+                merged,
+            ),
+        )
+    return classifier
+
+
+class PathTemplates:
+    """Learns path templates such as /users/{id} from pathnames, and
+    classifies pathnames by template.
+
+    Pathnames are split into segments and counted in a trie. A segment
+    becomes a parameter when it looks like an identifier (a number, UUID
+    or long hexadecimal string) or when more than max_literals distinct
+    values were seen at the same position, in which case the paths below
+    them are merged.
+
+    Literal segments take precedence over parameters, unless no learned
+    path continues with the rest of the pathname after the literal. To
+    classify without backtracking, a second trie is built on the first
+    classification after learning, in which the paths after each parameter
+    are also after the literal segments at the same position. Classifying
+    then follows one node per segment, in time proportional to the number
+    of segments.
+    """
+
+    def __init__(
+        self, max_literals: int = DEFAULT_MAX_LITERALS, recognize_ids: bool = True
+    ):
+        """
+        Keyword Arguments:
+            max_literals {int} -- Number of distinct literal values a segment
+                can take before it becomes a parameter. (default: {20})
+            recognize_ids {bool} -- Make numbers, UUIDs and long hexadecimal
+                strings parameters right away. (default: {True})
+        """
+        if max_literals < 1:
+            raise ValueError(
+                "max_literals must be positive, got {}".format(max_literals)
+            )
+        self.max_literals = max_literals
+        self.recognize_ids = recognize_ids
+        self.root = TemplateNode()
+        self.classifier: Optional[ClassifierNode] = None
+
+    def add(self, pathname: str):
+        """Learn from one pathname."""
+        self.classifier = None
+        node = self.root
+        node.count += 1
+        is_id = ID_SEGMENT.fullmatch if self.recognize_ids else None
+        for segment in pathname.split("/")[1:]:
+            if node.generalized or (is_id is not None and is_id(segment)):
+                node = parameter_child(node)
+            elif segment in node.literals:
+                node = node.literals[segment]
+            else:
+                node.literals[segment] = child = TemplateNode()
+                if len(node.literals) > self.max_literals:
+                    generalize(node, self.max_literals)
+                    child = parameter_child(node)
+                node = child
+            node.count += 1
+        node.terminal += 1
+
+    def learn(self, requests: Iterable[Union[Request, str]]) -> "PathTemplates":
+        """Learn from requests, or pathnames, for example the requests of
+        the exchanges read from a recording."""
+        add = self.add
+        for request in requests:
+            add(request if isinstance(request, str) else request.pathname)
+        return self
+
+    def classify(self, pathname: str) -> Optional[str]:
+        """Template of a pathname, or None if it matches no learned template.
+
+        Parameters are named {id}, {id2}, {id3} and so on from left to right.
+        """
+        node = self.classifier
+        if node is None:
+            node = self.classifier = build_classifier(self.root, [], 0, {})
+        for segment in pathname.split("/")[1:]:
+            node = node.child(segment)
+            if node is None:
+                return None
+        if node.template is None:
+            return None
+        return node.template or pathname
+
+    def templates(self) -> Dict[str, int]:
+        """Learned templates, with the number of pathnames learned for each."""
+        found: Dict[str, int] = {}
+        stack: List[Tuple[TemplateNode, List[str], int]] = [(self.root, [], 0)]
+        while stack:
+            node, parts, parameters = stack.pop()
+            if node.terminal and parts:
+                found["/" + "/".join(parts)] = node.terminal
+            for segment, child in node.literals.items():
+                stack.append((child, parts + [segment], parameters))
+            if node.parameter is not None:
+                name = "{id}" if parameters == 0 else "{{id{}}}".format(parameters + 1)
+                stack.append((node.parameter, parts + [name], parameters + 1))
+        return found
+
+    def to_dict(self) -> Dict[str, Any]:
+        """The learned state as a dictionary that can be encoded as JSON, to
+        reuse it in later runs with from_dict()."""
+        return {
+            "maxLiterals": self.max_literals,
+            "recognizeIds": self.recognize_ids,
+            "root": self.root.to_dict(),
+        }
+
+    def __getstate__(self) -> Dict[str, Any]:
+        # The classifier is rebuilt when needed rather than sent to workers
+        return {**self.__dict__, "classifier": None}
+
+    @staticmethod
+    def from_dict(obj: Dict[str, Any]) -> "PathTemplates":
+        templates = PathTemplates(obj["maxLiterals"], obj["recognizeIds"])
+        templates.root = TemplateNode.from_dict(obj["root"])
+        return templates
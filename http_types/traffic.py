@@ -0,0 +1,457 @@
+import math
+import os
+from dataclasses import dataclass, field
+from datetime import timedelta
+from typing import Any, Dict, Iterable, Optional, Tuple, Union
+from http_types.types import Body, HttpExchange
+from http_types.bodystore import BodyStore
+from http_types.filtering import ExchangeFilter
+from http_types.templates import PathTemplates
+from http_types.utils import DEFAULT_CHUNK_SIZE, HttpExchangeReader
+
+__all__ = ["EndpointStats", "QuantileSketch", "TrafficStats", "recording_stats"]
+
+"""
+Default bound on the relative error of quantiles.
+"""
+DEFAULT_RELATIVE_ACCURACY = 0.01
+
+"""
+Endpoint exchanges are grouped by: method, host and pathname.
+"""
+Endpoint = Tuple[str, str, str]
+
+MICROSECOND = timedelta(microseconds=1)
+
+
+@dataclass
+class QuantileSketch:
+    """
+    Mergeable summary of a distribution of integers, such as sizes in bytes
+    or durations in microseconds, answering quantile queries within a
+    relative error.
+
+    Values are counted in buckets whose bounds grow geometrically, so memory
+    grows with the logarithm of the range of values rather than with their
+    number. Merging adds up bucket counts, so a sketch merged from the
+    sketches of parts of a stream is equal to the sketch of the whole stream.
+    """
+
+    """
+    Bound on the relative error of quantiles. Only sketches with the same
+    accuracy can be merged.
+    """
+    relative_accuracy: float = DEFAULT_RELATIVE_ACCURACY
+
+    count: int = 0
+    sum: int = 0
+    min: Optional[int] = None
+    max: Optional[int] = None
+
+    """
+    Counts of positive and negative values by bucket, and count of zeros.
+    Bucket k holds values v with gamma ** (k - 1) < |v| <= gamma ** k.
+    """
+    positive: Dict[int, int] = field(default_factory=dict)
+    negative: Dict[int, int] = field(default_factory=dict)
+    zeros: int = 0
+
+    def __post_init__(self):
+        if not 0 < self.relative_accuracy < 1:
+            raise ValueError(
+                "relative_accuracy must be between 0 and 1, got {}".format(
+                    self.relative_accuracy
+                )
+            )
+        self._gamma = (1 + self.relative_accuracy) / (1 - self.relative_accuracy)
+        self._log_gamma = math.log(self._gamma)
+
+    def add(self, value: int):
+        self.count += 1
+        self.sum += value
+        if self.min is None or value < self.min:
+            self.min = value
+        if self.max is None or value > self.max:
+            self.max = value
+        if value > 0:
+            key = math.ceil(math.log(value) / self._log_gamma)
+            self.positive[key] = self.positive.get(key, 0) + 1
+        elif value < 0:
+            key = math.ceil(math.log(-value) / self._log_gamma)
+            self.negative[key] = self.negative.get(key, 0) + 1
+        else:
+            self.zeros += 1
+
+    def merge(self, other: "QuantileSketch") -> "QuantileSketch":
+        """Add the values of another sketch to this one.
+
+        Raises:
+            ValueError: If the sketches have different accuracies.
+        """
+        if other.relative_accuracy != self.relative_accuracy:
+            raise ValueError(
+                "Cannot merge sketches with relative accuracies {} and {}".format(
+                    self.relative_accuracy, other.relative_accuracy
+                )
+            )
+        if other.count == 0:
+            return self
+        self.count += other.count
+        self.sum += other.sum
+        if self.min is None or other.min < self.min:  # type: ignore
+            self.min = other.min
+        if self.max is None or other.max > self.max:  # type: ignore
+            self.max = other.max
+        for key, count in other.positive.items():
+            self.positive[key] = self.positive.get(key, 0) + count
+        for key, count in other.negative.items():
+            self.negative[key] = self.negative.get(key, 0) + count
+        self.zeros += other.zeros
+        return self
+
+    def bucket_value(self, key: int) -> float:
+        """Value within the relative accuracy of every value in a bucket."""
+        return 2 * self._gamma**key / (self._gamma + 1)
+
+    def quantile(self, q: float) -> Optional[float]:
+        """Value below which a fraction q of the values lie, within the
+        relative accuracy, or None for an empty sketch.
+
+        Arguments:
+            q {float} -- Quantile between 0 and 1, for example 0.99.
+        """
+        if not 0 <= q <= 1:
+            raise ValueError("Quantile must be between 0 and 1, got {}".format(q))
+        if self.count == 0:
+            return None
+        rank = q * (self.count - 1)
+        seen = 0
+        # The most negative values are in the buckets with the largest keys
+        for key in sorted(self.negative, reverse=True):
+            seen += self.negative[key]
+            if seen > rank:
+                return max(self.min, -self.bucket_value(key))  # type: ignore
+        seen += self.zeros
+        if seen > rank:
+            return 0.0
+        for key in sorted(self.positive):
+            seen += self.positive[key]
+            if seen > rank:
+                return min(self.max, self.bucket_value(key))  # type: ignore
+        return float(self.max)  # type: ignore
+
+    @property
+    def mean(self) -> Optional[float]:
+        return self.sum / self.count if self.count else None
+
+    def to_dict(self) -> Dict[str, Any]:
+        """The sketch as a dictionary that can be encoded as JSON."""
+        return {
+            "relativeAccuracy": self.relative_accuracy,
+            "count": self.count,
+            "sum": self.sum,
+            "min": self.min,
+            "max": self.max,
+            "positive": {str(key): count for key, count in self.positive.items()},
+            "negative": {str(key): count for key, count in self.negative.items()},
+            "zeros": self.zeros,
+        }
+
+    @staticmethod
+    def from_dict(obj: Dict[str, Any]) -> "QuantileSketch":
+        return QuantileSketch(
+            relative_accuracy=obj["relativeAccuracy"],
+            count=obj["count"],
+            sum=obj["sum"],
+            min=obj["min"],
+            max=obj["max"],
+            positive={int(key): count for key, count in obj["positive"].items()},
+            negative={int(key): count for key, count in obj["negative"].items()},
+            zeros=obj["zeros"],
+        )
+
+
+def body_size(body: Optional[Body]) -> int:
+    """Size of a body in bytes, with text encoded as UTF-8."""
+    if not body:
+        return 0
+    if isinstance(body, bytes):
+        return len(body)
+    return len(body.encode("utf-8"))
+
+
+class EndpointStats:
+    """Statistics of the exchanges of one endpoint.
+
+    Latency is the time between the request and response timestamps, in
+    microseconds, and is only known for exchanges having both, either both
+    with a time zone or both without.
+    """
+
+    def __init__(self, relative_accuracy: float = DEFAULT_RELATIVE_ACCURACY):
+        """
+        Keyword Arguments:
+            relative_accuracy {float} -- Bound on the relative error of
+                quantiles. (default: {0.01})
+        """
+        self.count = 0
+        self.statuses: Dict[int, int] = {}
+        self.latency = QuantileSketch(relative_accuracy)
+        self.request_bytes = QuantileSketch(relative_accuracy)
+        self.response_bytes = QuantileSketch(relative_accuracy)
+
+    def add(self, exchange: HttpExchange):
+        request = exchange.request
+        response = exchange.response
+        self.count += 1
+        status = response.statusCode
+        self.statuses[status] = self.statuses.get(status, 0) + 1
+        self.request_bytes.add(body_size(request.body))
+        self.response_bytes.add(body_size(response.body))
+        if request.timestamp is not None and response.timestamp is not None:
+            try:
+                latency = response.timestamp - request.timestamp
+            except TypeError:
+                # One timestamp has a time zone and the other not
+                return
+            self.latency.add(latency // MICROSECOND)
+
+    def merge(self, other: "EndpointStats") -> "EndpointStats":
+        self.count += other.count
+        for status, count in other.statuses.items():
+            self.statuses[status] = self.statuses.get(status, 0) + count
+        self.latency.merge(other.latency)
+        self.request_bytes.merge(other.request_bytes)
+        self.response_bytes.merge(other.response_bytes)
+        return self
+
+    def status_classes(self) -> Dict[str, int]:
+        """Counts of exchanges by status class, such as "2xx"."""
+        classes: Dict[str, int] = {}
+        for status, count in self.statuses.items():
+            name = "{}xx".format(status // 100)
+            classes[name] = classes.get(name, 0) + count
+        return classes
+
+    def latency_seconds(self, q: float) -> Optional[float]:
+        """Quantile of the latency in seconds, or None if it is never known."""
+        value = self.latency.quantile(q)
+        return None if value is None else value / 1e6
+
+    def __eq__(self, other: Any) -> bool:
+        if not isinstance(other, EndpointStats):
+            return NotImplemented
+        return self.to_dict() == other.to_dict()
+
+    def __repr__(self) -> str:
+        return "EndpointStats(count={!r}, statuses={!r})".format(
+            self.count, self.statuses
+        )
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "count": self.count,
+            "statuses": {str(status): count for status, count in self.statuses.items()},
+            "latencyMicroseconds": self.latency.to_dict(),
+            "requestBodyBytes": self.request_bytes.to_dict(),
+            "responseBodyBytes": self.response_bytes.to_dict(),
+        }
+
+    @staticmethod
+    def from_dict(obj: Dict[str, Any]) -> "EndpointStats":
+        stats = EndpointStats()
+        stats.count = obj["count"]
+        stats.statuses = {
+            int(status): count for status, count in obj["statuses"].items()
+        }
+        stats.latency = QuantileSketch.from_dict(obj["latencyMicroseconds"])
+        stats.request_bytes = QuantileSketch.from_dict(obj["requestBodyBytes"])
+        stats.response_bytes = QuantileSketch.from_dict(obj["responseBodyBytes"])
+        return stats
+
+
+class TrafficStats:
+    """Per-endpoint statistics of a stream of exchanges, computed in one pass.
+
+    Exchanges are grouped by method, host and pathname, or by the template
+    of the pathname when templates are given. Statistics of parts of a
+    stream, for example computed by separate processes, can be merged, and
+    the result is equal to the statistics of the whole stream.
+    """
+
+    def __init__(
+        self,
+        relative_accuracy: float = DEFAULT_RELATIVE_ACCURACY,
+        templates: Optional[PathTemplates] = None,
+    ):
+        """
+        Keyword Arguments:
+            relative_accuracy {float} -- Bound on the relative error of
+                latency and body size quantiles. (default: {0.01})
+            templates {Optional[PathTemplates]} -- Group pathnames matching a
+                learned template, such as /users/{id}, under the template.
+                Others are grouped by pathname. (default: {None})
+        """
+        self.relative_accuracy = relative_accuracy
+        self.templates = templates
+        self.endpoints: Dict[Endpoint, EndpointStats] = {}
+
+    def add(self, exchange: HttpExchange):
+        request = exchange.request
+        pathname = request.pathname
+        if self.templates is not None:
+            pathname = self.templates.classify(pathname) or pathname
+        endpoint = (request.method.value, request.host, pathname)
+        stats = self.endpoints.get(endpoint, None)
+        if stats is None:
+            stats = self.endpoints[endpoint] = EndpointStats(self.relative_accuracy)
+        stats.add(exchange)
+
+    def add_all(self, exchanges: Iterable[HttpExchange]) -> "TrafficStats":
+        """Add exchanges, for example from HttpExchangeReader.from_path()."""
+        add = self.add
+        for exchange in exchanges:
+            add(exchange)
+        return self
+
+    def merge(self, other: "TrafficStats") -> "TrafficStats":
+        """Add the statistics of another part of the stream to these.
+
+        Raises:
+            ValueError: If the statistics have different accuracies.
+        """
+        if other.relative_accuracy != self.relative_accuracy:
+            raise ValueError(
+                "Cannot merge statistics with relative accuracies {} and {}".format(
+                    self.relative_accuracy, other.relative_accuracy
+                )
+            )
+        for endpoint, stats in other.endpoints.items():
+            mine = self.endpoints.get(endpoint, None)
+            if mine is None:
+                mine = self.endpoints[endpoint] = EndpointStats(self.relative_accuracy)
+            mine.merge(stats)
+        return self
+
+    @property
+    def count(self) -> int:
+        return sum(stats.count for stats in self.endpoints.values())
+
+    def __eq__(self, other: Any) -> bool:
+        if not isinstance(other, TrafficStats):
+            return NotImplemented
+        return (
+            self.relative_accuracy == other.relative_accuracy
+            and self.endpoints == other.endpoints
+        )
+
+    def __repr__(self) -> str:
+        return "TrafficStats(endpoints={}, count={})".format(
+            len(self.endpoints), self.count
+        )
+
+    def to_dict(self) -> Dict[str, Any]:
+        """The statistics as a dictionary that can be encoded as JSON, to save
+        partial results and merge them later."""
+        return {
+            "relativeAccuracy": self.relative_accuracy,
+            "endpoints": [
+                dict(method=method, host=host, pathname=pathname, **stats.to_dict())
+                for (method, host, pathname), stats in self.endpoints.items()
+            ],
+        }
+
+    @staticmethod
+    def from_dict(obj: Dict[str, Any]) -> "TrafficStats":
+        traffic = TrafficStats(obj["relativeAccuracy"])
+        for endpoint in obj["endpoints"]:
+            key = (endpoint["method"], endpoint["host"], endpoint["pathname"])
+            traffic.endpoints[key] = EndpointStats.from_dict(endpoint)
+        return traffic
+
+
+def chunk_stats(
+    read: Any,
+    path: Union[str, "os.PathLike[str]"],
+    chunk: Tuple[int, int],
+    where: Optional[ExchangeFilter],
+    relative_accuracy: float,
+    templates: Optional[PathTemplates],
+    body_store: Optional[BodyStore],
+) -> TrafficStats:
+    """Statistics of a chunk of a recording, computed in a worker process."""
+    traffic = TrafficStats(relative_accuracy, templates)
+    return traffic.add_all(read(path, chunk, where, body_store))
+
+
+def recording_stats(
+    path: Union[str, "os.PathLike[str]"],
+    workers: Optional[int] = None,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    where: Optional[ExchangeFilter] = None,
+    relative_accuracy: float = DEFAULT_RELATIVE_ACCURACY,
+    templates: Optional[PathTemplates] = None,
+    body_store: Optional[BodyStore] = None,
+) -> TrafficStats:
+    """Compute per-endpoint statistics of a recording using a pool of worker
+    processes.
+
+    Each worker computes the statistics of one chunk of the recording and
+    only these are sent back and merged, so memory use is bounded by the
+    chunk size and the number of endpoints. Recordings that cannot be split
+    are read in the calling process.
+
+    Arguments:
+        path {PathType} -- Path to the recording, which may be compressed.
+
+    Keyword Arguments:
+        workers {Optional[int]} -- Number of worker processes. Defaults to the
+            number of CPUs. With one worker, chunks are read in the calling process.
+        chunk_size {int} -- Approximate size of each chunk in bytes.
+            (default: {8 MB})
+        where {Optional[ExchangeFilter]} -- Only count exchanges matching the filter.
+        relative_accuracy {float} -- Bound on the relative error of quantiles.
+            (default: {0.01})
+        templates {Optional[PathTemplates]} -- Group pathnames by learned
+            template. (default: {None})
+        body_store {Optional[BodyStore]} -- Store holding bodies moved out of the
+            recording, for example BodyStore.for_recording(path), to measure
+            their sizes. (default: {None})
+    """
+    from concurrent.futures import ProcessPoolExecutor
+    from itertools import repeat
+    from http_types.parallel import split_recording
+
+    if chunk_size <= 0:
+        raise ValueError("chunk_size must be positive, got {}".format(chunk_size))
+    traffic = TrafficStats(relative_accuracy, templates)
+    split = split_recording(path, chunk_size)
+    if split is None:
+        return traffic.add_all(
+            HttpExchangeReader.from_path(
+                os.fspath(path), where=where, body_store=body_store
+            )
+        )
+    chunks, read = split
+    workers = workers or os.cpu_count() or 1
+    if workers == 1:
+        for chunk in chunks:
+            traffic.merge(
+                chunk_stats(
+                    read, path, chunk, where, relative_accuracy, templates, body_store
+                )
+            )
+        return traffic
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        for partial in executor.map(
+            chunk_stats,
+            repeat(read),
+            repeat(path),
+            chunks,
+            repeat(where),
+            repeat(relative_accuracy),
+            repeat(templates),
+            repeat(body_store),
+        ):
+            traffic.merge(partial)
+    return traffic
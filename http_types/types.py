@@ -1,13 +1,234 @@
-from dataclasses import dataclass
+from abc import ABCMeta
+from dataclasses import FrozenInstanceError, dataclass, fields
 from datetime import datetime
-from typing import Any, Union, Mapping, Sequence, Optional
+from typing import (
+    Any,
+    Dict,
+    Iterable,
+    ItemsView,
+    Iterator,
+    List,
+    Union,
+    Mapping,
+    Sequence,
+    Optional,
+    Tuple,
+    ValuesView,
+)
+import base64
 import enum
+import functools
 
 """
 HTTP request or response headers. Array-valued header values can be represented with a comma-separated string.
 """
 Headers = Mapping[str, Union[str, Sequence[str]]]
 
+
+class _MultiValueMapping(Mapping[str, Union[str, Sequence[str]]]):
+    """
+    Immutable and hashable mapping of names to a value or a list of values.
+
+    Names with several values are stored as tuples and returned as a new list
+    on each access. Compares equal to any mapping with the same names and values.
+    """
+
+    __slots__ = ("_values", "_hash")
+
+    _values: Dict[str, Any]
+    _hash: Optional[int]
+
+    def __init__(self, items: Union[Headers, Iterable[Tuple[str, str]]] = ()):
+        """
+        Keyword Arguments:
+            items {Union[Headers, Iterable[Tuple[str, str]]]} -- Mapping of names
+                to values, or (name, value) pairs in which a repeated name adds a value.
+                Lists and tuples are several values, anything else a single value.
+        """
+        values: Dict[str, Any]
+        if isinstance(items, _MultiValueMapping):
+            values = items._values
+        elif isinstance(items, Mapping):
+            values = {
+                name: tuple(value) if isinstance(value, (list, tuple)) else value
+                for name, value in items.items()
+            }
+        else:
+            values = {}
+            for name, value in items:
+                previous = values.get(name, None)
+                if previous is None:
+                    values[name] = (
+                        tuple(value) if isinstance(value, (list, tuple)) else value
+                    )
+                else:
+                    values[name] = _as_tuple(previous) + _as_tuple(value)
+        self._values = values
+        self._hash = None
+
+    def _names(self, name: str) -> Tuple[str, ...]:
+        """Names matching a name, in insertion order."""
+        return (name,) if name in self._values else ()
+
+    def __getitem__(self, name: str) -> Union[str, List[str]]:
+        value = self.get(name, None)
+        if value is None:
+            raise KeyError(name)
+        return value
+
+    def get(self, name: str, default: Any = None) -> Any:
+        """The value of a name, or a list of its values if it has several,
+        merging the values of all matching names as getall() does."""
+        names = self._names(name)
+        if len(names) == 1:
+            return _as_value(self._values[names[0]])
+        if not names:
+            return default
+        return self.getall(name)
+
+    def getall(self, name: str) -> List[str]:
+        """All values of a name, or an empty list if not present.
+
+        Arguments:
+            name {str} -- Name to look up.
+        """
+        values: List[str] = []
+        for original in self._names(name):
+            values.extend(_as_tuple(self._values[original]))
+        return values
+
+    def items(self) -> ItemsView[str, Union[str, Sequence[str]]]:
+        """Names with the values stored for each, without merging names that
+        only differ in case."""
+        return _StoredItemsView(self)
+
+    def values(self) -> ValuesView[Union[str, Sequence[str]]]:
+        return _StoredValuesView(self)
+
+    def __contains__(self, name: object) -> bool:
+        return isinstance(name, str) and (
+            name in self._values or bool(self._names(name))
+        )
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._values)
+
+    def __len__(self) -> int:
+        return len(self._values)
+
+    def __eq__(self, other: object) -> bool:
+        if isinstance(other, _MultiValueMapping):
+            return self._values == other._values
+        if isinstance(other, Mapping):
+            return len(self._values) == len(other) and all(
+                name in self._values and self._values[name] == _as_tuple_or_str(value)
+                for name, value in other.items()
+            )
+        return NotImplemented
+
+    def __hash__(self) -> int:
+        if self._hash is None:
+            self._hash = hash(frozenset(self._values.items()))
+        return self._hash
+
+    def __repr__(self) -> str:
+        return "{}({!r})".format(type(self).__name__, dict(self.items()))
+
+    def __reduce__(self):
+        return (type(self), (self._values,))
+
+    def __copy__(self):
+        return self
+
+    def __deepcopy__(self, memo: Dict):
+        return self
+
+
+class HttpHeaders(_MultiValueMapping):
+    """
+    Immutable and hashable HTTP headers.
+
+    Names keep their original case when iterated and compared, but are looked
+    up ignoring case through an index of lowercase names, built on the first
+    lookup and kept for later lookups. Every lookup goes through the index, so
+    that names differing only in case are merged even when one matches
+    exactly. A header with several values maps to a list of them.
+    """
+
+    __slots__ = ("_index",)
+
+    _index: Optional[Dict[str, Tuple[str, ...]]]
+
+    def __init__(self, headers: Union[Headers, Iterable[Tuple[str, str]]] = ()):
+        """
+        Keyword Arguments:
+            headers {Union[Headers, Iterable[Tuple[str, str]]]} -- Mapping of names
+                to values, or (name, value) pairs in which a repeated name adds a value.
+        """
+        super().__init__(headers)
+        self._index = None
+
+    def _names(self, name: str) -> Tuple[str, ...]:
+        """Names of the headers matching a name, ignoring case."""
+        index = self._index
+        if index is None:
+            index = {}
+            for original in self._values:
+                lower = original.lower()
+                index[lower] = index.get(lower, ()) + (original,)
+            self._index = index
+        return index.get(name.lower(), ())
+
+
+class HttpQuery(_MultiValueMapping):
+    """
+    Immutable and hashable query parameters, so that parsed queries can be
+    shared between requests. A parameter with several values maps to a list
+    of them.
+    """
+
+    __slots__ = ()
+
+
+class _StoredItemsView(ItemsView):
+    _mapping: _MultiValueMapping
+
+    def __contains__(self, item: object) -> bool:
+        if not isinstance(item, tuple) or len(item) != 2:
+            return False
+        name, value = item
+        values = self._mapping._values
+        return name in values and values[name] == _as_tuple_or_str(value)
+
+    def __iter__(self) -> Iterator[Tuple[str, Any]]:
+        for name, value in self._mapping._values.items():
+            yield name, _as_value(value)
+
+
+class _StoredValuesView(ValuesView):
+    _mapping: _MultiValueMapping
+
+    def __contains__(self, value: object) -> bool:
+        return _as_tuple_or_str(value) in self._mapping._values.values()
+
+    def __iter__(self) -> Iterator[Any]:
+        for value in self._mapping._values.values():
+            yield _as_value(value)
+
+
+def _as_tuple(value: Any) -> Tuple[Any, ...]:
+    return tuple(value) if isinstance(value, (list, tuple)) else (value,)
+
+
+def _as_value(value: Any) -> Any:
+    """Stored value as returned by lookups: a list for several values."""
+    return list(value) if isinstance(value, tuple) else value
+
+
+def _as_tuple_or_str(value: Any) -> Any:
+    return tuple(value) if isinstance(value, (list, tuple)) else value
+
+
 """
 HTTP request query parameters.
 """
@@ -40,8 +261,123 @@ class HttpMethod(enum.Enum):
     CONNECT = "connect"
 
 
+class _BodyNotParsed(enum.Enum):
+    """
+    Marker for a bodyAsJson value that has not been decoded from the body yet.
+    """
+
+    NOT_PARSED = 0
+
+
+NOT_PARSED = _BodyNotParsed.NOT_PARSED
+
+
+class _LazyBodyAsJson:
+    """
+    Data descriptor for the bodyAsJson field. If the field is set to NOT_PARSED,
+    the body is decoded as JSON on first access and the result is cached.
+    """
+
+    def __init__(self, slot: Any = None):
+        """
+        Arguments:
+            slot {Any} -- Member descriptor of the slot holding the value, or None
+                to keep the value in the instance dictionary.
+        """
+        self.slot = slot
+
+    def __get__(self, obj, objtype=None):
+        if obj is None:
+            return self
+        value = (
+            obj.__dict__["bodyAsJson"] if self.slot is None else self.slot.__get__(obj)
+        )
+        if value is NOT_PARSED:
+            from http_types.utils import parse_body
+
+            value = parse_body(obj.body) if obj.body else ""
+            self.__set__(obj, value)
+        return value
+
+    def __set__(self, obj, value):
+        if self.slot is None:
+            obj.__dict__["bodyAsJson"] = value
+        else:
+            self.slot.__set__(obj, value)
+
+
+class PendingBody:
+    """
+    Body that is loaded on first access, such as a base64-encoded body read
+    from a recording. Stored in the body field of requests and responses in
+    place of the body itself.
+    """
+
+    __slots__ = ()
+
+    def load(self) -> "Body":
+        raise NotImplementedError
+
+
+class Base64Body(PendingBody):
+    """
+    Binary body in its base64 encoding, decoded to bytes on first access.
+    """
+
+    __slots__ = ("encoded",)
+
+    def __init__(self, encoded: str):
+        """
+        Arguments:
+            encoded {str} -- Base64 encoding of the body.
+        """
+        self.encoded = encoded
+
+    def load(self) -> bytes:
+        return base64.b64decode(self.encoded)
+
+    def __reduce__(self):
+        return (Base64Body, (self.encoded,))
+
+
+class _LazyBody:
+    """
+    Data descriptor for the body field. If the field holds a PendingBody, the
+    body is loaded on first access and the result is cached.
+    """
+
+    def __init__(self, slot: Any = None):
+        """
+        Arguments:
+            slot {Any} -- Member descriptor of the slot holding the value, or None
+                to keep the value in the instance dictionary.
+        """
+        self.slot = slot
+
+    def __get__(self, obj, objtype=None):
+        if obj is None:
+            return self
+        value = obj.__dict__["body"] if self.slot is None else self.slot.__get__(obj)
+        if isinstance(value, PendingBody):
+            value = value.load()
+            self.__set__(obj, value)
+        return value
+
+    def __set__(self, obj, value):
+        if self.slot is None:
+            obj.__dict__["body"] = value
+        else:
+            self.slot.__set__(obj, value)
+
+
+"""
+HTTP request or response body. Bodies that are not text are bytes.
+"""
+Body = Union[str, bytes]
+
+
 @dataclass(frozen=True)
-class Request:
+class Request(metaclass=ABCMeta):
     """
     HTTP request.
     """
@@ -95,20 +431,21 @@ class Request:
 
     """
     Request body. None if no body should exit (ie GET, DELETE). Empty string if empty.
+    Bytes for bodies that are not text.
     """
-    body: Optional[str] = None
+    body: Optional[Body] = None
 
 
 @dataclass(frozen=True)
-class Response:
+class Response(metaclass=ABCMeta):
     """
     HTTP response.
     """
 
     """
-    Response body.
+    Response body. Bytes for bodies that are not text.
     """
-    body: str
+    body: Body
 
     """ Response status code."""
     statusCode: int
@@ -127,8 +464,16 @@ class Response:
     bodyAsJson: Optional[Any] = None
 
 
+# Installed after the dataclasses are created so that the generated __init__
+# keeps None as the default value.
+Request.bodyAsJson = _LazyBodyAsJson()  # type: ignore
+Response.bodyAsJson = _LazyBodyAsJson()  # type: ignore
+Request.body = _LazyBody()  # type: ignore
+Response.body = _LazyBody()  # type: ignore
+
+
 @dataclass(frozen=True)
-class HttpExchange:
+class HttpExchange(metaclass=ABCMeta):
     """
     HTTP request-response pair.
     """
@@ -138,11 +483,133 @@ class HttpExchange:
     meta: Optional[Any] = None
 
 
+def _frozen_setattr(self, name, value):
+    raise FrozenInstanceError("cannot assign to field {!r}".format(name))
+
+
+def _frozen_delattr(self, name):
+    raise FrozenInstanceError("cannot delete field {!r}".format(name))
+
+
+def _slotted_getstate(self):
+    return tuple(object.__getattribute__(self, name) for name in self.__slots__)
+
+
+def _slotted_setstate(self, state):
+    for name, value in zip(self.__slots__, state):
+        object.__setattr__(self, name, value)
+
+
+def _frozen_value(value: Any) -> Any:
+    """Hashable value equal for equal JSON-like values, such as exchange metadata."""
+    if isinstance(value, Mapping):
+        return frozenset((name, _frozen_value(item)) for name, item in value.items())
+    if isinstance(value, (list, tuple)):
+        return tuple(_frozen_value(item) for item in value)
+    return value
+
+
+def _slotted_hash(self):
+    return hash(tuple(_frozen_value(getattr(self, name)) for name in self._hash_fields))
+
+
+def _slotted_eq(cls: type):
+    """__eq__ comparing the hashed fields with any instance of the dataclass,
+    slotted or not. The dataclass __eq__ only compares instances of one class."""
+
+    def __eq__(self, other):
+        if not isinstance(other, cls):
+            return NotImplemented
+        return all(
+            getattr(self, name) == getattr(other, name) for name in self._hash_fields
+        )
+
+    return __eq__
+
+
+def _slotted_init(init):
+    """Wrap a dataclass __init__ to store headers and query parameters as
+    HttpHeaders and HttpQuery, which are hashable."""
+
+    @functools.wraps(init)
+    def __init__(self, *args, **kwargs):
+        init(self, *args, **kwargs)
+        headers = getattr(self, "headers", None)
+        if headers is not None and not isinstance(headers, HttpHeaders):
+            object.__setattr__(self, "headers", HttpHeaders(headers))
+        query = getattr(self, "query", None)
+        if query is not None and not isinstance(query, HttpQuery):
+            object.__setattr__(self, "query", HttpQuery(query))
+
+    return __init__
+
+
+def _slotted(cls: type, name: str) -> type:
+    """Create a variant of a frozen dataclass that stores its fields in __slots__.
+
+    Instances have no __dict__. body and bodyAsJson keep their lazy loading, with
+    the values held in the _body and _bodyAsJson slots. Headers and query
+    parameters are stored as HttpHeaders and HttpQuery, so that instances can be
+    hashed by all their fields except bodyAsJson, which is derived from the body.
+    They compare equal to instances of the dataclass with equal fields. The variant is registered as a virtual subclass of the dataclass.
+    """
+    field_names = [f.name for f in fields(cls)]
+    slots = tuple(
+        "_" + f if f == "bodyAsJson" or f == "body" else f for f in field_names
+    )
+    namespace = {
+        key: value
+        for key, value in cls.__dict__.items()
+        if key not in field_names
+        and key not in ("__dict__", "__weakref__", "__abstractmethods__", "_abc_impl")
+    }
+    namespace.update(
+        __slots__=slots,
+        __qualname__=name,
+        __init__=_slotted_init(cls.__init__),  # type: ignore
+        __setattr__=_frozen_setattr,
+        __delattr__=_frozen_delattr,
+        __getstate__=_slotted_getstate,
+        __setstate__=_slotted_setstate,
+        __eq__=_slotted_eq(cls),
+        __hash__=_slotted_hash,
+        _hash_fields=tuple(f for f in field_names if f != "bodyAsJson"),
+    )
+    slotted_cls = type(name, cls.__bases__, namespace)
+    if "bodyAsJson" in field_names:
+        slotted_cls.bodyAsJson = _LazyBodyAsJson(  # type: ignore
+            slotted_cls.__dict__["_bodyAsJson"]
+        )
+    if "body" in field_names:
+        slotted_cls.body = _LazyBody(slotted_cls.__dict__["_body"])  # type: ignore
+    cls.register(slotted_cls)  # type: ignore
+    return slotted_cls
+
+
+"""
+Variants of Request, Response and HttpExchange without a per-instance __dict__,
+for holding large numbers of exchanges in memory. They have the same fields
+and behavior, are hashable, and are instances of Request, Response and
+HttpExchange for isinstance() checks.
+"""
+SlottedRequest = _slotted(Request, "SlottedRequest")
+SlottedResponse = _slotted(Response, "SlottedResponse")
+SlottedHttpExchange = _slotted(HttpExchange, "SlottedHttpExchange")
+
+
 __all__ = [
     "Request",
     "Response",
     "HttpExchange",
+    "SlottedRequest",
+    "SlottedResponse",
+    "SlottedHttpExchange",
+    "Body",
+    "Base64Body",
+    "PendingBody",
     "Headers",
+    "HttpHeaders",
+    "HttpQuery",
     "Query",
     "Protocol",
     "HttpMethod",
@@ -1,22 +1,59 @@
 import json
 from datetime import datetime
-from typing import Any, Dict, Generator, IO, Union
+from functools import lru_cache
+from typing import (
+    Any,
+    Dict,
+    Generator,
+    IO,
+    Iterable,
+    List,
+    Mapping,
+    Optional,
+    TYPE_CHECKING,
+    Tuple,
+    Union,
+    cast,
+)
 from urllib.parse import urlencode, urlparse, parse_qs
-from http.client import HTTPResponse
-from dateutil.parser import isoparse
-import copy
-from dataclasses import asdict
+import base64
+import enum
+import re
+from dataclasses import asdict, fields, is_dataclass
 from http_types.types import (
+    NOT_PARSED,
+    Base64Body,
+    Body,
+    PendingBody,
     HttpMethod,
     Protocol,
     HttpExchange,
     Request,
     Response,
+    SlottedHttpExchange,
+    SlottedRequest,
+    SlottedResponse,
     Headers,
+    HttpHeaders,
+    HttpQuery,
     Query,
 )
-import re
-from urllib import request
+from http_types.interning import Interner
+from http_types.bodystore import (
+    DEFAULT_BODY_THRESHOLD,
+    STORED_BINARY,
+    STORED_TEXT,
+    BodyStore,
+    StoredBody,
+)
+from http_types.instrumentation import Instrumentation
+
+if TYPE_CHECKING:
+    from http.client import HTTPResponse
+    from urllib.request import Request as UrllibRequest
+    from http_types.filtering import ExchangeFilter
+    from http_types.projection import ProjectedHttpExchange, Projection
+    from http_types.validation import Validator
 
 HttpType = Union[HttpExchange, Request, Response]
 
@@ -33,15 +70,208 @@ class BuilderException(Exception):
     pass
 
 
-def parse_body(body: str) -> Any:
+def parse_body(body: Body) -> Any:
     # TODO Handle errors for non-json
     try:
         return json.loads(body)
-    except json.JSONDecodeError:
+    except ValueError:
+        # Invalid JSON, or bytes that are not UTF-8, -16 or -32
         # TODO Typeguard does not accept missing arguments so return empty string for now
         return ""
 
 
+"""
+Media types that are never decoded as JSON, in addition to the image/, audio/,
+video/ and font/ families and XML types.
+"""
+NON_JSON_MEDIA_TYPES = frozenset(
+    [
+        "application/javascript",
+        "application/octet-stream",
+        "application/pdf",
+        "application/x-www-form-urlencoded",
+        "application/zip",
+        "multipart/form-data",
+        "text/css",
+        "text/html",
+        "text/javascript",
+    ]
+)
+
+NON_JSON_MEDIA_PREFIXES = ("image/", "audio/", "video/", "font/")
+
+
+def get_content_type(headers: Headers) -> Optional[str]:
+    """Find the value of the content-type header, ignoring case.
+
+    Arguments:
+        headers {Headers} -- Request or response headers.
+
+    Returns:
+        Optional[str] -- Content type or None if the header is not present.
+    """
+    if isinstance(headers, HttpHeaders):
+        value = headers.get("content-type", None)
+        if value is None:
+            return None
+        return value if isinstance(value, str) else next(iter(value), None)
+    for key, value in headers.items():
+        if key.lower() == "content-type":
+            return value if isinstance(value, str) else next(iter(value), None)
+    return None
+
+
+def may_be_json(content_type: Optional[str]) -> bool:
+    """Check if a body with the given content type could be JSON.
+
+    Example: text/html; charset=utf-8 => False
+
+    Arguments:
+        content_type {Optional[str]} -- Value of the content-type header, if any.
+    """
+    if content_type is None:
+        return True
+    media_type = content_type.split(";", 1)[0].strip().lower()
+    if media_type.endswith("json"):
+        return True
+    return not (
+        media_type in NON_JSON_MEDIA_TYPES
+        or media_type.startswith(NON_JSON_MEDIA_PREFIXES)
+        or media_type.endswith("xml")
+    )
+
+
+def lazy_body_as_json(body: Union[Body, PendingBody, None], headers: Headers) -> Any:
+    """bodyAsJson value for a body that should be decoded only when accessed.
+
+    Returns an empty string for empty bodies and bodies whose content type
+    rules out JSON, otherwise NOT_PARSED.
+    """
+    if not body or not may_be_json(get_content_type(headers)):
+        return ""
+    return NOT_PARSED
+
+
+"""
+Encodings of bodies in recordings, given by the bodyEncoding field next to the
+body. Bodies without bodyEncoding are text.
+"""
+BODY_ENCODINGS = {"base64": Base64Body}
+
+TEXT_MEDIA_TYPES = frozenset(
+    [
+        "application/javascript",
+        "application/x-www-form-urlencoded",
+    ]
+)
+
+
+def is_text_media_type(content_type: Optional[str]) -> bool:
+    """Check if a content type is for text, such as text/html or application/json.
+
+    Arguments:
+        content_type {Optional[str]} -- Value of the content-type header.
+    """
+    if content_type is None:
+        return False
+    media_type = content_type.split(";", 1)[0].strip().lower()
+    return (
+        media_type.startswith("text/")
+        or media_type.endswith("json")
+        or media_type.endswith("xml")
+        or media_type in TEXT_MEDIA_TYPES
+    )
+
+
+def body_from_bytes(data: bytes, headers: Headers) -> Body:
+    """Body captured as bytes, decoded to text if it is text.
+
+    Bodies are decoded if the content type is for text, or missing, and the
+    data is valid UTF-8. Other bodies, such as images, are kept as bytes.
+
+    Arguments:
+        data {bytes} -- Body as sent.
+        headers {Headers} -- Headers sent with the body.
+    """
+    content_type = get_content_type(headers)
+    if content_type is None or is_text_media_type(content_type):
+        try:
+            return data.decode("utf8")
+        except UnicodeDecodeError:
+            pass
+    return data
+
+
+SHA256_DIGEST = re.compile(r"[0-9a-f]{64}\Z")
+
+
+def decode_body_field(obj: Dict, body_store: Optional[BodyStore] = None):
+    """Replace an encoded or stored body of a request or response dictionary
+    with a PendingBody that loads it on first access, in place.
+
+    Arguments:
+        obj {Dict} -- Request or response in the HTTP types format.
+
+    Keyword Arguments:
+        body_store {Optional[BodyStore]} -- Store holding bodies moved out of
+            the recording. (default: {None})
+
+    Raises:
+        BuilderException: For an unknown body encoding, or a stored body
+            without a body store.
+    """
+    encoding = obj.pop("bodyEncoding", None)
+    if encoding is None:
+        return
+    body = obj.get("body", None)
+    if encoding == STORED_TEXT or encoding == STORED_BINARY:
+        if body_store is None:
+            raise BuilderException("Body is in a body store, but none was given")
+        if not isinstance(body, str) or SHA256_DIGEST.match(body) is None:
+            raise BuilderException("Invalid stored body digest: {}".format(body))
+        obj["body"] = StoredBody(body_store, body, encoding == STORED_TEXT)
+        return
+    if encoding not in BODY_ENCODINGS:
+        raise BuilderException("Unsupported body encoding: {}".format(encoding))
+    if isinstance(body, str):
+        obj["body"] = BODY_ENCODINGS[encoding](body)
+
+
+def encode_body(
+    body: Body,
+    body_store: Optional[BodyStore] = None,
+    body_threshold: int = DEFAULT_BODY_THRESHOLD,
+) -> Tuple[str, Optional[str]]:
+    """Body and body encoding to write to a recording.
+
+    Arguments:
+        body {Body} -- Text or binary body.
+
+    Keyword Arguments:
+        body_store {Optional[BodyStore]} -- Store to move large bodies to. (default: {None})
+        body_threshold {int} -- Size in bytes of bodies that are moved to the
+            store, counting text bodies in UTF-8.
+
+    Returns:
+        Tuple[str, Optional[str]] -- Text body and None, the base64 encoding
+            of a binary body and "base64", or the key of a stored body and
+            "sha256-utf8" or "sha256".
+    """
+    if body_store is not None:
+        if isinstance(body, str):
+            # UTF-8 takes one to four bytes per character, so shorter bodies
+            # are not encoded to measure them
+            if len(body) * 4 >= body_threshold:
+                data = body.encode("utf-8")
+                if len(data) >= body_threshold:
+                    return body_store.put(data), STORED_TEXT
+        elif len(body) >= body_threshold:
+            return body_store.put(body), STORED_BINARY
+    if isinstance(body, bytes):
+        return base64.b64encode(body).decode("ascii"), "base64"
+    return body, None
+
+
 def parse_pathname(path: str) -> str:
     """Parse pathname from path.
 
@@ -53,7 +283,7 @@ def parse_pathname(path: str) -> str:
     Returns:
         str -- [description]
     """
-    return urlparse(path).path
+    return parse_path(path)[0]
 
 
 path_capture = re.compile(r"^https?:\/\/[^\/]+(\/(?:\S)*)?$")
@@ -87,11 +317,77 @@ def parse_qs_flattening(query_string: str) -> Query:
     return query_dict
 
 
-def fixup_entries_for_serialization(data_to_be_serialized: Union[Dict, HttpType]):
+"""
+Maximum number of entries in each cache of parsed paths, parsed query strings
+and encoded queries.
+"""
+URL_CACHE_SIZE = 4096
+
+
+@lru_cache(maxsize=URL_CACHE_SIZE)
+def parse_query(query_string: str) -> HttpQuery:
+    """Parse a query string, sharing the result between equal query strings.
+
+    Example: id=1&q=v1&q=v2 => {"id": "1", "q": ["v1", "v2"]}
+
+    Arguments:
+        query_string {str} -- Query string without the leading question mark.
+
+    Returns:
+        HttpQuery -- Immutable query parameters.
+    """
+    return HttpQuery(parse_qs_flattening(query_string))
+
+
+@lru_cache(maxsize=URL_CACHE_SIZE)
+def parse_path(path: str) -> Tuple[str, HttpQuery]:
+    """Parse pathname and query parameters from path, sharing the result between
+    equal paths.
+
+    Example: /v1/repos?id=1 => ("/v1/repos", {"id": "1"})
+
+    Arguments:
+        path {str} -- Request path.
+
+    Returns:
+        Tuple[str, HttpQuery] -- Pathname and immutable query parameters.
+    """
+    parsed = urlparse(path)
+    return parsed.path, parse_query(parsed.query)
+
+
+@lru_cache(maxsize=URL_CACHE_SIZE)
+def _encode_query(items: Tuple[Tuple[str, Union[str, Tuple[str, ...]]], ...]) -> str:
+    return url_encode_params(dict(items))
+
+
+def encode_query(query: Query) -> str:
+    """Encode query parameters as a query string, caching the result for
+    parameters with the same names, values and order.
+
+    Arguments:
+        query {Query} -- Query parameters.
+
+    Returns:
+        str -- Query string without the leading question mark.
+    """
+    if not query:
+        return ""
+    return _encode_query(
+        tuple(
+            (key, value if isinstance(value, str) else tuple(value))
+            for key, value in query.items()
+        )
+    )
+
+
+def fixup_entries_for_serialization(data_to_be_serialized: Union[Mapping, HttpType]):
     """Fixup entries for JSON serialization"""
+    import copy
+
     as_dict = (
-        data_to_be_serialized
-        if isinstance(data_to_be_serialized, dict)
+        dict(data_to_be_serialized)
+        if isinstance(data_to_be_serialized, Mapping)
         else asdict(data_to_be_serialized)
     )
     # Deep copy to avoid mutating nested dictionaries
@@ -105,12 +401,134 @@ def fixup_entries_for_serialization(data_to_be_serialized: Union[Dict, HttpType]
             as_dict[key] = as_dict[key].value
         elif key == "protocol":
             as_dict[key] = as_dict[key].value
-        elif isinstance(value, dict):
+        elif isinstance(value, Mapping):
             as_dict[key] = fixup_entries_for_serialization(value)
     return as_dict
 
 
+_serialized_fields: Dict[type, Tuple[str, ...]] = {}
+
+
+def serialized_fields(cls: type) -> Tuple[str, ...]:
+    """Names of the dataclass fields written to JSON, in declaration order."""
+    names = _serialized_fields.get(cls, None)
+    if names is None:
+        names = tuple(f.name for f in fields(cls) if f.name != "bodyAsJson")
+        _serialized_fields[cls] = names
+    return names
+
+
+def serialize(
+    obj: Union[Mapping, HttpType],
+    body_store: Optional[BodyStore] = None,
+    body_threshold: int = DEFAULT_BODY_THRESHOLD,
+) -> Dict:
+    """Convert an HTTP type or dictionary to a dictionary ready for JSON serialization.
+
+    Produces the same result as fixup_entries_for_serialization() in a single
+    pass without copying the input. Binary bodies are written in base64 with
+    a bodyEncoding field. Containers that need no changes, such as
+    lists of header values, are shared with the input rather than copied.
+
+    Arguments:
+        obj {Union[Mapping, HttpType]} -- Exchange, request, response or dictionary.
+
+    Keyword Arguments:
+        body_store {Optional[BodyStore]} -- Store to move large bodies to,
+            leaving their keys in the result. (default: {None})
+        body_threshold {int} -- See encode_body().
+
+    Returns:
+        Dict -- Dictionary with enums as strings and empty entries removed.
+    """
+    if isinstance(obj, Mapping):
+        items: Iterable[Tuple[Any, Any]] = obj.items()
+    else:
+        items = ((name, getattr(obj, name)) for name in serialized_fields(type(obj)))
+    as_dict: Dict[str, Any] = {}
+    for key, value in items:
+        if key == "bodyAsJson" or value is None or value == "":
+            continue
+        if (key == "method" or key == "protocol") and isinstance(value, enum.Enum):
+            value = value.value
+        elif isinstance(value, Mapping) or is_dataclass(value):
+            if body_store is not None and (key == "request" or key == "response"):
+                # Headers, query and meta never hold bodies
+                value = serialize(cast(Mapping, value), body_store, body_threshold)
+            else:
+                value = serialize(cast(Mapping, value))
+        elif key == "body" and (body_store is not None or isinstance(value, bytes)):
+            if not value:
+                continue
+            value, encoding = encode_body(value, body_store, body_threshold)
+            if encoding is not None:
+                as_dict[key] = value
+                as_dict["bodyEncoding"] = encoding
+                continue
+        as_dict[key] = value
+    return as_dict
+
+
+"""
+Timestamps in the RFC 3339 form written by recorders, such as
+2020-01-31T13:34:15.123Z. The group is the fraction of a second.
+"""
+RFC3339_TIMESTAMP = re.compile(
+    r"[0-9]{4}-[0-9]{2}-[0-9]{2}T[0-9]{2}:[0-9]{2}:[0-9]{2}"
+    r"(?:\.([0-9]{1,6}))?(?:Z|[+-][0-9]{2}:[0-9]{2})?\Z"
+)
+
+# datetime.fromisoformat() is only available from Python 3.7
+_fromisoformat = getattr(datetime, "fromisoformat", None)
+
+
+def schema_validator() -> "Validator":
+    """Validator of the HTTP types schema, compiled on first use."""
+    from http_types.validation import default_validator
+
+    return default_validator()
+
+
+def as_json_object(obj: HttpType) -> Dict:
+    """An HTTP type as it would be written to and read back from JSON."""
+    return json.loads(json_encoder.encode(serialize(obj)))
+
+
+def parse_rfc3339_datetime(input_string: str) -> Optional[datetime]:
+    """Parse the common RFC 3339 timestamp forms with datetime.fromisoformat().
+
+    Arguments:
+        input_string {str} -- Timestamp such as 2020-01-31T13:34:15+02:00.
+
+    Returns:
+        Optional[datetime] -- Parsed timestamp, or None if the string is not in
+            one of the supported forms or fromisoformat() is not available.
+    """
+    if _fromisoformat is None:
+        return None
+    match = RFC3339_TIMESTAMP.match(input_string)
+    if match is None:
+        return None
+    if input_string[-1] == "Z":
+        input_string = input_string[:-1] + "+00:00"
+    fraction = match.group(1)
+    if fraction is not None and len(fraction) != 3 and len(fraction) != 6:
+        # Before Python 3.11 fromisoformat() accepts only 3 or 6 digits
+        end = 20 + len(fraction)
+        input_string = input_string[:20] + fraction.ljust(6, "0") + input_string[end:]
+    try:
+        return _fromisoformat(input_string)
+    except ValueError:
+        return None
+
+
 def parse_iso860_datetime(input_string: str) -> datetime:
+    parsed = parse_rfc3339_datetime(input_string)
+    if parsed is not None:
+        return parsed
+    # dateutil is slow to import and only needed for unusual timestamps
+    from dateutil.parser import isoparse
+
     try:
         return isoparse(input_string)
     except ValueError:
@@ -119,11 +537,40 @@ def parse_iso860_datetime(input_string: str) -> datetime:
         raise ValueError("Invalid isoformat string: " + input_string)
 
 
-def url_encode_params(params: Dict):
+def fill_path_and_query(obj: Dict):
+    """Fill in whichever of path, pathname and query a request dictionary lacks,
+    in place. The query is converted to HttpQuery.
+
+    Arguments:
+        obj {Dict} -- Request in the HTTP types format.
+    """
+    path = obj.get("path", None)
+    query = obj.get("query", None)
+    if query is None:
+        if path is not None:
+            obj["query"] = parse_path(path)[1]
+    elif isinstance(query, str):
+        obj["query"] = parse_query(query)
+    elif not isinstance(query, HttpQuery):
+        obj["query"] = HttpQuery(query)
+
+    if path is None:
+        if "pathname" not in obj:
+            raise Exception("One of 'path' or 'pathname' is required")
+        path = obj["pathname"]
+        if "query" in obj:
+            path += "?" + encode_query(obj["query"])
+        obj["path"] = path
+
+    if obj.get("pathname", None) is None:
+        obj["pathname"] = parse_path(path)[0]
+
+
+def url_encode_params(params: Mapping):
     """Wrapper around urlencode() that handles multi-valued (mapped to an array) parameters."""
     params_list = []
     for key, value in params.items():
-        if isinstance(value, list):
+        if isinstance(value, (list, tuple)):
             params_list.extend([(key, x) for x in value])
         else:
             params_list.append((key, value))
@@ -135,7 +582,7 @@ class RequestBuilder:
         raise Exception("Do not instantiate")
 
     @staticmethod
-    def from_urllib_request(obj: request.Request) -> Request:
+    def from_urllib_request(obj: "UrllibRequest") -> Request:
         parsed = urlparse(obj.full_url)
         req = RequestBuilder.from_dict(
             dict(
@@ -149,59 +596,85 @@ class RequestBuilder:
                 protocol="https" if obj.full_url[:5] == "https" else "http",
                 body=obj.data
                 if isinstance(obj.data, str)
-                else obj.data.decode("utf8")
+                else body_from_bytes(obj.data, HttpHeaders(obj.header_items()))
                 if isinstance(obj.data, bytes)
                 else None,
-                headers={k: v for k, v in obj.header_items()},
+                headers=HttpHeaders(obj.header_items()),
             )
         )
-        RequestBuilder.validate(req)
         return req
 
     @staticmethod
-    def from_dict(obj: Dict) -> Request:
+    def from_dict(
+        obj: Dict,
+        slotted: bool = False,
+        interner: Optional[Interner] = None,
+        body_store: Optional[BodyStore] = None,
+        instrumentation: Optional[Instrumentation] = None,
+        strict: bool = False,
+    ) -> Request:
+        """Build Request from dictionary, filling in any optional fields.
+
+        Arguments:
+            obj {Dict} -- Request in the HTTP types format.
+
+        Keyword Arguments:
+            slotted {bool} -- Build a SlottedRequest. (default: {False})
+            interner {Optional[Interner]} -- Share host, pathname and headers
+                with other requests built with the same interner.
+            body_store {Optional[BodyStore]} -- Store holding bodies moved out of
+                the recording, loaded when accessed. (default: {None})
+            instrumentation {Optional[Instrumentation]} -- Time the stages of
+                building. (default: {None})
+            strict {bool} -- Check the dictionary against the HTTP types schema
+                first, raising ValidationError for invalid ones. (default: {False})
+        """
+        timer = None if instrumentation is None else instrumentation.timer()
+        if strict:
+            schema_validator().validate_request(obj)
+            if timer is not None:
+                timer.lap("read.validate")
         obj_copy = dict(**obj)
 
         obj_copy["method"] = HttpMethod(obj_copy["method"])
         obj_copy["protocol"] = Protocol(obj_copy["protocol"])
 
-        if (obj_copy.get("path", None) is not None) and (
-            obj_copy.get("query", None) is None
-        ):
-            query_dict = parse_qs_flattening(urlparse(obj_copy["path"]).query)
-            obj_copy["query"] = query_dict
-
-        if obj_copy.get("path", None) is None:
-            if "pathname" not in obj_copy:
-                raise Exception("One of 'path' or 'pathname' is required")
-            path = obj_copy["pathname"]
-            if "query" in obj_copy:
-                path += "?" + url_encode_params(obj_copy["query"])
-            obj_copy["path"] = path
-
-        if obj_copy.get("pathname", None) is None:
-            path = obj_copy["path"]
-            obj_copy["pathname"] = parse_pathname(path)
+        fill_path_and_query(obj_copy)
+        if timer is not None:
+            timer.lap("read.url")
 
         bodyAsJson = obj_copy.get("bodyAsJson", None)
 
+        decode_body_field(obj_copy, body_store)
         if obj_copy.get("body", None) is None:
             obj_copy["body"] = json.dumps(bodyAsJson) if bodyAsJson else ""
+        if timer is not None:
+            timer.lap("read.body")
 
-        if obj_copy.get("headers", None) is None:
-            obj_copy["headers"] = {}
+        obj_copy["headers"] = HttpHeaders(obj_copy.get("headers", None) or {})
+        if timer is not None:
+            timer.lap("read.headers")
 
         if bodyAsJson is None:
-            body_as_json = parse_body(obj_copy["body"])
-            obj_copy["bodyAsJson"] = body_as_json
+            obj_copy["bodyAsJson"] = lazy_body_as_json(
+                obj_copy["body"], obj_copy["headers"]
+            )
+            if timer is not None:
+                timer.lap("read.body")
 
         if obj_copy.get("timestamp", None) is None:
             obj_copy["timestamp"] = None
         else:
             obj_copy["timestamp"] = parse_iso860_datetime(obj_copy["timestamp"])
+            if timer is not None:
+                timer.lap("read.timestamp")
+
+        if interner is not None:
+            interner.fields(obj_copy, ("host", "pathname"))
 
-        req = Request(**obj_copy)
-        RequestBuilder.validate(req)
+        req = (SlottedRequest if slotted else Request)(**obj_copy)
+        if timer is not None:
+            timer.lap("read.build")
         return req
 
     @staticmethod
@@ -237,7 +710,7 @@ class RequestBuilder:
         # Query string
         query_str = parsed_url.query
 
-        query = parse_qs_flattening(query_str)
+        query = parse_query(query_str)
 
         host = parsed_url.netloc
 
@@ -250,22 +723,44 @@ class RequestBuilder:
             path=path,
             pathname=pathname,
             query=query,
-            headers=headers,
+            headers=HttpHeaders(headers),
             timestamp=None,
         )
-        RequestBuilder.validate(req)
         return req
 
+    @staticmethod
+    def cache_info() -> Dict[str, Any]:
+        """Hits, misses and sizes of the caches of parsed paths, parsed query
+        strings and encoded queries used when building requests.
+
+        Returns:
+            Dict[str, Any] -- functools cache info for "path", "query" and
+                "encoded_query".
+        """
+        return {
+            "path": parse_path.cache_info(),
+            "query": parse_query.cache_info(),
+            "encoded_query": _encode_query.cache_info(),
+        }
+
+    @staticmethod
+    def cache_clear() -> None:
+        """Empty the caches of parsed paths and queries and reset their statistics."""
+        parse_path.cache_clear()
+        parse_query.cache_clear()
+        _encode_query.cache_clear()
+
     @staticmethod
     def validate(request: Request) -> None:
-        """Run-time typechecking for request object.
+        """Check a request against the HTTP types schema.
 
         Arguments:
             request {Request} -- Possible request object.
+
+        Raises:
+            ValidationError: With all the violations, if there are any.
         """
-        # No validation currently needed, safe to remove
-        # if no future validation needed
-        pass
+        schema_validator().validate_request(as_json_object(request))
 
 
 class ResponseBuilder:
@@ -273,50 +768,97 @@ class ResponseBuilder:
         raise Exception("Do not instantiate")
 
     @staticmethod
-    def from_http_client_response(obj: HTTPResponse) -> Response:
+    def from_http_client_response(obj: "HTTPResponse") -> Response:
         body = obj.read()
         res = ResponseBuilder.from_dict(
             dict(
                 statusCode=obj.getcode(),
-                headers={k: v for k, v in obj.getheaders()},
+                headers=HttpHeaders(obj.getheaders()),
                 body=body
                 if isinstance(body, str)
-                else body.decode("utf8")
+                else body_from_bytes(body, HttpHeaders(obj.getheaders()))
                 if isinstance(body, bytes)
                 else None,
             )
         )
-        ResponseBuilder.validate(res)
         return res
 
     @staticmethod
-    def from_dict(obj: Any) -> Response:
+    def from_dict(
+        obj: Any,
+        slotted: bool = False,
+        interner: Optional[Interner] = None,
+        body_store: Optional[BodyStore] = None,
+        instrumentation: Optional[Instrumentation] = None,
+        strict: bool = False,
+    ) -> Response:
+        """Build Response from dictionary, filling in any optional fields.
+
+        Arguments:
+            obj {Any} -- Response in the HTTP types format.
+
+        Keyword Arguments:
+            slotted {bool} -- Build a SlottedResponse. (default: {False})
+            interner {Optional[Interner]} -- Share headers with other responses
+                built with the same interner.
+            body_store {Optional[BodyStore]} -- Store holding bodies moved out of
+                the recording, loaded when accessed. (default: {None})
+            instrumentation {Optional[Instrumentation]} -- Time the stages of
+                building. (default: {None})
+            strict {bool} -- Check the dictionary against the HTTP types schema
+                first, raising ValidationError for invalid ones. (default: {False})
+        """
+        timer = None if instrumentation is None else instrumentation.timer()
+        if strict:
+            schema_validator().validate_response(obj)
+            if timer is not None:
+                timer.lap("read.validate")
         obj_copy = dict(**obj)
 
+        decode_body_field(obj_copy, body_store)
         if obj_copy.get("body", None) is None:
             obj_copy["body"] = ""
+        if timer is not None:
+            timer.lap("read.body")
+
+        if obj_copy.get("headers", None) is not None:
+            obj_copy["headers"] = HttpHeaders(obj_copy["headers"])
+            if timer is not None:
+                timer.lap("read.headers")
 
         if obj_copy.get("bodyAsJson", None) is None:
-            body_as_json = parse_body(obj_copy["body"])
-            obj_copy["bodyAsJson"] = body_as_json
+            obj_copy["bodyAsJson"] = lazy_body_as_json(
+                obj_copy["body"], obj_copy.get("headers", None) or {}
+            )
+            if timer is not None:
+                timer.lap("read.body")
 
         if obj_copy.get("timestamp", None) is None:
             obj_copy["timestamp"] = None
         else:
             obj_copy["timestamp"] = parse_iso860_datetime(obj_copy["timestamp"])
+            if timer is not None:
+                timer.lap("read.timestamp")
 
-        res = Response(**obj_copy)
-        ResponseBuilder.validate(res)
+        if interner is not None:
+            interner.fields(obj_copy)
+
+        res = (SlottedResponse if slotted else Response)(**obj_copy)
+        if timer is not None:
+            timer.lap("read.build")
         return res
 
     @staticmethod
     def validate(response: Response) -> None:
-        """Run-time typechecking for response object.
+        """Check a response against the HTTP types schema.
 
         Arguments:
             response {Response} -- Possible response object.
+
+        Raises:
+            ValidationError: With all the violations, if there are any.
         """
-        pass
+        schema_validator().validate_response(as_json_object(response))
 
 
 class HttpExchangeBuilder:
@@ -326,19 +868,46 @@ class HttpExchangeBuilder:
         raise Exception("Do not instantiate")
 
     @staticmethod
-    def from_dict(obj: Dict) -> HttpExchange:
+    def from_dict(
+        obj: Dict,
+        slotted: bool = False,
+        interner: Optional[Interner] = None,
+        body_store: Optional[BodyStore] = None,
+        instrumentation: Optional[Instrumentation] = None,
+        strict: bool = False,
+    ) -> HttpExchange:
         """
         Build HttpExchange from dictionary, filling in any optional fields.
 
         Arguments:
             obj {Any} -- Dictionary containing at least protocol, hostname, path, and headers.
 
+        Keyword Arguments:
+            slotted {bool} -- Build a SlottedHttpExchange holding a SlottedRequest and
+                a SlottedResponse, which use less memory. (default: {False})
+            interner {Optional[Interner]} -- Share equal strings and headers between
+                exchanges built with the same interner.
+            body_store {Optional[BodyStore]} -- Store holding bodies moved out of
+                the recording, loaded when accessed. (default: {None})
+            instrumentation {Optional[Instrumentation]} -- Time the stages of
+                building. (default: {None})
+            strict {bool} -- Check the dictionary against the HTTP types schema
+                first, raising ValidationError for invalid ones. (default: {False})
+
         Raises:
             BuilderException: For invalid dictionary.
+            ValidationError: In strict mode, for a dictionary not conforming to
+                the schema, with all the violations.
 
         Returns:
             HttpExchange -- Request-response pair.
         """
+        if strict:
+            timer = None if instrumentation is None else instrumentation.timer()
+            schema_validator().validate(obj)
+            if timer is not None:
+                timer.lap("read.validate")
+
         if "request" not in obj:
             raise BuilderException("Missing request")
 
@@ -346,27 +915,51 @@ class HttpExchangeBuilder:
             raise BuilderException("Missing response")
 
         req_obj = obj["request"]
-        req = RequestBuilder.from_dict(req_obj)
+        req = RequestBuilder.from_dict(
+            req_obj,
+            slotted=slotted,
+            interner=interner,
+            body_store=body_store,
+            instrumentation=instrumentation,
+        )
 
         res_obj = obj["response"]
-        res = ResponseBuilder.from_dict(res_obj)
+        res = ResponseBuilder.from_dict(
+            res_obj,
+            slotted=slotted,
+            interner=interner,
+            body_store=body_store,
+            instrumentation=instrumentation,
+        )
 
+        timer = None if instrumentation is None else instrumentation.timer()
+        exchange_cls = SlottedHttpExchange if slotted else HttpExchange
         reqres = (
-            HttpExchange(request=req, response=res, meta=obj["meta"])
+            exchange_cls(request=req, response=res, meta=obj["meta"])
             if "meta" in obj
-            else HttpExchange(request=req, response=res)
+            else exchange_cls(request=req, response=res)
         )
-        HttpExchangeBuilder.validate(reqres)
+        if timer is not None:
+            timer.lap("read.build")
         return reqres
 
     @staticmethod
     def validate(reqres: HttpExchange) -> None:
-        """Run-time typechecking for request-response pair.
+        """Check a request-response pair against the HTTP types schema.
 
         Arguments:
             reqres {HttpExchange} -- Possible request-response object.
+
+        Raises:
+            ValidationError: With all the violations, if there are any.
         """
-        pass
+        schema_validator().validate(as_json_object(reqres))
+
+
+"""
+Default size of a chunk of a recording handed to a single worker process, in bytes.
+"""
+DEFAULT_CHUNK_SIZE = 8 * 1024 * 1024
 
 
 class HttpExchangeReader:
@@ -374,23 +967,330 @@ class HttpExchangeReader:
         raise Exception("Do not instantiate")
 
     @staticmethod
-    def from_json(input_json: Union[str, bytes]) -> HttpExchange:
+    def from_json(
+        input_json: Union[str, bytes],
+        slotted: bool = False,
+        interner: Optional[Interner] = None,
+        body_store: Optional[BodyStore] = None,
+        strict: bool = False,
+    ) -> HttpExchange:
         """Read a single HTTP exchange from a JSON string.
 
         Arguments:
             input_json: {str} -- The input JSON to parse.
+
+        Keyword Arguments:
+            slotted: {bool} -- Build slotted exchanges. (default: {False})
+            interner: {Optional[Interner]} -- Share equal strings and headers between exchanges.
+            body_store: {Optional[BodyStore]} -- Store holding bodies moved out of the recording.
+            strict: {bool} -- Check the exchange against the HTTP types schema,
+                raising ValidationError if it does not conform. (default: {False})
+        """
+        return HttpExchangeBuilder.from_dict(
+            json.loads(input_json),
+            slotted=slotted,
+            interner=interner,
+            body_store=body_store,
+            strict=strict,
+        )
+
+    @staticmethod
+    def from_lines(
+        lines: Iterable[Union[str, bytes]],
+        slotted: bool = False,
+        interner: Optional[Interner] = None,
+        where: Optional["ExchangeFilter"] = None,
+        body_store: Optional[BodyStore] = None,
+        instrumentation: Optional[Instrumentation] = None,
+        strict: bool = False,
+    ) -> Generator[HttpExchange, None, None]:
+        """Read HTTP exchanges from JSON lines.
+
+        Arguments:
+            lines: {Iterable[Union[str, bytes]]} -- The lines to parse, one exchange each.
+
+        Keyword Arguments:
+            slotted: {bool} -- Build slotted exchanges. (default: {False})
+            interner: {Optional[Interner]} -- Share equal strings and headers between
+                exchanges. (default: {None})
+            where: {Optional[ExchangeFilter]} -- Only build exchanges matching the
+                filter, checking lines before they are decoded. (default: {None})
+            body_store: {Optional[BodyStore]} -- Store holding bodies moved out of the
+                recording. Bodies are read from it only when accessed. (default: {None})
+            instrumentation: {Optional[Instrumentation]} -- Count records, bytes and
+                failures and time each stage of reading. (default: {None})
+            strict: {bool} -- Check each exchange against the HTTP types schema,
+                raising ValidationError at the first one that does not conform.
+                (default: {False})
         """
-        return HttpExchangeBuilder.from_dict(json.loads(input_json))
+        if instrumentation is not None:
+            yield from HttpExchangeReader._from_lines_instrumented(
+                lines, slotted, interner, where, body_store, instrumentation, strict
+            )
+            return
+        if where is None:
+            for line in lines:
+                yield HttpExchangeReader.from_json(
+                    line,
+                    slotted=slotted,
+                    interner=interner,
+                    body_store=body_store,
+                    strict=strict,
+                )
+            return
+        matches_line = where.matches_line
+        matches = where.matches
+        for line in lines:
+            if matches_line(line):
+                obj = json.loads(line)
+                if matches(obj):
+                    yield HttpExchangeBuilder.from_dict(
+                        obj,
+                        slotted=slotted,
+                        interner=interner,
+                        body_store=body_store,
+                        strict=strict,
+                    )
+
+    @staticmethod
+    def _from_lines_instrumented(
+        lines: Iterable[Union[str, bytes]],
+        slotted: bool,
+        interner: Optional[Interner],
+        where: Optional["ExchangeFilter"],
+        body_store: Optional[BodyStore],
+        instrumentation: Instrumentation,
+        strict: bool,
+    ) -> Generator[HttpExchange, None, None]:
+        """from_lines() measuring each stage, kept apart so that reading
+        without instrumentation pays nothing for it."""
+        count = instrumentation.count
+        for line in lines:
+            count("read.records")
+            count("read.bytes", len(line))
+            timer = instrumentation.timer()
+            try:
+                if where is not None and not where.matches_line(line):
+                    timer.lap("read.filter")
+                    count("read.filtered")
+                    continue
+                obj = json.loads(line)
+                timer.lap("read.json_decode")
+                if where is not None and not where.matches(obj):
+                    timer.lap("read.filter")
+                    count("read.filtered")
+                    continue
+                exchange = HttpExchangeBuilder.from_dict(
+                    obj,
+                    slotted=slotted,
+                    interner=interner,
+                    body_store=body_store,
+                    instrumentation=instrumentation,
+                    strict=strict,
+                )
+            except Exception:
+                count("read.failures")
+                raise
+            count("read.exchanges")
+            yield exchange
 
     @staticmethod
-    def from_jsonl(input_file: IO[str]) -> Generator[HttpExchange, None, None]:
+    def from_jsonl(
+        input_file: IO[str],
+        slotted: bool = False,
+        interner: Optional[Interner] = None,
+        where: Optional["ExchangeFilter"] = None,
+        body_store: Optional[BodyStore] = None,
+        instrumentation: Optional[Instrumentation] = None,
+        strict: bool = False,
+    ) -> Generator[HttpExchange, None, None]:
         """Read HTTP exchanges line by line from a file-like object.
 
         Arguments:
             input_file: {IO} -- The input to read from.
+
+        Keyword Arguments:
+            slotted: {bool} -- Build slotted exchanges. (default: {False})
+            interner: {Optional[Interner]} -- Share equal strings and headers between
+                exchanges, for example Interner(). (default: {None})
+            where: {Optional[ExchangeFilter]} -- Only build exchanges matching the
+                filter. (default: {None})
+            body_store: {Optional[BodyStore]} -- Store holding bodies moved out of the
+                recording. (default: {None})
+            instrumentation: {Optional[Instrumentation]} -- Count records, bytes and
+                failures and time each stage of reading. (default: {None})
+            strict: {bool} -- Check each exchange against the HTTP types schema.
+                (default: {False})
         """
+        yield from HttpExchangeReader.from_lines(
+            input_file,
+            slotted=slotted,
+            interner=interner,
+            where=where,
+            body_store=body_store,
+            instrumentation=instrumentation,
+            strict=strict,
+        )
+
+    @staticmethod
+    def from_jsonl_projected(
+        input_file: Iterable[Union[str, bytes]],
+        projection: "Projection",
+        where: Optional["ExchangeFilter"] = None,
+        body_store: Optional[BodyStore] = None,
+    ) -> Generator["ProjectedHttpExchange", None, None]:
+        """Read selected parts of HTTP exchanges line by line.
+
+        Parts excluded by the projection are not built, and their bodies and
+        timestamps are not decoded. Blank lines are skipped.
+
+        Arguments:
+            input_file: {Iterable[Union[str, bytes]]} -- The input to read from.
+            projection: {Projection} -- Parts to load, for example Projection.REQUEST_ONLY.
+
+        Keyword Arguments:
+            where: {Optional[ExchangeFilter]} -- Only build exchanges matching the
+                filter. (default: {None})
+            body_store: {Optional[BodyStore]} -- Store holding bodies moved out of the
+                recording. (default: {None})
+        """
+        from http_types.projection import project
+
         for line in input_file:
-            yield HttpExchangeReader.from_json(line)
+            if not line.strip():
+                continue
+            if where is not None and not where.matches_line(line):
+                continue
+            obj = json.loads(line)
+            if where is None or where.matches(obj):
+                yield project(obj, projection, body_store)
+
+    @staticmethod
+    def from_path(
+        path: str,
+        slotted: bool = False,
+        interner: Optional[Interner] = None,
+        where: Optional["ExchangeFilter"] = None,
+        body_store: Optional[BodyStore] = None,
+        instrumentation: Optional[Instrumentation] = None,
+        strict: bool = False,
+    ) -> Generator[HttpExchange, None, None]:
+        """Read HTTP exchanges from a JSONL file, which may be compressed.
+
+        Gzip, bzip2 and xz recordings are detected from their magic bytes and
+        decompressed as a stream. Blank lines are skipped.
+
+        Arguments:
+            path: {str} -- Path to the recording.
+
+        Keyword Arguments:
+            slotted: {bool} -- Build slotted exchanges. (default: {False})
+            interner: {Optional[Interner]} -- Share equal strings and headers between
+                exchanges. (default: {None})
+            where: {Optional[ExchangeFilter]} -- Only build exchanges matching the
+                filter. (default: {None})
+            body_store: {Optional[BodyStore]} -- Store holding bodies moved out of the
+                recording, for example BodyStore.for_recording(path). (default: {None})
+            instrumentation: {Optional[Instrumentation]} -- Count records, bytes and
+                failures and time each stage of reading. (default: {None})
+            strict: {bool} -- Check each exchange against the HTTP types schema.
+                (default: {False})
+        """
+        from http_types.compression import open_recording
+
+        with open_recording(path, "rb") as input_file:
+            yield from HttpExchangeReader.from_lines(
+                (line for line in input_file if line.strip()),
+                slotted=slotted,
+                interner=interner,
+                where=where,
+                body_store=body_store,
+                instrumentation=instrumentation,
+                strict=strict,
+            )
+
+    @staticmethod
+    def from_mmap(
+        path: str,
+        slotted: bool = False,
+        interner: Optional[Interner] = None,
+        where: Optional["ExchangeFilter"] = None,
+        body_store: Optional[BodyStore] = None,
+        instrumentation: Optional[Instrumentation] = None,
+        strict: bool = False,
+    ) -> Generator[HttpExchange, None, None]:
+        """Read HTTP exchanges line by line from a memory-mapped JSONL file.
+
+        Lines are passed to the JSON decoder as bytes, skipping text decoding.
+
+        Arguments:
+            path: {str} -- Path to the JSONL file.
+
+        Keyword Arguments:
+            slotted: {bool} -- Build slotted exchanges. (default: {False})
+            interner: {Optional[Interner]} -- Share equal strings and headers between
+                exchanges. (default: {None})
+            where: {Optional[ExchangeFilter]} -- Only build exchanges matching the
+                filter. (default: {None})
+            body_store: {Optional[BodyStore]} -- Store holding bodies moved out of the
+                recording. (default: {None})
+            instrumentation: {Optional[Instrumentation]} -- Count records, bytes and
+                failures and time each stage of reading. (default: {None})
+            strict: {bool} -- Check each exchange against the HTTP types schema.
+                (default: {False})
+        """
+        from http_types.mapped import MappedRecording
+
+        with MappedRecording(path) as recording:
+            recording.advise_sequential()
+            yield from recording.exchanges(
+                slotted=slotted,
+                interner=interner,
+                where=where,
+                body_store=body_store,
+                instrumentation=instrumentation,
+                strict=strict,
+            )
+
+    @staticmethod
+    def from_jsonl_parallel(
+        path: str,
+        workers: Optional[int] = None,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+        ordered: bool = True,
+        where: Optional["ExchangeFilter"] = None,
+        body_store: Optional[BodyStore] = None,
+    ) -> Generator[HttpExchange, None, None]:
+        """Read HTTP exchanges from a JSONL file using multiple processes.
+
+        The file is split into byte ranges on line boundaries, which are
+        parsed in a process pool.
+
+        Arguments:
+            path: {str} -- Path to the JSONL file.
+
+        Keyword Arguments:
+            workers: {Optional[int]} -- Number of worker processes (default: number of CPUs).
+            chunk_size: {int} -- Approximate size of each range in bytes.
+                (default: {8 MB})
+            ordered: {bool} -- Yield exchanges in file order (default: True).
+            where: {Optional[ExchangeFilter]} -- Only build exchanges matching the
+                filter, in the worker processes. (default: {None})
+            body_store: {Optional[BodyStore]} -- Store holding bodies moved out of the
+                recording. (default: {None})
+        """
+        if chunk_size <= 0:
+            raise ValueError("chunk_size must be positive, got {}".format(chunk_size))
+        from http_types.parallel import read_jsonl_parallel
+
+        return read_jsonl_parallel(
+            path,
+            workers=workers,
+            chunk_size=chunk_size,
+            ordered=ordered,
+            where=where,
+            body_store=body_store,
+        )
 
 
 def json_serial(obj):
@@ -401,17 +1301,143 @@ def json_serial(obj):
     raise TypeError("Type %s not serializable" % type(obj))
 
 
+json_encoder = json.JSONEncoder(default=json_serial)
+
+
+class LineBuffer:
+    """Accumulates serialized lines until a size or count threshold is reached."""
+
+    def __init__(self, max_size: int = 0, max_count: int = 0):
+        """
+        Arguments:
+            max_size: {int} -- Number of buffered characters that triggers a flush. 0 for no limit.
+            max_count: {int} -- Number of buffered lines that triggers a flush. 0 for no limit.
+        """
+        self.max_size = max_size
+        self.max_count = max_count
+        self.lines: List[str] = []
+        self.size = 0
+
+    def append(self, line: str) -> bool:
+        """Add a line to the buffer.
+
+        Returns:
+            bool -- True if the buffer is full and should be flushed.
+        """
+        self.lines.append(line)
+        self.size += len(line)
+        return (self.max_size > 0 and self.size >= self.max_size) or (
+            self.max_count > 0 and len(self.lines) >= self.max_count
+        )
+
+    def drain(self) -> str:
+        """Remove all lines from the buffer and return them as one string."""
+        data = "".join(self.lines)
+        self.lines = []
+        self.size = 0
+        return data
+
+    def __len__(self) -> int:
+        return len(self.lines)
+
+
+"""
+Number of exchanges serialized into one write by HttpExchangeWriter.write_many()
+when the writer is not buffered.
+"""
+WRITE_MANY_BATCH_SIZE = 1000
+
+
 class HttpExchangeWriter:
-    def __init__(self, output: IO[str]):
+    def __init__(
+        self,
+        output: IO[str],
+        buffer_size: int = 0,
+        buffer_count: int = 0,
+        body_store: Optional[BodyStore] = None,
+        body_threshold: int = DEFAULT_BODY_THRESHOLD,
+        instrumentation: Optional[Instrumentation] = None,
+    ):
         """Create a writer of HTTP exchanges.
 
         Each exchange will be written as a JSON object in the HTTP types
         format on a single line.
 
+        If buffer_size or buffer_count is given, serialized exchanges are
+        collected in memory and written to the output in one call once either
+        threshold is reached. Call flush() or close(), or use the writer as a
+        context manager, to write out the remaining exchanges.
+
+        If body_store is given, bodies of at least body_threshold bytes are
+        written to the store once each and replaced in the recording by their
+        SHA-256 digest, with a bodyEncoding of "sha256-utf8" for text and
+        "sha256" for binary bodies. Read such recordings with the same store.
+
         Arguments:
             output: {IO} -- The output to write to
+
+        Keyword Arguments:
+            buffer_size: {int} -- Number of buffered characters that triggers a write. (default: {0}, unbuffered)
+            buffer_count: {int} -- Number of buffered exchanges that triggers a write. (default: {0}, unbuffered)
+            body_store: {Optional[BodyStore]} -- Store to move large bodies to. (default: {None})
+            body_threshold: {int} -- Size in bytes of bodies moved to the store,
+                counting text bodies in UTF-8. (default: {4096})
+            instrumentation: {Optional[Instrumentation]} -- Count records, bytes and
+                failures and time each stage of writing. (default: {None})
         """
         self.output = output
+        self.buffer = LineBuffer(max_size=buffer_size, max_count=buffer_count)
+        self.buffered = buffer_size > 0 or buffer_count > 0
+        self.owns_output = False
+        self.body_store = body_store
+        self.body_threshold = body_threshold
+        self.instrumentation = instrumentation
+
+    @staticmethod
+    def to_path(
+        path: str,
+        compression: Optional[str] = "infer",
+        block_size: Optional[int] = None,
+        buffer_size: int = 0,
+        buffer_count: int = 0,
+        body_store: Optional[BodyStore] = None,
+        body_threshold: int = DEFAULT_BODY_THRESHOLD,
+        instrumentation: Optional[Instrumentation] = None,
+    ) -> "HttpExchangeWriter":
+        """Create a writer of a JSONL file, which may be compressed.
+
+        The writer owns the file and closes it in close().
+
+        Arguments:
+            path: {str} -- Path to the recording.
+
+        Keyword Arguments:
+            compression: {Optional[str]} -- 'gzip', 'bz2', 'xz' or None. By default
+                inferred from the extension, as in 'recording.jsonl.gz'.
+            block_size: {Optional[int]} -- Uncompressed size of independently
+                compressed gzip blocks, which can be read in parallel.
+            buffer_size: {int} -- See HttpExchangeWriter().
+            buffer_count: {int} -- See HttpExchangeWriter().
+            body_store: {Optional[BodyStore]} -- See HttpExchangeWriter(), for example
+                BodyStore.for_recording(path).
+            body_threshold: {int} -- See HttpExchangeWriter().
+            instrumentation: {Optional[Instrumentation]} -- See HttpExchangeWriter().
+        """
+        from http_types.compression import DEFAULT_BLOCK_SIZE, open_recording
+
+        output = open_recording(
+            path, "wt", compression, block_size or DEFAULT_BLOCK_SIZE
+        )
+        writer = HttpExchangeWriter(
+            output,
+            buffer_size,
+            buffer_count,
+            body_store,
+            body_threshold,
+            instrumentation,
+        )
+        writer.owns_output = True
+        return writer
 
     def write(self, exchange: HttpExchange):
         """Write a single HTTP exchange line to the output.
@@ -419,13 +1445,88 @@ class HttpExchangeWriter:
         Arguments:
             exchange: {HttpExchange} -- The exchange to write.
         """
-        json.dump(self.to_dict(exchange), self.output, default=json_serial)
-        self.output.write("\n")
+        line = self.serialize_line(exchange)
+        if not self.buffered:
+            self.write_output(line)
+        elif self.buffer.append(line):
+            self.write_output(self.buffer.drain())
+
+    def write_many(self, exchanges: Iterable[HttpExchange]):
+        """Write HTTP exchanges to the output, one per line.
+
+        Unbuffered writers serialize exchanges in batches and write each batch
+        in a single call.
+
+        Arguments:
+            exchanges: {Iterable[HttpExchange]} -- The exchanges to write.
+        """
+        if self.buffered:
+            for exchange in exchanges:
+                self.write(exchange)
+            return
+        batch = LineBuffer(max_count=WRITE_MANY_BATCH_SIZE)
+        for exchange in exchanges:
+            if batch.append(self.serialize_line(exchange)):
+                self.write_output(batch.drain())
+        if len(batch) > 0:
+            self.write_output(batch.drain())
+
+    def flush(self):
+        """Write all buffered exchanges and flush the output."""
+        if len(self.buffer) > 0:
+            self.write_output(self.buffer.drain())
+        self.output.flush()
+
+    def close(self):
+        """Flush the writer. The output is closed only if it was opened by the writer."""
+        self.flush()
+        if self.owns_output:
+            self.output.close()
+
+    def serialize_line(self, exchange: HttpExchange) -> str:
+        """JSON line of an exchange, moving large bodies to the body store."""
+        if self.instrumentation is not None:
+            return self._serialize_line_instrumented(exchange, self.instrumentation)
+        if self.body_store is None:
+            return self.to_json(exchange) + "\n"
+        as_dict = serialize(exchange, self.body_store, self.body_threshold)
+        return json_encoder.encode(as_dict) + "\n"
+
+    def _serialize_line_instrumented(
+        self, exchange: HttpExchange, instrumentation: Instrumentation
+    ) -> str:
+        instrumentation.count("write.records")
+        timer = instrumentation.timer()
+        try:
+            as_dict = serialize(exchange, self.body_store, self.body_threshold)
+            timer.lap("write.serialize")
+            line = json_encoder.encode(as_dict) + "\n"
+            timer.lap("write.json_encode")
+        except Exception:
+            instrumentation.count("write.failures")
+            raise
+        instrumentation.count("write.bytes", len(line))
+        return line
+
+    def write_output(self, text: str):
+        """Write serialized lines to the output."""
+        if self.instrumentation is None:
+            self.output.write(text)
+            return
+        timer = self.instrumentation.timer()
+        self.output.write(text)
+        timer.lap("write.output")
+
+    def __enter__(self) -> "HttpExchangeWriter":
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
 
     @staticmethod
     def to_dict(obj: HttpType) -> dict:
-        return fixup_entries_for_serialization(obj)
+        return serialize(obj)
 
     @staticmethod
     def to_json(obj: HttpType) -> str:
-        return json.dumps(HttpExchangeWriter.to_dict(obj), default=json_serial)
+        return json_encoder.encode(serialize(obj))
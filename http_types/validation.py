@@ -0,0 +1,369 @@
+import json
+import os
+import re
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Any, Callable, Dict, Hashable, Iterable, List, Mapping, Optional
+from http_types.utils import BuilderException
+
+__all__ = [
+    "SchemaError",
+    "ValidationError",
+    "Validator",
+    "compile_schema",
+    "default_validator",
+    "load_schema",
+]
+
+SCHEMA_PATH = os.path.join(os.path.dirname(__file__), "http-types-schema.json")
+
+"""
+RFC 3339 timestamps, as required by the date-time format.
+"""
+DATE_TIME = re.compile(
+    r"[0-9]{4}-[0-9]{2}-[0-9]{2}[Tt ][0-9]{2}:[0-9]{2}:[0-9]{2}(?:\.[0-9]+)?"
+    r"(?:[Zz]|[+-][0-9]{2}:[0-9]{2})\Z"
+)
+
+# Conditions under which a value has a JSON type, with {0} standing for the value
+TYPE_CHECKS = {
+    "string": "type({0}) is str",
+    "number": "(type({0}) is int or type({0}) is float)",
+    "integer": "type({0}) is int",
+    "boolean": "type({0}) is bool",
+    "null": "{0} is None",
+    "array": "(type({0}) is list or type({0}) is tuple)",
+    "object": "(type({0}) is dict or isinstance({0}, Mapping))",
+}
+
+# Keywords of schemas that compile to a single condition
+SIMPLE_KEYWORDS = frozenset(["type", "enum", "items", "title", "description"])
+
+
+@dataclass(frozen=True)
+class SchemaError:
+    """
+    Violation of the schema by part of a record.
+    """
+
+    """
+    JSON pointer to the invalid value, as in '/request/method'. Empty for
+    the record itself.
+    """
+    path: str
+
+    message: str
+
+    def __str__(self) -> str:
+        return "{}: {}".format(self.path or "/", self.message)
+
+
+class ValidationError(BuilderException):
+    """
+    Record that does not conform to the HTTP types schema, with all the
+    violations found.
+    """
+
+    def __init__(self, errors: List[SchemaError]):
+        super().__init__("; ".join(str(error) for error in errors))
+        self.errors = errors
+
+
+def load_schema() -> Dict:
+    """The HTTP types JSON schema shipped with the package."""
+    with open(SCHEMA_PATH, encoding="utf-8") as f:
+        return json.load(f)
+
+
+class _Compiler:
+    """Generates the source of Python functions checking values against a
+    JSON schema.
+
+    Supports the keywords used by the HTTP types schema: type, enum,
+    required, properties, additionalProperties, items, anyOf and the
+    date-time format. Other keywords are ignored.
+    """
+
+    def __init__(self, formats: bool):
+        self.formats = formats
+        self.constants: Dict[str, Any] = {
+            "Hashable": Hashable,
+            "Mapping": Mapping,
+            "E": SchemaError,
+            "MISSING": object(),
+        }
+        self.functions: List[str] = []
+        self.counter = 0
+
+    def name(self, prefix: str) -> str:
+        self.counter += 1
+        return "{}{}".format(prefix, self.counter)
+
+    def constant(self, value: Any) -> str:
+        name = self.name("c")
+        self.constants[name] = value
+        return name
+
+    def function(self, schema: Dict) -> str:
+        """Compile a function(value, path, errors) that appends a SchemaError
+        to errors for each violation and returns errors."""
+        name = self.name("check")
+        lines = ["def {}(v0, path, errors):".format(name)]
+        self.node(schema, "v0", "path", lines, 1)
+        lines.append("    return errors")
+        self.functions.append("\n".join(lines))
+        return name
+
+    def type_check(self, json_type: Any, var: str) -> str:
+        types = json_type if isinstance(json_type, list) else [json_type]
+        checks = [TYPE_CHECKS[name].format(var) for name in types]
+        return checks[0] if len(checks) == 1 else "({})".format(" or ".join(checks))
+
+    def condition(self, schema: Dict, var: str) -> Optional[str]:
+        """Expression that is true if a value is valid, or None if the
+        schema needs more than a single expression."""
+        if not SIMPLE_KEYWORDS.issuperset(schema):
+            return None
+        parts = []
+        if "type" in schema:
+            parts.append(self.type_check(schema["type"], var))
+        if "enum" in schema:
+            enum = self.constant(frozenset(schema["enum"]))
+            parts.append("{} in {}".format(var, enum))
+        if "items" in schema:
+            item = self.name("i")
+            item_condition = self.condition(schema["items"], item)
+            if item_condition is None:
+                return None
+            parts.append("all({} for {} in {})".format(item_condition, item, var))
+        return " and ".join(parts) or "True"
+
+    def node(self, schema: Dict, var: str, path: str, lines: List[str], depth: int):
+        """Append the checks of a value to lines."""
+        indent = "    " * depth
+        if "anyOf" in schema:
+            conditions = [self.condition(option, var) for option in schema["anyOf"]]
+            if all(condition is not None for condition in conditions):
+                failed = "not ({})".format(" or ".join(conditions))  # type: ignore
+            else:
+                failed = " and ".join(
+                    "{}({}, {}, [])".format(self.function(option), var, path)
+                    for option in schema["anyOf"]
+                )
+            message = repr("is not valid under any of the given schemas")
+            lines.append(indent + "if {}:".format(failed))
+            lines.append(indent + "    errors.append(E({}, {}))".format(path, message))
+
+        nested: List[str] = []
+        has_type = "type" in schema
+        self.typed_node(schema, var, path, nested, depth + 1 if has_type else depth)
+        if has_type:
+            lines.append(
+                indent + "if not {}:".format(self.type_check(schema["type"], var))
+            )
+            lines.append(
+                indent
+                + "    errors.append(E({}, {!r}))".format(
+                    path, "is not of type {}".format(json.dumps(schema["type"]))
+                )
+            )
+            if nested:
+                lines.append(indent + "else:")
+        lines.extend(nested)
+
+    def typed_node(
+        self, schema: Dict, var: str, path: str, lines: List[str], depth: int
+    ):
+        """Append the checks of a value that has the type of the schema."""
+        indent = "    " * depth
+
+        def error(message: str, extra: int, error_path: str = path):
+            lines.append(
+                indent
+                + "    " * extra
+                + "errors.append(E({}, {}))".format(error_path, message)
+            )
+
+        if "enum" in schema:
+            enum = self.constant(frozenset(schema["enum"]))
+            if "type" in schema:
+                lines.append(indent + "if {} not in {}:".format(var, enum))
+            else:
+                # Values of any type may be unhashable
+                lines.append(
+                    indent
+                    + "if not (isinstance({0}, Hashable) and {0} in {1}):".format(
+                        var, enum
+                    )
+                )
+            error(repr("is not one of {}".format(json.dumps(schema["enum"]))), 1)
+
+        if self.formats and schema.get("format", None) == "date-time":
+            match = self.constant(DATE_TIME.match)
+            lines.append(
+                indent + "if type({0}) is str and {1}({0}) is None:".format(var, match)
+            )
+            error(repr("is not a date-time"), 1)
+
+        for name in schema.get("required", []):
+            lines.append(indent + "if {!r} not in {}:".format(name, var))
+            error(repr("{} is a required property".format(json.dumps(name))), 1)
+
+        properties = schema.get("properties", {})
+        for name, subschema in properties.items():
+            item = self.name("v")
+            nested: List[str] = []
+            item_path = "{} + {!r}".format(path, "/" + name)
+            self.node(subschema, item, item_path, nested, depth + 1)
+            if nested:
+                lines.append(
+                    indent + "{} = {}.get({!r}, MISSING)".format(item, var, name)
+                )
+                lines.append(indent + "if {} is not MISSING:".format(item))
+                lines.extend(nested)
+
+        additional = schema.get("additionalProperties", True)
+        if additional is not True:
+            known = self.constant(frozenset(properties))
+            key = self.name("k")
+            item = self.name("v")
+            if additional is False:
+                lines.append(indent + "for {} in {}:".format(key, var))
+                lines.append(indent + "    if {} not in {}:".format(key, known))
+                error(
+                    "'additional property ' + repr({}) + ' is not allowed'".format(key),
+                    2,
+                )
+            else:
+                nested = []
+                item_path = "{} + '/' + str({})".format(path, key)
+                self.node(additional, item, item_path, nested, depth + 2)
+                if nested:
+                    lines.append(
+                        indent + "for {}, {} in {}.items():".format(key, item, var)
+                    )
+                    lines.append(indent + "    if {} not in {}:".format(key, known))
+                    lines.extend(nested)
+
+        if "items" in schema:
+            index = self.name("n")
+            item = self.name("v")
+            nested = []
+            item_path = "{} + '/' + str({})".format(path, index)
+            self.node(schema["items"], item, item_path, nested, depth + 1)
+            if nested:
+                lines.append(
+                    indent + "for {}, {} in enumerate({}):".format(index, item, var)
+                )
+                lines.extend(nested)
+
+
+def compile_schema(
+    schema: Dict, formats: bool = True
+) -> Callable[[Any], List[SchemaError]]:
+    """Compile a JSON schema into a Python function listing the violations
+    of the schema by a value.
+
+    The schema is translated once into Python source with a branch for each
+    keyword, which runs much faster than interpreting the schema for every
+    value. The source is available as the __source__ attribute of the
+    returned function.
+
+    Arguments:
+        schema {Dict} -- JSON schema using the keywords of the HTTP types schema.
+
+    Keyword Arguments:
+        formats {bool} -- Check that date-time strings are RFC 3339 timestamps.
+            (default: {True})
+    """
+    compiler = _Compiler(formats)
+    name = compiler.function(schema)
+    source = "\n\n\n".join(compiler.functions)
+    namespace = dict(compiler.constants)
+    exec(compile(source, "<http-types schema>", "exec"), namespace)
+    check = namespace[name]
+
+    def errors(value: Any) -> List[SchemaError]:
+        return check(value, "", [])
+
+    errors.__source__ = source  # type: ignore
+    return errors
+
+
+class Validator:
+    """Checks records against the HTTP types schema, compiled once.
+
+    Exchanges, requests and responses are checked by separate functions
+    compiled from the schema and its request and response parts.
+    """
+
+    def __init__(self, schema: Optional[Dict] = None, formats: bool = True):
+        """
+        Keyword Arguments:
+            schema {Optional[Dict]} -- Exchange schema. (default: the schema shipped
+                with the package)
+            formats {bool} -- Check that timestamps are RFC 3339 timestamps.
+                (default: {True})
+        """
+        schema = schema or load_schema()
+        self.exchange_errors = compile_schema(schema, formats)
+        self.request_errors = compile_schema(schema["properties"]["request"], formats)
+        self.response_errors = compile_schema(schema["properties"]["response"], formats)
+
+    def errors(self, record: Any) -> List[SchemaError]:
+        """All violations of the schema by an exchange in the HTTP types format."""
+        return self.exchange_errors(record)
+
+    def validate(self, record: Any) -> None:
+        """Check an exchange in the HTTP types format.
+
+        Raises:
+            ValidationError: With all the violations, if there are any.
+        """
+        errors = self.exchange_errors(record)
+        if errors:
+            raise ValidationError(errors)
+
+    def validate_request(self, record: Any) -> None:
+        """Check a request in the HTTP types format.
+
+        Raises:
+            ValidationError: With all the violations, if there are any.
+        """
+        errors = self.request_errors(record)
+        if errors:
+            raise ValidationError(errors)
+
+    def validate_response(self, record: Any) -> None:
+        """Check a response in the HTTP types format.
+
+        Raises:
+            ValidationError: With all the violations, if there are any.
+        """
+        errors = self.response_errors(record)
+        if errors:
+            raise ValidationError(errors)
+
+    def validate_many(self, records: Iterable[Any]) -> Dict[int, List[SchemaError]]:
+        """Check many exchanges in the HTTP types format.
+
+        Arguments:
+            records {Iterable[Any]} -- Exchanges as decoded from JSON.
+
+        Returns:
+            Dict[int, List[SchemaError]] -- All the violations of each invalid
+                exchange, by its position in records. Empty if all are valid.
+        """
+        check = self.exchange_errors
+        invalid = {}
+        for index, record in enumerate(records):
+            errors = check(record)
+            if errors:
+                invalid[index] = errors
+        return invalid
+
+
+@lru_cache(maxsize=None)
+def default_validator() -> Validator:
+    """Validator of the schema shipped with the package, compiled on first use."""
+    return Validator()
@@ -20,7 +20,6 @@ with open(os.path.join(here, "README.md"), encoding="utf-8") as f:
 REQUIRED = [
     "python-dateutil>=2.8.1",
     'dataclasses;python_version<"3.7"',
-    "typeguard>=2.7.0",
 ]
 
 DEV = [
@@ -37,6 +36,7 @@ DEV = [
     "httpretty",
     "setuptools",
     "twine",
+    "typeguard>=2.7.0",
     "wheel",
 ]
 
@@ -171,7 +171,8 @@ setup(
     author_email=EMAIL,
     python_requires=REQUIRES_PYTHON,
     license="MIT",
-    packages=find_packages(exclude=["tests"]),
+    packages=find_packages(exclude=["tests", "benchmarks", "benchmarks.*"]),
+    package_data={"http_types": ["http-types-schema.json"]},
     include_package_data=True,
     install_requires=REQUIRED,
     extras_require=EXTRAS,
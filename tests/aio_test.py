@@ -0,0 +1,106 @@
+from io import StringIO
+from os import path
+import asyncio
+import os
+from http_types import (
+    AsyncHttpExchangeReader,
+    AsyncHttpExchangeWriter,
+    HttpExchangeReader,
+    HttpExchangeWriter,
+)
+import pytest
+
+dir_path = os.path.dirname(os.path.realpath(__file__))
+SAMPLE_JSONL = path.join(dir_path, "resources", "sample.jsonl")
+
+
+@pytest.fixture
+def loop():
+    # Avoids asyncio.run(), which needs Python 3.7; run_until_complete()
+    # exists since Python 3.4
+    loop = asyncio.new_event_loop()
+    asyncio.set_event_loop(loop)
+    yield loop
+    asyncio.set_event_loop(None)
+    loop.close()
+
+
+@pytest.fixture
+def exchanges():
+    with open(SAMPLE_JSONL, "r", encoding="utf-8") as f:
+        return list(HttpExchangeReader.from_jsonl(f))
+
+
+def expected_output(exchanges):
+    output = StringIO()
+    HttpExchangeWriter(output).write_many(exchanges)
+    return output.getvalue()
+
+
+class AsyncOutput:
+    def __init__(self):
+        self.writes = []
+        self.drains = 0
+
+    async def write(self, data):
+        self.writes.append(data)
+
+    async def drain(self):
+        self.drains += 1
+
+
+class TransportOutput:
+    def __init__(self):
+        self.writes = []
+
+    def write(self, data):
+        self.writes.append(data)
+
+
+def test_reading_from_stream_reader(loop, exchanges):
+    with open(SAMPLE_JSONL, "rb") as f:
+        data = f.read()
+
+    async def read():
+        stream = asyncio.StreamReader(limit=64)
+        stream.feed_data(data + b"\n")
+        stream.feed_eof()
+        return [exchange async for exchange in AsyncHttpExchangeReader(stream)]
+
+    assert loop.run_until_complete(read()) == exchanges
+
+
+def test_writer_buffers_until_drain(loop, exchanges):
+    output = AsyncOutput()
+
+    async def write():
+        writer = AsyncHttpExchangeWriter(output)
+        for exchange in exchanges:
+            writer.write(exchange)
+        assert output.writes == []
+        await writer.drain()
+
+    loop.run_until_complete(write())
+    assert output.writes == [expected_output(exchanges)]
+    assert output.drains == 1
+
+
+def test_write_many_drains_when_buffer_is_full(loop, exchanges):
+    output = AsyncOutput()
+
+    async def write():
+        async with AsyncHttpExchangeWriter(output, buffer_count=2) as writer:
+            await writer.write_many(exchanges)
+
+    loop.run_until_complete(write())
+    assert len(output.writes) == 2
+    assert "".join(output.writes) == expected_output(exchanges)
+
+
+def test_binary_writer_with_synchronous_output(loop, exchanges):
+    output = TransportOutput()
+    writer = AsyncHttpExchangeWriter(output, buffer_count=1, binary=True)
+    writer.write(exchanges[0])
+    assert output.writes == []
+    loop.run_until_complete(writer.drain())
+    assert output.writes == [expected_output(exchanges[:1]).encode("utf-8")]
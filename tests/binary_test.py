@@ -0,0 +1,113 @@
+from dataclasses import replace
+from datetime import datetime
+from io import BytesIO, StringIO
+from os import path
+import os
+from http_types import (
+    BinaryHttpExchangeReader,
+    BinaryHttpExchangeWriter,
+    HttpExchangeBuilder,
+    HttpExchangeReader,
+    HttpExchangeWriter,
+    binary_to_jsonl,
+    jsonl_to_binary,
+)
+from http_types.binary import BinaryFormatException
+import pytest
+
+dir_path = os.path.dirname(os.path.realpath(__file__))
+SAMPLE_JSON = path.join(dir_path, "resources", "sample.json")
+SAMPLE_JSONL = path.join(dir_path, "resources", "sample.jsonl")
+
+
+@pytest.fixture
+def exchanges():
+    with open(SAMPLE_JSONL, "r", encoding="utf-8") as f:
+        exchanges = list(HttpExchangeReader.from_jsonl(f))
+    with open(SAMPLE_JSON, "r", encoding="utf-8") as f:
+        exchanges.append(HttpExchangeReader.from_json(f.read()))
+    exchanges.append(
+        HttpExchangeBuilder.from_dict(
+            {
+                "request": {
+                    "method": "put",
+                    "protocol": "https",
+                    "host": "example.com:8443",
+                    "path": "/a?q=1&q=2",
+                    "headers": {"accept": ["a", "b"]},
+                    "timestamp": "2020-01-31T13:34:15.123456Z",
+                },
+                "response": {
+                    "statusCode": 404,
+                    "headers": {"content-type": "image/png"},
+                    "body": "iVBORw0KGgo=",
+                    "bodyEncoding": "base64",
+                    "timestamp": "2020-01-31T13:34:16",
+                },
+            }
+        )
+    )
+    return exchanges
+
+
+def test_round_trip(exchanges):
+    output = BytesIO()
+    with BinaryHttpExchangeWriter(output) as writer:
+        writer.write_many(exchanges)
+    output.seek(0)
+    assert list(BinaryHttpExchangeReader.from_binary(output)) == exchanges
+
+
+def test_strings_are_stored_once(exchanges):
+    output = BytesIO()
+    BinaryHttpExchangeWriter(output).write_many(exchanges * 10)
+    assert output.getvalue().count(b"example.com") == 2
+
+
+def test_string_table_is_bounded(exchanges):
+    output = BytesIO()
+    with BinaryHttpExchangeWriter(output, max_strings=5) as writer:
+        writer.write_many(exchanges * 3)
+        # At most max_strings plus the strings of one exchange
+        assert len(writer.encoder.strings) < 5 + 50
+    assert output.getvalue().count(b"example.com") > 2
+    output.seek(0)
+    assert list(BinaryHttpExchangeReader.from_binary(output)) == exchanges * 3
+
+
+def test_meta_with_timestamps(exchanges):
+    exchange = replace(
+        exchanges[0], meta={"recorded": datetime(2020, 1, 31, 13, 34, 15)}
+    )
+    output = BytesIO()
+    BinaryHttpExchangeWriter(output).write(exchange)
+    output.seek(0)
+    (read,) = BinaryHttpExchangeReader.from_binary(output)
+    assert read.meta == {"recorded": "2020-01-31T13:34:15"}
+    assert (
+        read.meta
+        == HttpExchangeReader.from_json(HttpExchangeWriter.to_json(exchange)).meta
+    )
+
+
+def test_conversion_is_lossless():
+    with open(SAMPLE_JSONL, "r", encoding="utf-8") as f:
+        binary = BytesIO()
+        assert jsonl_to_binary(f, binary) == 3
+    binary.seek(0)
+    jsonl = StringIO()
+    assert binary_to_jsonl(binary, jsonl) == 3
+    jsonl.seek(0)
+    rewritten = BytesIO()
+    jsonl_to_binary(jsonl, rewritten)
+    assert rewritten.getvalue() == binary.getvalue()
+    jsonl.seek(0)
+    with open(SAMPLE_JSONL, "r", encoding="utf-8") as f:
+        assert list(HttpExchangeReader.from_jsonl(jsonl)) == list(
+            HttpExchangeReader.from_jsonl(f)
+        )
+
+
+def test_invalid_input():
+    with pytest.raises(BinaryFormatException):
+        list(BinaryHttpExchangeReader.from_binary(BytesIO(b"not a recording")))
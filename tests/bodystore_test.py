@@ -0,0 +1,180 @@
+from os import path
+import json
+import os
+import pickle
+import jsonschema
+import pytest
+from http_types import (
+    BodyStore,
+    HttpExchange,
+    HttpExchangeReader,
+    HttpExchangeWriter,
+    Projection,
+    RequestBuilder,
+    Response,
+    StoredBody,
+)
+from http_types.utils import BuilderException
+
+dir_path = os.path.dirname(os.path.realpath(__file__))
+SCHEMA_PATH = path.join(dir_path, "..", "http_types", "http-types-schema.json")
+
+PAGE = "<html>" + "x" * 5000 + "</html>"
+IMAGE = b"\x89PNG\r\n\x1a\n" + bytes(range(256)) * 20
+
+
+def make_exchange(body, content_type: str = "text/html") -> HttpExchange:
+    return HttpExchange(
+        request=RequestBuilder.from_url("https://example.com/static"),
+        response=Response(
+            statusCode=200, headers={"content-type": content_type}, body=body
+        ),
+    )
+
+
+@pytest.fixture
+def exchanges():
+    return [
+        make_exchange(PAGE),
+        make_exchange(IMAGE, "image/png"),
+        make_exchange("small"),
+        make_exchange(PAGE),
+        make_exchange(IMAGE, "image/png"),
+    ]
+
+
+def write_recording(tmp_path, exchanges, **kwargs) -> str:
+    recording = str(tmp_path / "recording.jsonl")
+    store = BodyStore.for_recording(recording)
+    with HttpExchangeWriter.to_path(recording, body_store=store, **kwargs) as writer:
+        writer.write_many(exchanges)
+    return recording
+
+
+def stored_files(store: BodyStore):
+    return [
+        os.path.join(root, name)
+        for root, _, names in os.walk(store.directory)
+        for name in names
+    ]
+
+
+def test_large_bodies_are_stored_once(tmp_path, exchanges):
+    recording = write_recording(tmp_path, exchanges)
+    store = BodyStore.for_recording(recording)
+    assert len(stored_files(store)) == 2
+
+    with open(recording) as f:
+        records = [json.loads(line) for line in f]
+    with open(SCHEMA_PATH) as f:
+        schema = json.load(f)
+    encodings = [record["response"].get("bodyEncoding") for record in records]
+    assert encodings == ["sha256-utf8", "sha256", None, "sha256-utf8", "sha256"]
+    assert records[0]["response"]["body"] == records[3]["response"]["body"]
+    assert records[2]["response"]["body"] == "small"
+    for record in records:
+        jsonschema.validate(instance=record, schema=schema)
+
+
+@pytest.mark.parametrize("slotted", [False, True])
+def test_stored_bodies_are_read_on_access(tmp_path, exchanges, slotted):
+    recording = write_recording(tmp_path, exchanges)
+    store = BodyStore.for_recording(recording)
+    with open(recording) as f:
+        read = list(HttpExchangeReader.from_jsonl(f, slotted=slotted, body_store=store))
+
+    stored = (
+        object.__getattribute__(read[0].response, "_body")
+        if slotted
+        else read[0].response.__dict__["body"]
+    )
+    assert isinstance(stored, StoredBody)
+    assert [exchange.response.body for exchange in read] == [
+        exchange.response.body for exchange in exchanges
+    ]
+
+
+def test_bodies_are_not_read_unless_accessed(tmp_path, exchanges):
+    recording = write_recording(tmp_path, exchanges)
+    store = BodyStore.for_recording(recording)
+    for stored in stored_files(store):
+        os.remove(stored)
+
+    read = list(HttpExchangeReader.from_path(recording, body_store=store))
+    assert [exchange.response.statusCode for exchange in read] == [200] * 5
+    assert read[2].response.body == "small"
+    with pytest.raises(KeyError):
+        read[0].response.body
+
+    with open(recording) as f:
+        projected = list(
+            HttpExchangeReader.from_jsonl_projected(
+                f, Projection.NO_BODIES, body_store=store
+            )
+        )
+    assert [exchange.response.body for exchange in projected] == [None] * 5
+
+
+def test_threshold(tmp_path, exchanges):
+    recording = write_recording(tmp_path, exchanges, body_threshold=len(PAGE) + 1)
+    with open(recording) as f:
+        records = [json.loads(line) for line in f]
+    encodings = [record["response"].get("bodyEncoding") for record in records]
+    assert encodings == [None, "sha256", None, None, "sha256"]
+
+
+def test_threshold_counts_utf8_bytes(tmp_path):
+    # 2000 characters, 4000 bytes in UTF-8
+    text = "é" * 2000
+    recording = write_recording(
+        tmp_path, [make_exchange(text), make_exchange("x" * 2000)], body_threshold=4000
+    )
+    with open(recording) as f:
+        records = [json.loads(line) for line in f]
+    encodings = [record["response"].get("bodyEncoding") for record in records]
+    assert encodings == ["sha256-utf8", None]
+
+
+def test_stored_body_requires_store(tmp_path, exchanges):
+    recording = write_recording(tmp_path, exchanges)
+    with pytest.raises(BuilderException):
+        list(HttpExchangeReader.from_path(recording))
+
+
+def test_invalid_digest_is_rejected(tmp_path):
+    line = json.dumps(
+        {
+            "request": {
+                "method": "get",
+                "protocol": "https",
+                "host": "example.com",
+                "path": "/",
+            },
+            "response": {
+                "statusCode": 200,
+                "body": "../../secret",
+                "bodyEncoding": "sha256",
+            },
+        }
+    )
+    with pytest.raises(BuilderException):
+        HttpExchangeReader.from_json(line, body_store=BodyStore(str(tmp_path)))
+
+
+def test_stored_bodies_pickle(tmp_path, exchanges):
+    recording = write_recording(tmp_path, exchanges)
+    store = BodyStore.for_recording(recording)
+    read = list(HttpExchangeReader.from_path(recording, body_store=store))
+    unpickled = pickle.loads(pickle.dumps(read))
+    assert unpickled[1].response.body == IMAGE
+
+
+def test_store(tmp_path):
+    store = BodyStore(str(tmp_path / "bodies"))
+    key = store.put(b"body")
+    assert store.put(b"body") == key
+    assert key in store
+    assert store.get(key) == b"body"
+    assert "0" * 64 not in BodyStore(store.directory)
+    with pytest.raises(KeyError):
+        store.get("0" * 64)
@@ -0,0 +1,80 @@
+from os import path
+import bz2
+import gzip
+import os
+from http_types import (
+    HttpExchangeReader,
+    HttpExchangeWriter,
+    detect_compression,
+)
+from http_types.compression import gzip_block_ranges
+import pytest
+
+dir_path = os.path.dirname(os.path.realpath(__file__))
+SAMPLE_JSONL = path.join(dir_path, "resources", "sample.jsonl")
+
+
+@pytest.fixture
+def exchanges():
+    with open(SAMPLE_JSONL, "r", encoding="utf-8") as f:
+        return list(HttpExchangeReader.from_jsonl(f)) * 20
+
+
+@pytest.mark.parametrize(
+    "file_name,compression",
+    [
+        ("recording.jsonl", None),
+        ("recording.jsonl.gz", "gzip"),
+        ("recording.jsonl.bz2", "bz2"),
+        ("recording.jsonl.xz", "xz"),
+    ],
+)
+def test_round_trip(tmp_path, exchanges, file_name, compression):
+    recording = str(tmp_path / file_name)
+    with HttpExchangeWriter.to_path(recording) as writer:
+        writer.write_many(exchanges)
+    assert detect_compression(recording) == compression
+    assert list(HttpExchangeReader.from_path(recording)) == exchanges
+
+
+def test_codec_is_detected_from_magic_bytes(tmp_path, exchanges):
+    recording = str(tmp_path / "recording.jsonl")
+    with HttpExchangeWriter.to_path(recording, compression="bz2") as writer:
+        writer.write_many(exchanges)
+    assert detect_compression(recording) == "bz2"
+    with bz2.open(recording, "rt") as f:
+        assert list(HttpExchangeReader.from_jsonl(f)) == exchanges
+    assert list(HttpExchangeReader.from_path(recording)) == exchanges
+
+
+def test_gzip_blocks_hold_whole_lines(tmp_path, exchanges):
+    recording = str(tmp_path / "recording.jsonl.gz")
+    with HttpExchangeWriter.to_path(recording, block_size=2000) as writer:
+        writer.write_many(exchanges)
+    blocks = gzip_block_ranges(recording)
+    assert blocks is not None and len(blocks) > 1
+    with open(recording, "rb") as f:
+        data = f.read()
+    for start, end in blocks:
+        assert gzip.decompress(data[start:end]).endswith(b"\n")
+    with gzip.open(recording, "rt") as f:
+        assert list(HttpExchangeReader.from_jsonl(f)) == exchanges
+
+
+def test_plain_gzip_has_no_blocks(tmp_path, exchanges):
+    recording = str(tmp_path / "recording.jsonl.gz")
+    with gzip.open(recording, "wt") as f:
+        HttpExchangeWriter(f).write_many(exchanges)
+    assert gzip_block_ranges(recording) is None
+    assert list(HttpExchangeReader.from_path(recording)) == exchanges
+
+
+def test_parallel_read_of_gzip_blocks(tmp_path, exchanges):
+    recording = str(tmp_path / "recording.jsonl.gz")
+    with HttpExchangeWriter.to_path(recording, block_size=2000) as writer:
+        for exchange in exchanges:
+            writer.write(exchange)
+    assert len(gzip_block_ranges(recording)) > 1
+    assert (
+        list(HttpExchangeReader.from_jsonl_parallel(recording, workers=2)) == exchanges
+    )
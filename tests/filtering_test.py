@@ -0,0 +1,108 @@
+import json
+from datetime import datetime, timedelta, timezone
+from io import StringIO
+from http_types import ExchangeFilter, HttpExchangeReader, HttpMethod
+from http_types.utils import HttpExchangeBuilder
+
+START = datetime(2020, 1, 1, tzinfo=timezone.utc)
+RESOURCES = ["users", "orders", "items"]
+
+
+def make_record(n: int):
+    return {
+        "request": {
+            "method": ["get", "post", "put", "delete"][n % 4],
+            "protocol": "https",
+            "host": ["api.example.com", "auth.example.com"][n % 3 % 2],
+            "pathname": "/v1/{}/{}".format(RESOURCES[n % 5 % 3], n),
+            "query": {},
+            "headers": {},
+            "timestamp": (START + timedelta(milliseconds=37 * n)).isoformat(),
+        },
+        "response": {
+            "statusCode": [200, 201, 404, 500, 503][n % 7 % 5],
+            "headers": {"content-type": "application/json"},
+            "body": "[{}]".format(n),
+        },
+    }
+
+
+RECORDS = [make_record(n) for n in range(300)]
+LINES = [json.dumps(record) for record in RECORDS]
+
+
+def read(where: ExchangeFilter):
+    return list(HttpExchangeReader.from_jsonl(StringIO("\n".join(LINES)), where=where))
+
+
+def expected(predicate):
+    return [
+        HttpExchangeBuilder.from_dict(record)
+        for record in RECORDS
+        if predicate(HttpExchangeBuilder.from_dict(record))
+    ]
+
+
+def test_filter_by_method_host_and_status():
+    where = ExchangeFilter(
+        methods=[HttpMethod.POST, "put"],
+        hosts=["api.example.com"],
+        status_min=400,
+        status_max=599,
+    )
+    result = read(where)
+    assert result
+    assert result == expected(
+        lambda exchange: exchange.request.method in (HttpMethod.POST, HttpMethod.PUT)
+        and exchange.request.host == "api.example.com"
+        and 400 <= exchange.response.statusCode <= 599
+    )
+
+
+def test_filter_by_pathname():
+    where = ExchangeFilter(pathname_prefix="/v1/users/", pathname_pattern=r"/1\d*$")
+    assert read(where) == expected(
+        lambda exchange: exchange.request.pathname.startswith("/v1/users/1")
+    )
+
+
+def test_filter_by_time_range():
+    since = START + timedelta(seconds=2)
+    until = since + timedelta(seconds=3)
+    result = read(ExchangeFilter(since=since, until=until))
+    assert result == expected(
+        lambda exchange: since <= exchange.request.timestamp < until
+    )
+
+
+def test_raw_line_check_never_rejects_matches():
+    where = ExchangeFilter(methods=["get"], pathname_prefix="/v1/orders")
+    for line in LINES:
+        if where.matches(json.loads(line)):
+            assert where.matches_line(line)
+            assert where.matches_line(line.encode("utf-8"))
+    escaped = LINES[0].replace("/", "\\/")
+    assert ExchangeFilter(pathname_prefix="/v1/").matches_line(escaped)
+
+
+def test_raw_line_check_rejects_other_hosts():
+    where = ExchangeFilter(hosts=["other.example.com"])
+    assert not any(where.matches_line(line) for line in LINES)
+    assert read(where) == []
+
+
+def test_filter_without_criteria_matches_everything():
+    assert len(read(ExchangeFilter())) == len(RECORDS)
+
+
+def test_parallel_reader_filters_in_workers(tmp_path):
+    recording = tmp_path / "recording.jsonl"
+    recording.write_text("\n".join(LINES) + "\n")
+    where = ExchangeFilter(methods=["post"], status_min=500)
+    exchanges = list(
+        HttpExchangeReader.from_jsonl_parallel(
+            str(recording), workers=2, chunk_size=4000, where=where
+        )
+    )
+    assert exchanges == read(where)
+    assert exchanges == list(HttpExchangeReader.from_mmap(str(recording), where=where))
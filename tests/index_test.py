@@ -0,0 +1,108 @@
+from os import path
+import os
+from http_types import (
+    HttpExchangeIndex,
+    HttpExchangeReader,
+    IndexedHttpExchangeReader,
+)
+import pytest
+
+dir_path = os.path.dirname(os.path.realpath(__file__))
+SAMPLE_JSONL = path.join(dir_path, "resources", "sample.jsonl")
+
+
+@pytest.fixture
+def recording(tmp_path):
+    with open(SAMPLE_JSONL, "r", encoding="utf-8") as f:
+        lines = [line.rstrip("\n") for line in f if line.strip()]
+    recording_path = tmp_path / "recording.jsonl"
+    with open(recording_path, "w", encoding="utf-8") as f:
+        for i in range(30):
+            f.write(lines[i % len(lines)] + "\n")
+            if i == 10:
+                f.write("\n")
+    return str(recording_path)
+
+
+def read_sequential(recording_path):
+    with open(recording_path, "r", encoding="utf-8") as f:
+        return [HttpExchangeReader.from_json(line) for line in f if line.strip()]
+
+
+def test_random_access(recording):
+    expected = read_sequential(recording)
+    with IndexedHttpExchangeReader.open(recording) as reader:
+        assert len(reader) == 30
+        assert reader[0] == expected[0]
+        assert reader[11] == expected[11]
+        assert reader[-1] == expected[-1]
+        assert reader[5:15] == expected[5:15]
+        assert reader[::7] == expected[::7]
+        with pytest.raises(IndexError):
+            reader[30]
+
+
+def test_seek_and_iterate(recording):
+    expected = read_sequential(recording)
+    with IndexedHttpExchangeReader.open(recording) as reader:
+        reader.seek(25)
+        assert list(reader) == expected[25:]
+
+
+def test_index_is_written_and_reused(recording):
+    IndexedHttpExchangeReader.open(recording).close()
+    index_path = recording + ".idx"
+    assert os.path.exists(index_path)
+    index = HttpExchangeIndex.load(index_path)
+    assert len(index) == 30
+    assert index.recording_size == os.path.getsize(recording)
+
+
+def test_stale_index_is_rebuilt(recording):
+    IndexedHttpExchangeReader.open(recording).close()
+    with open(SAMPLE_JSONL, "r", encoding="utf-8") as f:
+        extra_line = f.readline()
+    with open(recording, "a", encoding="utf-8") as f:
+        f.write(extra_line)
+    with IndexedHttpExchangeReader.open(recording) as reader:
+        assert len(reader) == 31
+
+
+def test_rewritten_recording_of_same_size_is_reindexed(recording):
+    IndexedHttpExchangeReader.open(recording).close()
+    stat = os.stat(recording)
+    with open(recording, "r", encoding="utf-8") as f:
+        lines = f.readlines()
+    # Same size, with the first and last records swapped
+    lines[0], lines[-1] = lines[-1], lines[0]
+    with open(recording, "w", encoding="utf-8") as f:
+        f.writelines(lines)
+    assert os.path.getsize(recording) == stat.st_size
+    # Even with the modification time restored
+    os.utime(recording, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+    expected = read_sequential(recording)
+    with IndexedHttpExchangeReader.open(recording) as reader:
+        assert list(reader) == expected
+
+
+def test_unreadable_index_is_rebuilt(recording):
+    index_path = recording + ".idx"
+    with open(index_path, "wb") as f:
+        f.write(b"HTIX\x01\x00")
+    with IndexedHttpExchangeReader.open(recording) as reader:
+        assert len(reader) == 30
+    assert HttpExchangeIndex.load(index_path).matches(recording)
+
+
+def test_index_keys(recording, tmp_path):
+    index = HttpExchangeIndex.build(
+        recording, key_fields=("method", "host", "pathname", "status")
+    )
+    index_path = str(tmp_path / "keys.idx")
+    index.write(index_path)
+    loaded = HttpExchangeIndex.load(index_path)
+    assert loaded.keys == index.keys
+    assert loaded.keys[0] == ["get", "example.com", "/user/repos", 200]
+    assert loaded.find(method="post") == [n for n in range(30) if n % 3 != 0]
+    with pytest.raises(ValueError):
+        loaded.find(timestamp=None)
@@ -0,0 +1,133 @@
+from os import path
+import io
+import json
+import os
+import pytest
+from http_types import (
+    ExchangeFilter,
+    HttpExchangeReader,
+    HttpExchangeWriter,
+    Instrumentation,
+    Stats,
+)
+
+dir_path = os.path.dirname(os.path.realpath(__file__))
+SAMPLE_JSONL = path.join(dir_path, "resources", "sample.jsonl")
+
+
+def sample_lines():
+    with open(SAMPLE_JSONL, "r", encoding="utf-8") as f:
+        return [line for line in f if line.strip()]
+
+
+def timestamped_lines():
+    records = [json.loads(line) for line in sample_lines()]
+    for record in records:
+        record["request"]["timestamp"] = "2020-01-31T13:34:15.123Z"
+    return [json.dumps(record) for record in records]
+
+
+def test_reader_counts_and_stages():
+    lines = timestamped_lines()
+    instrumentation = Instrumentation()
+    exchanges = list(
+        HttpExchangeReader.from_lines(lines, instrumentation=instrumentation)
+    )
+
+    stats = instrumentation.snapshot()
+    assert isinstance(stats, Stats)
+    assert stats.counts["read.records"] == len(lines)
+    assert stats.counts["read.exchanges"] == len(exchanges)
+    assert stats.counts["read.bytes"] == sum(len(line) for line in lines)
+    assert "read.failures" not in stats.counts
+    for stage in ["json_decode", "url", "body", "headers", "timestamp", "build"]:
+        assert stats.seconds["read." + stage] > 0
+    assert stats.total_seconds("read.") == pytest.approx(sum(stats.seconds.values()))
+
+
+def test_strict_validation_is_timed():
+    lines = sample_lines()
+    instrumentation = Instrumentation()
+    list(HttpExchangeReader.from_lines(lines, instrumentation=instrumentation))
+    assert "read.validate" not in instrumentation.seconds
+    list(
+        HttpExchangeReader.from_lines(
+            lines, instrumentation=instrumentation, strict=True
+        )
+    )
+    assert instrumentation.seconds["read.validate"] > 0
+
+
+def test_exchanges_are_unchanged():
+    lines = sample_lines()
+    plain = list(HttpExchangeReader.from_lines(lines))
+    measured = list(
+        HttpExchangeReader.from_lines(lines, instrumentation=Instrumentation())
+    )
+    assert measured == plain
+
+
+def test_filtered_records():
+    lines = sample_lines()
+    instrumentation = Instrumentation()
+    where = ExchangeFilter(methods=["delete"])
+    exchanges = list(
+        HttpExchangeReader.from_lines(
+            lines, where=where, instrumentation=instrumentation
+        )
+    )
+    stats = instrumentation.snapshot()
+    assert stats.counts["read.filtered"] == len(lines) - len(exchanges)
+    assert stats.counts.get("read.exchanges", 0) == len(exchanges)
+    assert stats.seconds["read.filter"] > 0
+
+
+def test_failures_are_counted():
+    instrumentation = Instrumentation()
+    with pytest.raises(json.JSONDecodeError):
+        list(HttpExchangeReader.from_lines(["{"], instrumentation=instrumentation))
+    assert instrumentation.snapshot().counts["read.failures"] == 1
+
+
+def test_writer_counts_and_stages():
+    exchanges = list(HttpExchangeReader.from_lines(sample_lines()))
+    instrumentation = Instrumentation()
+    output = io.StringIO()
+    with HttpExchangeWriter(output, instrumentation=instrumentation) as writer:
+        writer.write_many(exchanges)
+
+    stats = instrumentation.snapshot()
+    assert stats.counts["write.records"] == len(exchanges)
+    assert stats.counts["write.bytes"] == len(output.getvalue())
+    for stage in ["serialize", "json_encode", "output"]:
+        assert stats.seconds["write." + stage] > 0
+
+    plain = io.StringIO()
+    HttpExchangeWriter(plain).write_many(exchanges)
+    assert output.getvalue() == plain.getvalue()
+
+
+def test_callback_and_reset():
+    events = []
+    ticks = iter(range(1000))
+    instrumentation = Instrumentation(
+        callback=lambda name, value: events.append((name, value)),
+        clock=lambda: float(next(ticks)),
+    )
+    list(
+        HttpExchangeReader.from_lines(
+            sample_lines()[:1], instrumentation=instrumentation
+        )
+    )
+
+    stats = instrumentation.snapshot()
+    totals = {}
+    for name, value in events:
+        totals[name] = totals.get(name, 0) + value
+    assert totals == {**stats.counts, **stats.seconds}
+    # Each lap of the fake clock takes one second
+    assert all(seconds == int(seconds) for seconds in stats.seconds.values())
+
+    instrumentation.reset()
+    assert instrumentation.snapshot() == Stats(counts={}, seconds={})
+    assert stats.counts["read.records"] == 1
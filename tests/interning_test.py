@@ -0,0 +1,45 @@
+from io import StringIO
+from http_types import HttpExchangeReader, HttpExchangeWriter, Interner
+
+EXCHANGE = (
+    '{"request": {"method": "get", "protocol": "https", "host": "api.example.com",'
+    ' "pathname": "/v1/users", "query": {}, "headers": {"accept": "application/json"}},'
+    ' "response": {"statusCode": 200, "headers": {"content-type": "application/json"},'
+    ' "body": "[]"}}\n'
+)
+
+
+def test_shares_strings_and_headers():
+    interner = Interner()
+    first, second = HttpExchangeReader.from_jsonl(
+        StringIO(EXCHANGE * 2), interner=interner
+    )
+    assert first.request.host is second.request.host
+    assert first.request.pathname is second.request.pathname
+    assert first.request.headers is second.request.headers
+    assert first.response.headers is second.response.headers
+
+
+def test_interned_exchanges_are_equal():
+    plain = HttpExchangeReader.from_json(EXCHANGE)
+    interned = HttpExchangeReader.from_json(EXCHANGE, interner=Interner())
+    assert interned == plain
+    assert HttpExchangeWriter.to_json(interned) == HttpExchangeWriter.to_json(plain)
+
+
+def test_multi_valued_headers_are_shared():
+    interner = Interner()
+    headers = interner.headers({"accept": ["text/html", "application/json"]})
+    assert headers == {"accept": ["text/html", "application/json"]}
+    assert interner.headers({"accept": ["text/html", "application/json"]}) is headers
+
+
+def test_tables_are_bounded():
+    interner = Interner(max_size=2)
+    for n in range(5):
+        interner.string(str(n))
+        interner.headers({"x-id": str(n)})
+    assert len(interner.strings) <= 2
+    assert len(interner.header_maps) <= 2
+    interner.clear()
+    assert len(interner) == 0
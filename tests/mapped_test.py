@@ -0,0 +1,33 @@
+from os import path
+import os
+from http_types import HttpExchangeReader, MappedRecording
+from http_types.mapped import iter_lines
+
+dir_path = os.path.dirname(os.path.realpath(__file__))
+SAMPLE_JSONL = path.join(dir_path, "resources", "sample.jsonl")
+
+
+def test_iter_lines_skips_blank_lines():
+    buffer = b'{"a": 1}\n\n  \n{"b": 2}'
+    assert list(iter_lines(buffer)) == [b'{"a": 1}', b'{"b": 2}']
+    assert list(iter_lines(buffer, 0, 9)) == [b'{"a": 1}']
+
+
+def test_from_mmap_matches_from_jsonl():
+    with open(SAMPLE_JSONL, "r", encoding="utf-8") as f:
+        expected = list(HttpExchangeReader.from_jsonl(f))
+    assert list(HttpExchangeReader.from_mmap(SAMPLE_JSONL)) == expected
+
+
+def test_mapped_byte_range():
+    with open(SAMPLE_JSONL, "rb") as f:
+        first_line = f.readline()
+    with MappedRecording(SAMPLE_JSONL) as recording:
+        exchanges = list(recording.exchanges(len(first_line)))
+    assert len(exchanges) == 2
+
+
+def test_empty_file(tmp_path):
+    empty = tmp_path / "empty.jsonl"
+    empty.write_bytes(b"")
+    assert list(HttpExchangeReader.from_mmap(str(empty))) == []
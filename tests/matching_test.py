@@ -0,0 +1,166 @@
+from os import path
+import os
+import pytest
+from http_types import (
+    HttpExchangeBuilder,
+    HttpExchangeReader,
+    Match,
+    RequestBuilder,
+    RequestIndex,
+)
+
+dir_path = os.path.dirname(os.path.realpath(__file__))
+SAMPLE_JSONL = path.join(dir_path, "resources", "sample.jsonl")
+
+
+def exchange(path, status=200, method="get", headers=None, body=""):
+    return HttpExchangeBuilder.from_dict(
+        {
+            "request": {
+                "method": method,
+                "protocol": "https",
+                "host": "example.com",
+                "path": path,
+                "headers": headers or {},
+                "body": body,
+            },
+            "response": {"statusCode": status, "headers": {}, "body": str(status)},
+        }
+    )
+
+
+def request(path, method="get", headers=None, body=""):
+    return exchange(path, method=method, headers=headers, body=body).request
+
+
+@pytest.fixture
+def recorded():
+    return [
+        exchange("/items?a=1&b=2", 200),
+        exchange("/items?a=1&b=2", 201),
+        exchange("/items?b=3&a=1", 202),
+        exchange("/items?a=1&b=2&c=3", 203),
+        exchange("/items", 204),
+        exchange("/items?a=1&b=2", 205, method="post", body='{"x": 1}'),
+        exchange("/users?token=x", 206, headers={"Accept": "text/html"}),
+    ]
+
+
+def test_exact_match_prefers_earliest(recorded):
+    index = RequestIndex.build(recorded)
+    assert len(index) == len(recorded)
+    assert index.match(request("/items?a=1&b=2")) == Match(recorded[0], "exact")
+    assert index.lookup(request("/items?b=3&a=1")) is recorded[2]
+    assert index.lookup(request("/items")) is recorded[4]
+    assert index.lookup(request("/items?a=1&b=2", method="post")) is recorded[5]
+
+
+def test_query_order_fallback(recorded):
+    index = RequestIndex.build(recorded)
+    found = index.match(request("/items?b=2&a=1"))
+    assert found == Match(recorded[0], "query_order")
+    assert (
+        RequestIndex.build(recorded, fallbacks=[]).match(request("/items?b=2&a=1"))
+        is None
+    )
+
+
+def test_nearest_query_fallback(recorded):
+    index = RequestIndex.build(recorded)
+    found = index.match(request("/items?a=1&c=3&d=4"))
+    assert found is not None
+    assert (found.exchange, found.kind) == (recorded[3], "nearest_query")
+    assert found.score == pytest.approx(2 / 4)
+
+    # Without shared parameters, the earliest request of the endpoint
+    found = index.match(request("/items?z=0"))
+    assert found == Match(recorded[0], "nearest_query", 0.0)
+
+    assert index.match(request("/unknown")) is None
+    assert index.match(request("/items", method="delete")) is None
+
+
+def test_nearest_query_compares_bounded_candidates():
+    recorded = [exchange("/s?key=k&n={}".format(n)) for n in range(20)]
+    index = RequestIndex.build(recorded, max_candidates=4)
+    postings = index.endpoints[("get", "example.com", "/s")].postings
+    assert max(len(posting) for posting in postings.values()) == 4
+
+    # The common parameter is still counted for queries beyond the bound
+    found = index.match(request("/s?key=k&n=10&z=1"))
+    assert found == Match(recorded[10], "nearest_query", 2 / 3)
+    found = index.match(request("/s?key=k&z=1"))
+    assert found == Match(recorded[0], "nearest_query", 1 / 3)
+
+    with pytest.raises(ValueError):
+        RequestIndex(max_candidates=0)
+
+
+def test_matched_headers(recorded):
+    index = RequestIndex.build(recorded, match_headers=["accept"])
+    html = request("/users?token=x", headers={"accept": "text/html"})
+    assert index.match(html) == Match(recorded[6], "exact")
+    json_request = request("/users?token=x", headers={"Accept": "application/json"})
+    assert index.match(json_request) == Match(recorded[6], "headers")
+
+    without_headers = RequestIndex.build(recorded)
+    assert without_headers.match(json_request) == Match(recorded[6], "exact")
+
+
+def test_matched_body(recorded):
+    index = RequestIndex.build(recorded, match_body=True)
+    assert index.lookup(request("/items?a=1&b=2", method="post", body='{"x": 1}'))
+    other_body = request("/items?a=1&b=2", method="post", body='{"x": 2}')
+    found = index.match(other_body)
+    assert found is not None and found.kind == "nearest_query"
+
+    no_fallbacks = RequestIndex.build(recorded, match_body=True, fallbacks=[])
+    assert no_fallbacks.match(other_body) is None
+
+
+def test_unknown_fallback():
+    with pytest.raises(ValueError):
+        RequestIndex(fallbacks=["exact", "fuzzy"])
+
+
+def test_hash_collisions_are_resolved(recorded, monkeypatch):
+    index = RequestIndex()
+    # Make every key collide
+    monkeypatch.setattr(
+        index.exact, "key", lambda r: Colliding(index.exact_key(r))  # type: ignore
+    )
+    for exchange in recorded[:5]:
+        index.add(exchange)
+    assert len(index.exact.by_hash) == 1
+    for position in [0, 2, 3, 4]:
+        assert index.match(recorded[position].request) == Match(
+            recorded[position], "exact"
+        )
+    assert index.exact.get(request("/items?b=2&a=1")) is None
+
+
+class Colliding:
+    def __init__(self, key):
+        self.key = key
+
+    def __hash__(self):
+        return 0
+
+    def __eq__(self, other):
+        return isinstance(other, Colliding) and self.key == other.key
+
+
+def test_recorded_sample_matches_itself():
+    exchanges = list(HttpExchangeReader.from_path(SAMPLE_JSONL))
+    index = RequestIndex.build(exchanges)
+    for exchange in exchanges:
+        found = index.match(exchange.request)
+        assert found is not None and found.kind == "exact"
+        assert found.exchange.request == exchange.request
+
+
+def test_requests_from_urls():
+    index = RequestIndex.build([exchange("/search?q=cats&page=2")])
+    found = index.match(RequestBuilder.from_url("https://example.com/search?q=cats"))
+    assert found is not None
+    assert found.kind == "nearest_query" and found.score == pytest.approx(0.5)
@@ -0,0 +1,40 @@
+import importlib
+import subprocess
+import sys
+import pytest
+import http_types
+
+
+def test_import_defers_heavy_modules():
+    code = "import sys, http_types; print(' '.join(sorted(sys.modules)))"
+    output = subprocess.run(
+        [sys.executable, "-c", code],
+        stdout=subprocess.PIPE,
+        universal_newlines=True,
+        check=True,
+    ).stdout
+    loaded = set(output.split())
+    assert "http_types.utils" in loaded
+    assert [module for module in http_types.DEFERRED_MODULES if module in loaded] == []
+
+
+@pytest.mark.parametrize("module", sorted(http_types.LAZY_MODULES))
+def test_lazy_names_match_modules(module: str):
+    imported = importlib.import_module("http_types." + module)
+    assert http_types.LAZY_MODULES[module] == imported.__all__
+    for name in imported.__all__:
+        assert getattr(http_types, name) is getattr(imported, name)
+    assert getattr(http_types, module) is imported
+
+
+def test_star_import():
+    namespace: dict = {}
+    exec("from http_types import *", namespace)
+    assert set(http_types.__all__) <= set(namespace)
+    assert len(set(http_types.__all__)) == len(http_types.__all__)
+    assert set(http_types.__all__) <= set(dir(http_types))
+
+
+def test_unknown_name():
+    with pytest.raises(AttributeError):
+        http_types.NoSuchName  # type: ignore
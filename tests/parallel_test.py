@@ -0,0 +1,74 @@
+from os import path
+import os
+from http_types import HttpExchangeReader, HttpExchangeWriter
+from http_types.parallel import chunk_ranges
+import pytest
+
+dir_path = os.path.dirname(os.path.realpath(__file__))
+SAMPLE_JSONL = path.join(dir_path, "resources", "sample.jsonl")
+
+
+@pytest.fixture
+def recording(tmp_path):
+    with open(SAMPLE_JSONL, "r", encoding="utf-8") as f:
+        lines = [line.rstrip("\n") for line in f if line.strip()]
+    recording_path = tmp_path / "recording.jsonl"
+    with open(recording_path, "w", encoding="utf-8") as f:
+        for i in range(100):
+            f.write(lines[i % len(lines)] + "\n")
+    return str(recording_path)
+
+
+def read_sequential(recording_path):
+    with open(recording_path, "r", encoding="utf-8") as f:
+        return list(HttpExchangeReader.from_jsonl(f))
+
+
+def test_chunk_ranges_end_on_line_boundaries(recording):
+    ranges = chunk_ranges(recording, chunk_size=1000)
+    assert len(ranges) > 1
+    assert ranges[0][0] == 0
+    assert ranges[-1][1] == os.path.getsize(recording)
+    with open(recording, "rb") as f:
+        data = f.read()
+    for (start, end), (next_start, _) in zip(ranges, ranges[1:]):
+        assert end == next_start
+        assert data[end - 1 : end] == b"\n"
+
+
+def test_chunk_ranges_of_empty_file(tmp_path):
+    empty = tmp_path / "empty.jsonl"
+    empty.write_text("")
+    assert chunk_ranges(str(empty)) == []
+
+
+def test_parallel_ordered_matches_sequential(recording):
+    exchanges = list(
+        HttpExchangeReader.from_jsonl_parallel(recording, workers=2, chunk_size=1000)
+    )
+    assert exchanges == read_sequential(recording)
+
+
+def test_parallel_unordered_yields_every_exchange(recording):
+    exchanges = list(
+        HttpExchangeReader.from_jsonl_parallel(
+            recording, workers=2, chunk_size=1000, ordered=False
+        )
+    )
+    expected = read_sequential(recording)
+    assert sorted(map(HttpExchangeWriter.to_json, exchanges)) == sorted(
+        map(HttpExchangeWriter.to_json, expected)
+    )
+
+
+def test_single_worker_reads_in_process(recording):
+    exchanges = list(
+        HttpExchangeReader.from_jsonl_parallel(recording, workers=1, chunk_size=1000)
+    )
+    assert exchanges == read_sequential(recording)
+
+
+@pytest.mark.parametrize("chunk_size", [0, -1])
+def test_chunk_size_must_be_positive(recording, chunk_size):
+    with pytest.raises(ValueError):
+        HttpExchangeReader.from_jsonl_parallel(recording, chunk_size=chunk_size)
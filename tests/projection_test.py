@@ -0,0 +1,82 @@
+from os import path
+import os
+import pytest
+from http_types import (
+    ExchangeFilter,
+    HttpExchangeReader,
+    HttpMethod,
+    Projection,
+    ProjectedHttpExchange,
+)
+
+dir_path = os.path.dirname(os.path.realpath(__file__))
+SAMPLE_JSONL = path.join(dir_path, "resources", "sample.jsonl")
+
+
+def read_full():
+    with open(SAMPLE_JSONL, "r", encoding="utf-8") as f:
+        return list(HttpExchangeReader.from_jsonl(f))
+
+
+def read_projected(projection: Projection, **kwargs):
+    with open(SAMPLE_JSONL, "r", encoding="utf-8") as f:
+        return list(HttpExchangeReader.from_jsonl_projected(f, projection, **kwargs))
+
+
+def test_full_projection_matches_builders():
+    for full, projected in zip(read_full(), read_projected(Projection())):
+        assert isinstance(projected, ProjectedHttpExchange)
+        for name in ["method", "protocol", "host", "path", "pathname", "query"]:
+            assert getattr(projected.request, name) == getattr(full.request, name)
+        for name in ["headers", "body", "bodyAsJson", "timestamp"]:
+            assert getattr(projected.request, name) == getattr(full.request, name)
+            assert getattr(projected.response, name) == getattr(full.response, name)
+        assert projected.response.statusCode == full.response.statusCode
+        assert projected.meta == full.meta
+
+
+def test_request_only():
+    exchanges = read_projected(Projection.REQUEST_ONLY)
+    assert [e.request.method for e in exchanges] == [
+        e.request.method for e in read_full()
+    ]
+    for exchange in exchanges:
+        assert exchange.projection == Projection.REQUEST_ONLY
+        assert exchange.response is None
+        assert exchange.meta is None
+
+
+def test_status_line_skips_headers_bodies_and_timestamps():
+    for full, projected in zip(read_full(), read_projected(Projection.STATUS_LINE)):
+        assert projected.request.path == full.request.path
+        assert projected.response.statusCode == full.response.statusCode
+        assert projected.request.headers is None
+        assert projected.request.body is None
+        assert projected.request.bodyAsJson is None
+        assert projected.response.timestamp is None
+
+
+def test_excluded_timestamps_are_not_parsed(tmp_path):
+    recording = tmp_path / "recording.jsonl"
+    recording.write_text(
+        '{"request": {"method": "get", "protocol": "https", "host": "h",'
+        ' "path": "/", "timestamp": "INVALID"},'
+        ' "response": {"statusCode": 200, "timestamp": "INVALID"}}\n'
+    )
+    with open(str(recording)) as f:
+        (exchange,) = HttpExchangeReader.from_jsonl_projected(
+            f, Projection.HEADERS_ONLY
+        )
+    assert exchange.request.timestamp is None
+    assert exchange.request.query == {}
+    with pytest.raises(ValueError):
+        with open(str(recording)) as f:
+            list(HttpExchangeReader.from_jsonl_projected(f, Projection()))
+
+
+def test_projection_with_filter():
+    exchanges = read_projected(
+        Projection.STATUS_LINE, where=ExchangeFilter(methods=["post"])
+    )
+    assert exchanges
+    assert all(e.request.method == HttpMethod.POST for e in exchanges)
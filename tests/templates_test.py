@@ -0,0 +1,164 @@
+from os import path
+import json
+import os
+import pytest
+from http_types import (
+    HttpExchangeReader,
+    PathTemplates,
+    RequestBuilder,
+    TrafficStats,
+)
+from http_types.templates import ClassifierNode
+
+dir_path = os.path.dirname(os.path.realpath(__file__))
+SAMPLE_JSONL = path.join(dir_path, "resources", "sample.jsonl")
+
+PATHNAMES = [
+    "/users/123",
+    "/users/456/repos",
+    "/users/me",
+    "/docs/intro",
+    "/docs/install",
+    "/docs/usage",
+    "/docs/faq",
+    "/docs/api",
+    "/docs/faq/edit",
+    "/blobs/9f86d081884c7d659a2feaa0c55ad015",
+    "/sessions/0f0e2a8c-1d2b-4c3d-9e8f-001122334455",
+]
+
+
+@pytest.fixture
+def templates():
+    return PathTemplates(max_literals=4).learn(PATHNAMES)
+
+
+def test_learned_templates(templates):
+    assert templates.templates() == {
+        "/users/{id}": 1,
+        "/users/{id}/repos": 1,
+        "/users/me": 1,
+        "/docs/{id}": 5,
+        "/docs/{id}/edit": 1,
+        "/blobs/{id}": 1,
+        "/sessions/{id}": 1,
+    }
+
+
+@pytest.mark.parametrize(
+    "pathname,template",
+    [
+        ("/users/789", "/users/{id}"),
+        ("/users/me", "/users/me"),
+        ("/users/1/repos", "/users/{id}/repos"),
+        ("/docs/changelog", "/docs/{id}"),
+        ("/docs/changelog/edit", "/docs/{id}/edit"),
+        ("/users", None),
+        ("/users/1/issues", None),
+        ("/unknown", None),
+    ],
+)
+def test_classify(templates, pathname: str, template: str):
+    assert templates.classify(pathname) == template
+
+
+def test_classify_falls_back_from_literal_branches(templates):
+    # /users/me is a literal branch without a repos child
+    assert templates.classify("/users/me/repos") == "/users/{id}/repos"
+    assert templates.classify("/users/me") == "/users/me"
+    assert templates.classify("/users/me/issues") is None
+    nested = PathTemplates().learn(["/a/b/c", "/a/1/c/d", "/a/b/2/d"])
+    # Deeper literal branches are tried first
+    assert nested.classify("/a/b/c/d") == "/a/b/{id}/d"
+    assert nested.classify("/a/b/c/e") is None
+    nested.add("/a/b/c/x/y")
+    assert nested.classify("/a/b/c/x") is None
+
+
+def test_classify_visits_one_node_per_segment(monkeypatch):
+    depth = 14
+    pathnames = ["/end"]
+    for n in range(2**depth):
+        segments = ["123" if n >> bit & 1 else "a" for bit in range(depth)]
+        pathnames.append("/" + "/".join(segments))
+    templates = PathTemplates(max_literals=4).learn(pathnames)
+    pathname = "/" + "/".join(["a"] * depth)
+    assert templates.classify(pathname) == pathname
+    visits = []
+    child = ClassifierNode.child
+
+    def counted_child(node, segment):
+        visits.append(segment)
+        return child(node, segment)
+
+    monkeypatch.setattr(ClassifierNode, "child", counted_child)
+    assert templates.classify("/" + "/".join(["a"] * (depth - 1) + ["other"])) == (
+        "/" + "/".join(["a"] * (depth - 1) + ["{id}"])
+    )
+    assert len(visits) <= depth
+    del visits[:]
+    assert templates.classify("/a/end/other") is None
+    assert len(visits) <= 3
+
+
+def test_parameters_are_numbered():
+    templates = PathTemplates().learn(["/users/1/repos/2", "/users/1/repos/2/files"])
+    assert templates.classify("/users/3/repos/4") == "/users/{id}/repos/{id2}"
+    assert set(templates.templates()) == {
+        "/users/{id}/repos/{id2}",
+        "/users/{id}/repos/{id2}/files",
+    }
+
+
+def test_literal_threshold():
+    pathnames = ["/tags/tag{}".format(n) for n in range(5)]
+    assert len(PathTemplates(max_literals=5).learn(pathnames).templates()) == 5
+    assert PathTemplates(max_literals=4).learn(pathnames).templates() == {
+        "/tags/{id}": 5
+    }
+    assert PathTemplates(recognize_ids=False).learn(["/users/1"]).templates() == {
+        "/users/1": 1
+    }
+    with pytest.raises(ValueError):
+        PathTemplates(max_literals=0)
+
+
+def test_generalizing_merges_subtrees():
+    templates = PathTemplates(max_literals=2).learn(
+        ["/a/x/edit", "/a/y/view", "/a/z/edit", "/a/w/edit/now"]
+    )
+    assert templates.templates() == {
+        "/a/{id}/edit": 2,
+        "/a/{id}/view": 1,
+        "/a/{id}/edit/now": 1,
+    }
+    assert templates.classify("/a/new/view") == "/a/{id}/view"
+
+
+def test_learn_from_requests():
+    requests = [RequestBuilder.from_url("https://example.com" + p) for p in PATHNAMES]
+    learned = PathTemplates(max_literals=4).learn(requests)
+    assert (
+        learned.templates()
+        == PathTemplates(max_literals=4).learn(PATHNAMES).templates()
+    )
+
+
+def test_serialization(templates):
+    restored = PathTemplates.from_dict(json.loads(json.dumps(templates.to_dict())))
+    assert restored.templates() == templates.templates()
+    assert restored.max_literals == templates.max_literals
+    for pathname in PATHNAMES + ["/docs/new", "/nothing"]:
+        assert restored.classify(pathname) == templates.classify(pathname)
+    # Learning continues from the restored state
+    restored.add("/docs/other")
+    assert restored.templates()["/docs/{id}"] == 6
+
+
+def test_traffic_stats_by_template():
+    exchanges = list(HttpExchangeReader.from_path(SAMPLE_JSONL))
+    templates = PathTemplates(max_literals=1).learn(e.request for e in exchanges)
+    traffic = TrafficStats(templates=templates).add_all(exchanges)
+    assert traffic.count == len(exchanges)
+    for _, _, pathname in traffic.endpoints:
+        assert pathname in templates.templates()
@@ -0,0 +1,197 @@
+from dataclasses import replace
+from os import path
+import gzip
+import json
+import os
+import random
+import pytest
+from http_types import (
+    BlockGzipFile,
+    BodyStore,
+    EndpointStats,
+    HttpExchangeBuilder,
+    HttpExchangeReader,
+    HttpExchangeWriter,
+    QuantileSketch,
+    TrafficStats,
+    recording_stats,
+)
+from http_types.utils import BuilderException
+
+dir_path = os.path.dirname(os.path.realpath(__file__))
+SAMPLE_JSONL = path.join(dir_path, "resources", "sample.jsonl")
+
+
+def exchange(pathname="/users", status=200, body="", latency_ms=None):
+    request = {
+        "method": "get",
+        "protocol": "https",
+        "host": "example.com",
+        "path": pathname,
+    }
+    response = {"statusCode": status, "headers": {}, "body": body}
+    if latency_ms is not None:
+        request["timestamp"] = "2020-01-31T13:34:15.000Z"
+        response["timestamp"] = "2020-01-31T13:34:15.{:03d}Z".format(latency_ms)
+    return HttpExchangeBuilder.from_dict({"request": request, "response": response})
+
+
+@pytest.fixture
+def recording(tmp_path):
+    rng = random.Random(0)
+    recording_path = tmp_path / "recording.jsonl"
+    with open(recording_path, "w", encoding="utf-8") as f:
+        for n in range(300):
+            record = {
+                "request": {
+                    "method": rng.choice(["get", "post"]),
+                    "protocol": "https",
+                    "host": "example.com",
+                    "path": "/items/{}".format(n % 7),
+                    "timestamp": "2020-01-31T13:34:15.000Z",
+                },
+                "response": {
+                    "statusCode": rng.choice([200, 404, 500]),
+                    "headers": {},
+                    "body": "x" * rng.randrange(1000),
+                    "timestamp": "2020-01-31T13:34:15.{:03d}Z".format(
+                        rng.randrange(1000)
+                    ),
+                },
+            }
+            f.write(json.dumps(record) + "\n")
+    return str(recording_path)
+
+
+@pytest.mark.parametrize("q", [0, 0.1, 0.5, 0.9, 0.99, 1])
+def test_quantiles_are_within_relative_accuracy(q: float):
+    rng = random.Random(q)
+    values = [int(rng.lognormvariate(8, 2)) - 100 for _ in range(5000)]
+    sketch = QuantileSketch(relative_accuracy=0.01)
+    for value in values:
+        sketch.add(value)
+    values.sort()
+    expected = values[int(q * (len(values) - 1))]
+    assert sketch.quantile(q) == pytest.approx(expected, rel=0.01, abs=1e-9)
+    assert sketch.count == len(values)
+    assert sketch.sum == sum(values)
+    assert (sketch.min, sketch.max) == (values[0], values[-1])
+
+
+def test_sketches_merge_exactly():
+    rng = random.Random(1)
+    values = [rng.randrange(-1000, 1000000) for _ in range(1000)]
+    whole = QuantileSketch()
+    parts = [QuantileSketch() for _ in range(3)]
+    for n, value in enumerate(values):
+        whole.add(value)
+        parts[n % 3].add(value)
+    merged = QuantileSketch()
+    for part in parts:
+        merged.merge(part)
+    assert merged == whole
+    assert QuantileSketch.from_dict(json.loads(json.dumps(whole.to_dict()))) == whole
+
+    with pytest.raises(ValueError):
+        whole.merge(QuantileSketch(relative_accuracy=0.05))
+
+
+def test_empty_sketch():
+    sketch = QuantileSketch()
+    assert sketch.quantile(0.5) is None
+    assert sketch.mean is None
+    with pytest.raises(ValueError):
+        sketch.quantile(2)
+    with pytest.raises(ValueError):
+        QuantileSketch(relative_accuracy=0)
+
+
+def test_endpoint_stats():
+    stats = EndpointStats()
+    stats.add(exchange(status=200, body="héllo", latency_ms=20))
+    stats.add(exchange(status=201, latency_ms=40))
+    stats.add(exchange(status=404))
+    assert stats.count == 3
+    assert stats.statuses == {200: 1, 201: 1, 404: 1}
+    assert stats.status_classes() == {"2xx": 2, "4xx": 1}
+    assert stats.response_bytes.max == 6
+    assert stats.latency.count == 2
+    assert stats.latency_seconds(1) == pytest.approx(0.040, rel=0.01)
+    assert stats.latency.sum == 60000
+
+
+def test_latency_needs_comparable_timestamps():
+    aware = exchange(latency_ms=20)
+    naive = replace(
+        aware.request,
+        timestamp=aware.request.timestamp.replace(tzinfo=None),  # type: ignore
+    )
+    stats = EndpointStats()
+    stats.add(replace(aware, request=naive))
+    assert stats.count == 1
+    assert stats.latency.count == 0
+
+
+def test_traffic_stats_group_by_endpoint():
+    exchanges = list(HttpExchangeReader.from_path(SAMPLE_JSONL))
+    traffic = TrafficStats().add_all(exchanges)
+    assert traffic.count == len(exchanges)
+    for (method, host, pathname), stats in traffic.endpoints.items():
+        assert stats.count == sum(
+            1
+            for e in exchanges
+            if (e.request.method.value, e.request.host, e.request.pathname)
+            == (method, host, pathname)
+        )
+
+
+def test_partial_stats_merge_exactly(recording):
+    exchanges = list(HttpExchangeReader.from_path(recording))
+    whole = TrafficStats().add_all(exchanges)
+    merged = TrafficStats()
+    for start in range(0, len(exchanges), 70):
+        merged.merge(TrafficStats().add_all(exchanges[start : start + 70]))
+    assert merged == whole
+    assert TrafficStats.from_dict(json.loads(json.dumps(whole.to_dict()))) == whole
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_recording_stats(recording, workers: int):
+    expected = TrafficStats().add_all(HttpExchangeReader.from_path(recording))
+    stats = recording_stats(recording, workers=workers, chunk_size=2000)
+    assert stats == expected
+    assert len(stats.endpoints) == 14
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_recording_stats_with_body_store(recording, tmp_path, workers: int):
+    expected = TrafficStats().add_all(HttpExchangeReader.from_path(recording))
+    stored = str(tmp_path / "stored.jsonl")
+    store = BodyStore.for_recording(stored)
+    with HttpExchangeWriter.to_path(stored, body_store=store, body_threshold=100) as w:
+        w.write_many(HttpExchangeReader.from_path(recording))
+    stats = recording_stats(stored, workers=workers, chunk_size=2000, body_store=store)
+    assert stats == expected
+    with pytest.raises(BuilderException):
+        recording_stats(stored, workers=1)
+
+
+def test_recording_stats_of_compressed_recordings(recording, tmp_path):
+    expected = TrafficStats().add_all(HttpExchangeReader.from_path(recording))
+    with open(recording, "rb") as f:
+        data = f.read()
+
+    block_gzip = str(tmp_path / "recording.jsonl.gz")
+    with BlockGzipFile(open(block_gzip, "wb"), block_size=2000) as f:
+        f.write(data)
+    assert recording_stats(block_gzip, workers=2) == expected
+
+    plain_gzip = str(tmp_path / "plain.jsonl.gz")
+    with gzip.open(plain_gzip, "wb") as f:
+        f.write(data)
+    assert recording_stats(plain_gzip, workers=2) == expected
+
+
+def test_recording_stats_chunk_size_must_be_positive(recording):
+    with pytest.raises(ValueError):
+        recording_stats(recording, chunk_size=0)
@@ -1,7 +1,18 @@
-from http_types.types import HttpMethod, Protocol
-from http_types import Request, Response
-from typeguard import check_type  # type:ignore
+from http_types.types import NOT_PARSED, Headers, HttpMethod, Protocol
+from http_types import (
+    HttpExchange,
+    HttpHeaders,
+    Request,
+    Response,
+    SlottedHttpExchange,
+    SlottedRequest,
+    SlottedResponse,
+)
+from typeguard import check_type  # type: ignore
+from dataclasses import FrozenInstanceError
 from datetime import datetime
+import pickle
+import pytest
 
 req = Request(
     method=HttpMethod.GET,
@@ -44,3 +55,117 @@ def request_and_response_can_be_instantiated_without_timestamp():
     assert request.timestamp is None
     response = Response(statusCode=200, body="OK", bodyAsJson="OK", headers={})
     assert response.timestamp is None
+
+
+def test_slotted_variants_typecheck():
+    slotted_req = SlottedRequest(
+        method=HttpMethod.GET,
+        host="api.github.com",
+        path="/user/repos?id=1",
+        pathname="/user/repos",
+        protocol=Protocol.HTTPS,
+        query={"id": ["1"]},
+        body="",
+        bodyAsJson="",
+        headers={},
+    )
+    slotted_res = SlottedResponse(statusCode=200, body="OK", headers={})
+    exchange = SlottedHttpExchange(request=slotted_req, response=slotted_res)
+    check_type("req", slotted_req, SlottedRequest)
+    check_type("res", slotted_res, SlottedResponse)
+    check_type("exchange", exchange, SlottedHttpExchange)
+    check_type("req", slotted_req, Request)
+    check_type("res", slotted_res, Response)
+    check_type("exchange", exchange, HttpExchange)
+    assert isinstance(exchange, HttpExchange)
+    assert isinstance(slotted_req, Request) and isinstance(slotted_res, Response)
+    assert not hasattr(exchange, "__dict__")
+    assert not hasattr(slotted_req, "__dict__")
+
+
+def test_slotted_variants_are_frozen_and_hashable():
+    response = SlottedResponse(statusCode=200, body="[1]", headers={"a": "b"})
+    same = SlottedResponse(statusCode=200, body="[1]", headers={"a": "b"})
+    assert response == same
+    assert hash(response) == hash(same)
+    assert len({response, same}) == 1
+    # Headers are stored as HttpHeaders, so equal headers hash equally
+    normalized = SlottedResponse(
+        statusCode=200, body="[1]", headers=HttpHeaders({"a": "b"})
+    )
+    assert normalized == response and hash(normalized) == hash(response)
+    assert isinstance(response.headers, HttpHeaders)
+    other = SlottedResponse(statusCode=200, body="[1]", headers={"a": "c"})
+    assert hash(other) != hash(response)
+    exchange = SlottedHttpExchange(request=None, response=response, meta={"a": [1]})
+    same_exchange = SlottedHttpExchange(request=None, response=same, meta={"a": [1]})
+    assert hash(exchange) == hash(same_exchange)
+    with pytest.raises(FrozenInstanceError):
+        response.body = ""  # type: ignore
+
+
+def test_slotted_variants_can_be_pickled():
+    response = SlottedResponse(
+        statusCode=200, body="[1]", headers={}, bodyAsJson=NOT_PARSED
+    )
+    unpickled = pickle.loads(pickle.dumps(response))
+    assert unpickled == response
+    assert unpickled.bodyAsJson == [1]
+
+
+def test_http_headers_from_pairs_with_lists_are_hashable():
+    headers = HttpHeaders([("accept", ["a", "b"])])
+    assert hash(headers) == hash(HttpHeaders({"accept": ["a", "b"]}))
+    assert headers == HttpHeaders({"accept": ["a", "b"]})
+    assert headers["accept"] == ["a", "b"]
+
+
+def test_http_headers_lookup_ignores_case():
+    headers = HttpHeaders(
+        [("Content-Type", "text/plain"), ("Set-Cookie", "a=1"), ("set-cookie", "b=2")]
+    )
+    assert headers["content-type"] == "text/plain"
+    assert headers.get("CONTENT-TYPE") == "text/plain"
+    assert headers.get("accept") is None
+    assert "content-type" in headers
+    assert headers.getall("SET-COOKIE") == ["a=1", "b=2"]
+    assert headers.get("Set-Cookie") == headers["set-cookie"] == ["a=1", "b=2"]
+    assert list(headers) == ["Content-Type", "Set-Cookie", "set-cookie"]
+    # Iterating items keeps the values of each name apart
+    assert dict(headers.items()) == {
+        "Content-Type": "text/plain",
+        "Set-Cookie": "a=1",
+        "set-cookie": "b=2",
+    }
+    assert ("set-cookie", "b=2") in headers.items()
+    assert list(headers.values()) == ["text/plain", "a=1", "b=2"]
+    with pytest.raises(KeyError):
+        headers["accept"]
+
+
+def test_http_headers_multiple_values():
+    headers = HttpHeaders([("accept", "text/html"), ("accept", "application/json")])
+    assert headers["accept"] == ["text/html", "application/json"]
+    headers["accept"].append("text/plain")  # type: ignore
+    assert headers.getall("accept") == ["text/html", "application/json"]
+
+
+def test_http_headers_non_string_values():
+    headers = HttpHeaders({"Content-Length": 12, "Accept": ("a", "b")})
+    assert headers["content-length"] == 12
+    assert headers.getall("content-length") == [12]
+    assert headers["accept"] == ["a", "b"]
+    assert headers == {"Content-Length": 12, "Accept": ["a", "b"]}
+    assert hash(headers) == hash(
+        HttpHeaders([("Content-Length", 12)] + [("Accept", "a"), ("Accept", "b")])
+    )
+
+
+def test_http_headers_equality_and_hashing():
+    headers = HttpHeaders({"a": "b", "c": ["d", "e"]})
+    assert headers == {"a": "b", "c": ["d", "e"]}
+    assert {"a": "b", "c": ["d", "e"]} == headers
+    assert headers != {"A": "b", "c": ["d", "e"]}
+    assert hash(headers) == hash(HttpHeaders({"c": ("d", "e"), "a": "b"}))
+    assert pickle.loads(pickle.dumps(headers)) == headers
+    check_type("headers", headers, Headers)
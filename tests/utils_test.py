@@ -1,17 +1,40 @@
-from http_types.types import HttpMethod, Protocol
-from http_types.utils import ResponseBuilder, RequestBuilder
+from http_types.types import NOT_PARSED, HttpMethod, Protocol
+from http_types.utils import (
+    ResponseBuilder,
+    RequestBuilder,
+    fixup_entries_for_serialization,
+    BuilderException,
+    body_from_bytes,
+    json_serial,
+    may_be_json,
+    parse_iso860_datetime,
+    parse_rfc3339_datetime,
+    url_encode_params,
+)
 from io import StringIO
 from os import path
 import os
+import inspect
 import json
 import httpretty
 from urllib import request
 from http_types import (
+    Base64Body,
+    HttpHeaders,
+    HttpQuery,
+    SlottedHttpExchange,
+    SlottedRequest,
+    SlottedResponse,
     HttpExchange,
     HttpExchangeBuilder,
+    Response,
     HttpExchangeReader,
     HttpExchangeWriter,
+    Interner,
+    MappedRecording,
+    ValidationError,
 )
+from dataclasses import FrozenInstanceError
 from dateutil.parser import isoparse
 import jsonschema
 from typeguard import check_type  # type: ignore
@@ -21,7 +44,7 @@ import pytest
 dir_path = os.path.dirname(os.path.realpath(__file__))
 SAMPLE_JSON = path.join(dir_path, "resources", "sample.json")
 SAMPLE_JSONL = path.join(dir_path, "resources", "sample.jsonl")
-SCHEMA_PATH = path.join(dir_path, "resources", "http-types-schema.json")
+SCHEMA_PATH = path.join(dir_path, "..", "http_types", "http-types-schema.json")
 
 
 def read_example():
@@ -242,6 +265,9 @@ def test_httpbin():
     assert res.statusCode == 200
     assert res.bodyAsJson == {"origin": "127.0.0.1"}
     assert isinstance(res.body, str)
+    assert isinstance(req.headers, HttpHeaders)
+    assert isinstance(res.headers, HttpHeaders)
+    assert res.headers.get("CONTENT-TYPE") == res.headers.get("content-type")
 
 
 def test_real_data():
@@ -258,3 +284,334 @@ def test_response_from_dict_without_body():
         {"statusCode": 200, "headers": {"content-type": "text/plain"}}
     )
     assert response.statusCode == 200
+
+
+def test_body_as_json_is_decoded_lazily():
+    response = ResponseBuilder.from_dict(
+        {
+            "statusCode": 200,
+            "headers": {"Content-Type": "application/json"},
+            "body": '{"key": "value"}',
+        }
+    )
+    assert response.__dict__["bodyAsJson"] is NOT_PARSED
+    assert response.bodyAsJson == {"key": "value"}
+    assert response.__dict__["bodyAsJson"] == {"key": "value"}
+
+
+def test_body_as_json_is_skipped_for_non_json_content_type():
+    request = RequestBuilder.from_dict(
+        {
+            "host": "example.com",
+            "protocol": "http",
+            "method": "post",
+            "path": "/",
+            "headers": {"content-type": "text/html; charset=utf-8"},
+            "body": '{"key": "value"}',
+        }
+    )
+    assert request.__dict__["bodyAsJson"] == ""
+    assert request.bodyAsJson == ""
+
+
+def test_body_as_json_cannot_be_assigned():
+    response = ResponseBuilder.from_dict(
+        {"statusCode": 200, "headers": {}, "body": "[1]"}
+    )
+    with pytest.raises(FrozenInstanceError):
+        response.bodyAsJson = []  # type: ignore
+    assert response.bodyAsJson == [1]
+
+
+def test_may_be_json():
+    assert may_be_json(None)
+    assert may_be_json("text/plain")
+    assert may_be_json("application/vnd.api+json")
+    assert not may_be_json("text/html; charset=utf-8")
+    assert not may_be_json("image/png")
+    assert not may_be_json("application/atom+xml")
+
+
+def test_serialize_matches_fixup_entries(exchanges: Sequence[HttpExchange]):
+    exchange_with_meta = HttpExchangeBuilder.from_dict(
+        {
+            "request": {
+                "method": "post",
+                "protocol": "https",
+                "host": "example.com",
+                "path": "/a?b=1&b=2",
+                "headers": {"x-empty": "", "accept": ["a", "b"]},
+                "timestamp": "2018-11-13T20:20:39+02:00",
+                "body": '{"c": 3}',
+            },
+            "response": {"statusCode": 201, "headers": {}, "body": ""},
+            "meta": {"nested": {"empty": "", "value": 1}, "list": [1, None]},
+        }
+    )
+    for exchange in list(exchanges) + [exchange_with_meta]:
+        expected = fixup_entries_for_serialization(exchange)
+        assert HttpExchangeWriter.to_dict(exchange) == expected
+        assert HttpExchangeWriter.to_json(exchange) == json.dumps(
+            expected, default=json_serial
+        )
+        for part in (exchange.request, exchange.response):
+            assert HttpExchangeWriter.to_json(part) == json.dumps(
+                fixup_entries_for_serialization(part), default=json_serial
+            )
+
+
+def test_serializing_does_not_decode_body(exchanges: Sequence[HttpExchange]):
+    exchange = HttpExchangeReader.from_json(HttpExchangeWriter.to_json(exchanges[0]))
+    HttpExchangeWriter.to_json(exchange)
+    assert exchange.request.__dict__["bodyAsJson"] in (NOT_PARSED, "")
+    assert exchange.response.__dict__["bodyAsJson"] in (NOT_PARSED, "")
+
+
+def test_write_many_matches_write(exchanges: Sequence[HttpExchange]):
+    expected = StringIO()
+    writer = HttpExchangeWriter(expected)
+    for exchange in exchanges:
+        writer.write(exchange)
+
+    output = StringIO()
+    HttpExchangeWriter(output).write_many(exchanges)
+    assert output.getvalue() == expected.getvalue()
+
+
+def test_buffered_writer_flushes_on_count(exchanges: Sequence[HttpExchange]):
+    output = StringIO()
+    writer = HttpExchangeWriter(output, buffer_count=2)
+    writer.write(exchanges[0])
+    assert output.getvalue() == ""
+    writer.write(exchanges[1])
+    assert len(output.getvalue().splitlines()) == 2
+    writer.write(exchanges[2])
+    assert len(output.getvalue().splitlines()) == 2
+    writer.flush()
+    assert len(output.getvalue().splitlines()) == 3
+
+
+def test_buffered_writer_flushes_on_close(exchanges: Sequence[HttpExchange]):
+    output = StringIO()
+    with HttpExchangeWriter(output, buffer_size=1024 * 1024) as writer:
+        writer.write_many(exchanges)
+        assert output.getvalue() == ""
+    assert not output.closed
+    output.seek(0)
+    assert list(HttpExchangeReader.from_jsonl(output)) == list(exchanges)
+
+
+def test_slotted_builders(exchanges: Sequence[HttpExchange]):
+    with open(SAMPLE_JSONL, "r", encoding="utf-8") as f:
+        slotted = list(HttpExchangeReader.from_jsonl(f, slotted=True))
+    assert all(isinstance(exchange, SlottedHttpExchange) for exchange in slotted)
+    assert all(isinstance(exchange.request, SlottedRequest) for exchange in slotted)
+    assert all(isinstance(exchange.response, SlottedResponse) for exchange in slotted)
+    assert [HttpExchangeWriter.to_json(exchange) for exchange in slotted] == [
+        HttpExchangeWriter.to_json(exchange) for exchange in exchanges
+    ]
+    assert slotted[2].meta == exchanges[2].meta
+
+
+def test_slotted_exchanges_equal_plain_ones(exchanges: Sequence[HttpExchange]):
+    with open(SAMPLE_JSONL, "r", encoding="utf-8") as f:
+        lines = [line for line in f if line.strip()]
+    for line in lines:
+        slotted = HttpExchangeReader.from_json(line, slotted=True)
+        plain = HttpExchangeReader.from_json(line)
+        assert slotted == plain and plain == slotted
+        assert slotted.request == plain.request and plain.request == slotted.request
+        assert slotted.response == plain.response
+    assert HttpExchangeReader.from_json(lines[0], slotted=True) != exchanges[1]
+
+
+@pytest.mark.parametrize(
+    "read", [HttpExchangeReader.from_path, HttpExchangeReader.from_mmap]
+)
+def test_path_readers_accept_reader_options(
+    read, exchanges: Sequence[HttpExchange], tmp_path
+):
+    interner = Interner()
+    read_exchanges = list(
+        read(SAMPLE_JSONL, slotted=True, interner=interner, strict=True)
+    )
+    assert all(isinstance(e, SlottedHttpExchange) for e in read_exchanges)
+    assert [HttpExchangeWriter.to_json(e) for e in read_exchanges] == [
+        HttpExchangeWriter.to_json(e) for e in exchanges
+    ]
+    assert len(interner) > 0
+
+    invalid = tmp_path / "invalid.jsonl"
+    record = json.loads(HttpExchangeWriter.to_json(exchanges[0]))
+    record["response"]["statusCode"] = "200"
+    invalid.write_text(json.dumps(record) + "\n")
+    assert len(list(read(str(invalid)))) == 1
+    with pytest.raises(ValidationError):
+        list(read(str(invalid), strict=True))
+
+
+def test_readers_take_options_in_one_order():
+    names = {"slotted", "interner", "where", "body_store", "instrumentation", "strict"}
+
+    def options(function):
+        return [
+            name for name in inspect.signature(function).parameters if name in names
+        ]
+
+    expected = options(HttpExchangeReader.from_jsonl)
+    assert expected == options(HttpExchangeReader.from_lines)
+    assert expected == options(HttpExchangeReader.from_path)
+    assert expected == options(HttpExchangeReader.from_mmap)
+    assert expected == options(MappedRecording.exchanges)
+
+
+def test_builders_produce_http_headers(exchanges: Sequence[HttpExchange]):
+    for exchange in exchanges:
+        assert isinstance(exchange.request.headers, HttpHeaders)
+        assert isinstance(exchange.response.headers, HttpHeaders)
+        assert HttpExchangeWriter.to_dict(exchange) == fixup_entries_for_serialization(
+            exchange
+        )
+    response = ResponseBuilder.from_dict(
+        {"statusCode": 200, "headers": {"Content-Type": "text/html"}, "body": "[1]"}
+    )
+    assert response.headers["content-type"] == "text/html"
+    assert response.bodyAsJson == ""
+
+
+@pytest.mark.parametrize(
+    "timestamp",
+    [
+        "2020-01-31T13:34:15",
+        "2020-01-31T13:34:15Z",
+        "2020-01-31T13:34:15.5Z",
+        "2020-01-31T13:34:15.123456+02:00",
+        "2018-11-13T20:20:39-05:30",
+    ],
+)
+def test_fast_timestamp_parsing_matches_isoparse(timestamp: str):
+    parsed = parse_rfc3339_datetime(timestamp)
+    assert parsed is not None
+    assert parsed == isoparse(timestamp)
+    assert parsed.utcoffset() == isoparse(timestamp).utcoffset()
+    assert parse_iso860_datetime(timestamp) == parsed
+
+
+@pytest.mark.parametrize(
+    "timestamp",
+    ["2020-01-31", "2020-01-31T13:34", "20200131T133415", "2020-01-31T24:00:00"],
+)
+def test_unusual_timestamps_fall_back_to_isoparse(timestamp: str):
+    assert parse_rfc3339_datetime(timestamp) is None
+    assert parse_iso860_datetime(timestamp) == isoparse(timestamp)
+
+
+def test_invalid_fast_path_timestamp_keeps_error_message():
+    timestamp = "2020-02-30T00:00:00Z"
+    with pytest.raises(ValueError, match="Invalid isoformat string: " + timestamp):
+        parse_iso860_datetime(timestamp)
+
+
+def test_parsed_paths_are_cached_and_shared():
+    RequestBuilder.cache_clear()
+    first = RequestBuilder.from_dict(
+        {"method": "get", "protocol": "https", "host": "h", "path": "/a?q=1&q=2"}
+    )
+    second = RequestBuilder.from_dict(
+        {"method": "get", "protocol": "https", "host": "h", "path": "/a?q=1&q=2"}
+    )
+    assert first.pathname == "/a"
+    assert first.query == {"q": ["1", "2"]}
+    assert isinstance(first.query, HttpQuery)
+    assert first.query is second.query
+    info = RequestBuilder.cache_info()
+    assert info["path"].hits > 0
+    assert info["path"].misses == 1
+
+
+def test_encoded_queries_are_cached():
+    RequestBuilder.cache_clear()
+    for query in [{"b": "2", "a": ["1", "3"]}, {"b": "2", "a": ["1", "3"]}, {"a": "1"}]:
+        request = RequestBuilder.from_dict(
+            {
+                "method": "get",
+                "protocol": "https",
+                "host": "h",
+                "pathname": "/a",
+                "query": query,
+            }
+        )
+        assert request.path == "/a?" + url_encode_params(query)
+    info = RequestBuilder.cache_info()["encoded_query"]
+    assert (info.hits, info.misses) == (1, 2)
+
+
+def test_shared_queries_are_immutable():
+    query = RequestBuilder.from_url("https://h/a?q=1&q=2").query
+    query["q"].append("3")  # type: ignore
+    assert RequestBuilder.from_url("https://h/a?q=1&q=2").query == {"q": ["1", "2"]}
+    with pytest.raises(TypeError):
+        query["q"] = "3"  # type: ignore
+
+
+PNG_HEADER = b"\x89PNG\r\n\x1a\n"
+
+
+@pytest.mark.parametrize("slotted", [False, True])
+def test_binary_bodies_round_trip(slotted: bool):
+    exchange = HttpExchange(
+        request=RequestBuilder.from_url("https://example.com/logo.png"),
+        response=Response(
+            statusCode=200, headers={"content-type": "image/png"}, body=PNG_HEADER
+        ),
+    )
+    written = HttpExchangeWriter.to_json(exchange)
+    as_dict = json.loads(written)
+    assert as_dict["response"]["bodyEncoding"] == "base64"
+    jsonschema.validate(instance=as_dict, schema=read_schema())
+
+    read = HttpExchangeReader.from_json(written, slotted=slotted)
+    stored = (
+        object.__getattribute__(read.response, "_body")
+        if slotted
+        else read.response.__dict__["body"]
+    )
+    assert isinstance(stored, Base64Body)
+    assert read.response.body == PNG_HEADER
+    assert read.response.bodyAsJson == ""
+    assert HttpExchangeWriter.to_json(read) == written
+
+
+def test_unknown_body_encoding():
+    with pytest.raises(BuilderException):
+        ResponseBuilder.from_dict(
+            {"statusCode": 200, "headers": {}, "body": "x", "bodyEncoding": "rot13"}
+        )
+
+
+def test_captured_bodies_are_decoded_only_if_text():
+    assert body_from_bytes(b'{"a": 1}', {"content-type": "application/json"}) == (
+        '{"a": 1}'
+    )
+    assert body_from_bytes(b"plain", {}) == "plain"
+    assert body_from_bytes(PNG_HEADER, {}) == PNG_HEADER
+    assert body_from_bytes(b"GIF89a", {"content-type": "image/gif"}) == b"GIF89a"
+    assert (
+        body_from_bytes(b"\x08\x96\x01", {"content-type": "application/x-protobuf"})
+        == b"\x08\x96\x01"
+    )
+
+
+@httpretty.activate
+def test_binary_response_from_http_client():
+    httpretty.register_uri(
+        httpretty.GET,
+        "https://example.com/logo.png",
+        body=PNG_HEADER,
+        content_type="image/png",
+    )
+    response = ResponseBuilder.from_http_client_response(
+        request.urlopen("https://example.com/logo.png")
+    )
+    assert response.body == PNG_HEADER
+    assert response.bodyAsJson == ""
@@ -0,0 +1,164 @@
+from dataclasses import replace
+from os import path
+import json
+import os
+import jsonschema
+import pytest
+from http_types import (
+    HttpExchangeBuilder,
+    HttpExchangeReader,
+    RequestBuilder,
+    ResponseBuilder,
+    SchemaError,
+    ValidationError,
+    Validator,
+    compile_schema,
+    default_validator,
+    load_schema,
+)
+
+dir_path = os.path.dirname(os.path.realpath(__file__))
+SAMPLE_JSONL = path.join(dir_path, "resources", "sample.jsonl")
+
+
+def sample_records():
+    with open(SAMPLE_JSONL, "r", encoding="utf-8") as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def invalid_record():
+    record = sample_records()[0]
+    record["request"]["method"] = "fetch"
+    record["request"]["headers"]["accept"] = 1
+    del record["response"]["statusCode"]
+    record["extra"] = True
+    return record
+
+
+def test_sample_records_are_valid():
+    validator = default_validator()
+    for record in sample_records():
+        assert validator.errors(record) == []
+        validator.validate(record)
+
+
+def test_all_errors_are_reported():
+    errors = default_validator().errors(invalid_record())
+    assert set(errors) == {
+        SchemaError("", "additional property 'extra' is not allowed"),
+        SchemaError(
+            "/request/method",
+            'is not one of ["get", "put", "post", '
+            '"patch", "delete", "options", "trace", "head", "connect"]',
+        ),
+        SchemaError(
+            "/request/headers/accept", "is not valid under any of the given schemas"
+        ),
+        SchemaError("/response", '"statusCode" is a required property'),
+    }
+
+    with pytest.raises(ValidationError) as excinfo:
+        default_validator().validate(invalid_record())
+    assert excinfo.value.errors == errors
+    assert "/request/method: is not one of" in str(excinfo.value)
+
+
+def test_validate_many():
+    records = sample_records()
+    records.insert(1, invalid_record())
+    records.append({"response": {"statusCode": 200}})
+    invalid = default_validator().validate_many(records)
+    assert sorted(invalid) == [1, len(records) - 1]
+    assert invalid[len(records) - 1] == [
+        SchemaError("", '"request" is a required property')
+    ]
+
+
+def test_agrees_with_jsonschema():
+    schema = load_schema()
+    validator = Validator(schema)
+    record = invalid_record()
+    records = sample_records() + [
+        record,
+        {"request": {"method": "get", "query": {"a": ["b", 1]}}},
+        {"request": {"method": "get", "timestamp": 5}},
+        {"request": {"method": "get"}, "response": {"statusCode": "200"}},
+        {"request": {"method": "get"}, "meta": []},
+        [],
+    ]
+    for record in records:
+        expected = sorted(
+            "/" + "/".join(str(part) for part in error.absolute_path)
+            for error in jsonschema.Draft7Validator(schema).iter_errors(record)
+        )
+        actual = sorted(error.path or "/" for error in validator.errors(record))
+        assert actual == expected
+
+
+@pytest.mark.parametrize(
+    "timestamp,valid",
+    [
+        ("2018-11-13T20:20:39+01:00", True),
+        ("2018-11-13T20:20:39.123Z", True),
+        ("2018-11-13 20:20:39Z", True),
+        ("2018-11-13T20:20:39", False),
+        ("yesterday", False),
+    ],
+)
+def test_date_time_format(timestamp: str, valid: bool):
+    record = {"request": {"method": "get", "timestamp": timestamp}}
+    assert (default_validator().errors(record) == []) is valid
+    assert Validator(formats=False).errors(record) == []
+
+
+def test_any_of_with_nested_schemas():
+    errors = compile_schema(
+        {
+            "anyOf": [
+                {"type": "object", "required": ["a"]},
+                {"type": "array", "items": {"type": "integer"}},
+            ]
+        }
+    )
+    assert "def " in errors.__source__  # type: ignore
+    assert errors({"a": 1}) == []
+    assert errors([1, 2]) == []
+    assert errors({"b": 1}) == [
+        SchemaError("", "is not valid under any of the given schemas")
+    ]
+    assert len(errors(["1"])) == 1
+
+
+def test_strict_builders():
+    record = invalid_record()
+    with pytest.raises(ValidationError) as excinfo:
+        HttpExchangeBuilder.from_dict(record, strict=True)
+    assert len(excinfo.value.errors) == 4
+    with pytest.raises(ValidationError):
+        RequestBuilder.from_dict(record["request"], strict=True)
+    with pytest.raises(ValidationError):
+        ResponseBuilder.from_dict({"statusCode": "200"}, strict=True)
+
+    for record in sample_records():
+        HttpExchangeBuilder.from_dict(record, strict=True)
+
+
+def test_strict_readers():
+    lines = [json.dumps(record) for record in sample_records()]
+    assert len(list(HttpExchangeReader.from_lines(lines, strict=True))) == len(lines)
+    lines.append(json.dumps(invalid_record()))
+    with pytest.raises(ValidationError):
+        list(HttpExchangeReader.from_lines(lines, strict=True))
+
+
+def test_validate_hooks():
+    exchanges = [HttpExchangeBuilder.from_dict(r) for r in sample_records()]
+    for exchange in exchanges:
+        HttpExchangeBuilder.validate(exchange)
+        RequestBuilder.validate(exchange.request)
+        ResponseBuilder.validate(exchange.response)
+
+    request = RequestBuilder.from_url("https://example.com/path?a=b")
+    RequestBuilder.validate(request)
+    with pytest.raises(ValidationError):
+        RequestBuilder.validate(replace(request, method="fetch"))  # type: ignore